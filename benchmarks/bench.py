@@ -0,0 +1,659 @@
+"""Benchmark der Auswertungs-Stufen auf synthetischen Daten.
+
+    python benchmarks/bench.py                       # 10k, gegen baseline.json prüfen
+    python benchmarks/bench.py --sizes 10k,1M,10M    # große Läufe (CSV)
+    python benchmarks/bench.py --update-baseline     # aktuelle Messung als Referenz
+
+Je Größe läuft ein eigener Prozess (damit der Spitzen-RSS pro Größe gilt).
+Gemessen werden Laufzeit, Durchsatz (Zeilen/s) und der zusätzliche Speicher
+jeder Stufe (``mem_mb``: RSS-Höchststand während der Stufe über dem RSS zu
+ihrem Beginn; unter Linux wird der Höchststand dafür vor jeder Stufe über
+``/proc/self/clear_refs`` zurückgesetzt): read, clean, tokenize, count,
+crosstab, patterns (blockweise über den gestreamten Export),
+counts_pandas/counts_arrow (Lesen und Zählstände über beide String-Backends;
+weichen die Ergebnisse ab, bricht der Lauf ab),
+store (Bitmasken/Codes bauen und schreiben), store_count (memory-mapped öffnen
+und zählen), cube (Würfel bauen und Kreuztabellen abfragen), rake (Raking je
+Teilnehmendem und auf dem Würfel; ohne Konvergenz bricht der Lauf ab),
+segments/segments_seq (alle Tabellen je Teilgruppe, Worker über Shared
+Memory bzw. ein Prozess; weichen die Ergebnisse ab, bricht der Lauf ab), fuzzy (Tippfehler
+bewerten, dann nachschlagen), bootstrap, chi2, chi2_batch, permutation, binom_grid, statista, panel (alle Statista-Dateien kalt im
+Pool, dann warm), cpi, deflate, cagr, series_write/series_read/series_scan
+(monatliche Reihen je Region Jahr/Monat-partitioniert schreiben, die letzten
+5 Jahre weniger Reihen gefiltert lesen bzw. zum Vergleich alles lesen), memo
+(abgeleitete Tabelle rechnen und ablegen, dann lesen), plot. Dazu kommt ein Kaltstart von
+``python -m zahlungsbereitschaft --tables`` (Zielwert aus
+``tables.COLD_START_TARGET_S``).
+
+Das Ergebnis landet in ``.cache/bench/last.json``. Gegen die eingecheckte
+``baseline.json`` (10k) führt jede Stufe, die mehr als ``--tolerance`` langsamer
+oder speicherhungriger ist, zu einer REGRESSION-Zeile und Exit-Code 1. Fehlt die
+Baseline oder enthält sie keine der gemessenen Größen, endet der Lauf mit
+Exit-Code 2 (nichts verglichen).
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+sys.path.insert(0, str(HERE))
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+from zahlungsbereitschaft.paths import CACHE_DIR, ROOT
+
+BENCH_DIR = CACHE_DIR / "bench"
+BASELINE = HERE / "baseline.json"
+SIZES = {"10k": 10_000, "1M": 1_000_000, "10M": 10_000_000}
+CHUNKSIZE = 200_000
+MAX_YEARS = 10_000  # Zeitreihen für CPI/CAGR (länger ist nicht sinnvoll)
+BOOT_RESAMPLES = 10_000
+SEGMENTS = 10_000  # Tafeln für den gestapelten Chi²-Test
+PERM_TABLES, PERMUTATIONS = 100, 2_000
+WINDOW_YEARS = 500  # alle Fenster wachsen quadratisch mit der Reihenlänge
+FUZZY_TOKENS = 5_000  # verschiedene Freitext-Varianten für die unscharfe Zuordnung
+DEFLATE_MONTHS, DEFLATE_SERIES, DEFLATE_REGIONS = 600, 5_000, 16  # breite Matrix für deflate
+
+# Abweichungen unterhalb dieser Schwellen gelten als Rauschen
+MIN_SECONDS = 0.05
+MIN_RSS_MB = 25
+NO_BASELINE = 2  # Exit-Code, wenn nichts verglichen wurde
+
+
+def _status_mb(key):
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(key):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_mb():
+    """Höchststand des RSS dieses Prozesses in MB.
+
+    Unter Linux aus VmHWM: ``ru_maxrss`` übersteht dort ``exec`` und enthielte
+    sonst den Höchststand des Elternprozesses (der die Daten erzeugt hat).
+    """
+    peak = _status_mb("VmHWM:")
+    if peak is not None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def reset_peak():
+    """RSS-Höchststand auf den aktuellen RSS zurücksetzen (Linux); False, wenn nicht möglich."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class Timer:
+    """Summiert Laufzeiten je Stufe (auch über viele Blöcke hinweg).
+
+    ``mem_mb`` je Stufe ist der größte Speicherzuwachs eines Aufrufs; ``peak_mb``
+    der Höchststand des Prozesses über alle Stufen (das Zurücksetzen für die
+    Stufen löscht ihn sonst).
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.peak_mb = rss_mb()
+
+    def add(self, name, seconds, rows):
+        s = self.stages.setdefault(name, {"seconds": 0.0, "rows": 0})
+        s["seconds"] += seconds
+        s["rows"] += rows
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=0):
+        """Laufzeit und Speicherzuwachs des ``with``-Blocks als Stufe ``name``."""
+        self.peak_mb = max(self.peak_mb, rss_mb())
+        current = _status_mb("VmRSS:")
+        # ohne Zurücksetzen: um wie viel die Stufe den bisherigen Höchststand anhebt
+        base = current if current is not None and reset_peak() else rss_mb()
+        t0 = time.perf_counter()
+        yield
+        self.add(name, time.perf_counter() - t0, rows)
+        peak = rss_mb()
+        self.peak_mb = max(self.peak_mb, peak)
+        s = self.stages[name]
+        s["mem_mb"] = max(s.get("mem_mb", 0.0), peak - base)
+
+    def run(self, name, rows, func, *args, **kwargs):
+        with self.stage(name, rows):
+            return func(*args, **kwargs)
+
+    def result(self):
+        for s in self.stages.values():
+            s["rows_per_s"] = s["rows"] / s["seconds"] if s["seconds"] > 0 else None
+        return self.stages
+
+
+# -------------------------------------------------------
+# Daten
+# -------------------------------------------------------
+def ensure_data(n, seed=0):
+    """Synthetische Dateien einmal erzeugen und unter .cache/bench wiederverwenden."""
+    data_dir = BENCH_DIR / f"seed{seed}"
+    survey = synthetic.survey_path(data_dir, n)
+    if not survey.exists():
+        print(f"  erzeuge {survey.name} …", flush=True)
+        synthetic.write_survey(survey, n, seed)
+    statista_dir = data_dir / "statista"
+    if not statista_dir.exists():
+        synthetic.write_statista(statista_dir, seed)
+    return survey, statista_dir
+
+
+# -------------------------------------------------------
+# Stufen
+# -------------------------------------------------------
+def bench_survey(timer, path):
+    """read/clean/tokenize/count/crosstab/patterns blockweise, wie count_payment_survey & Co."""
+    from zahlungsbereitschaft.bootstrap import ResponsePatterns
+    from zahlungsbereitschaft.multiselect import (
+        CategoryCodes, MultiSelectTokenizer, binary, column_counts, crosstab_codes, grow,
+        has_category, onehot,
+    )
+    from zahlungsbereitschaft.survey import (
+        clean_column, iter_survey_chunks, map_bnpl, normalize_method,
+    )
+
+    import scipy.sparse  # noqa: F401  (Import-Zeit nicht mitmessen)
+
+    names = ["Veränderung_Warenkorb", "Aspekte", "Zahlungsarten", "BNPL_Aenderung"]
+    chunks = iter_survey_chunks(path, "AN:AQ", names, chunksize=CHUNKSIZE)
+    methods = MultiSelectTokenizer(normalize_method)
+    aspekte = MultiSelectTokenizer()
+    bnpl_codes, ver_codes = CategoryCodes(), CategoryCodes()
+    counts, asp = np.zeros(0, np.int64), np.zeros(0, np.int64)
+    ver = np.zeros(0, np.int64)
+    kreuz = np.zeros((2, 0), np.int64)
+    cooc = np.zeros((0, 0), np.int64)
+    # je Umfrage ein Mustersatz, wie bootstrap.payment_patterns/warenkorb_patterns
+    patterns = {"zahlungsarten": ResponsePatterns(), "warenkorb": ResponsePatterns()}
+    total = 0
+    while True:
+        with timer.stage("read"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        n = len(chunk)
+        total += n
+        timer.add("read", 0, n)
+
+        zahl = timer.run("clean", n, clean_column, chunk["Zahlungsarten"])
+        bnpl_txt = timer.run("clean", 0, clean_column, chunk["BNPL_Aenderung"], map_bnpl)
+        ver_txt = timer.run("clean", 0, clean_column, chunk["Veränderung_Warenkorb"])
+        asp_txt = timer.run("clean", 0, clean_column, chunk["Aspekte"])
+
+        X = timer.run("tokenize", n, methods.transform, zahl)
+        A = timer.run("tokenize", 0, aspekte.transform, asp_txt)
+        bnpl = timer.run("tokenize", 0, bnpl_codes.transform, bnpl_txt)
+        vc = timer.run("tokenize", 0, ver_codes.transform, ver_txt)
+
+        def count():
+            nonlocal counts, asp, ver
+            counts = grow(counts, X.shape[1]) + column_counts(X)
+            asp = grow(asp, A.shape[1]) + column_counts(A)
+            ver = grow(ver, len(ver_codes.vocabulary))
+            ver += np.bincount(vc[vc >= 0], minlength=len(ver))
+
+        def crosstab():
+            nonlocal kreuz, cooc
+            k, m = X.shape[1], len(bnpl_codes.vocabulary)
+            Xb = binary(X)
+            cooc = grow(grow(cooc, k).T, k).T + (Xb.T @ Xb).toarray()
+            col = methods.vocabulary.get("BNPL (Klarna)")
+            has_bnpl = has_category(X, col).astype(np.int64)
+            kreuz = grow(kreuz, m) + crosstab_codes(has_bnpl, bnpl, 2, m)
+
+        timer.run("count", n, count)
+        timer.run("crosstab", n, crosstab)
+        timer.run("patterns", n, patterns["zahlungsarten"].update, {
+            "Zahlungsart": (X.toarray(), methods.columns),
+            "BNPL": (onehot(bnpl, len(bnpl_codes.vocabulary)), bnpl_codes.labels),
+        })
+        timer.run("patterns", 0, patterns["warenkorb"].update, {
+            "Veränderung": (onehot(vc, len(ver_codes.vocabulary)), ver_codes.labels),
+            "Aspekt": (A.toarray(), aspekte.columns),
+        })
+    return total, pd.DataFrame({"Kategorie": methods.columns, "Anzahl": counts}), patterns
+
+
+def bench_backends(timer, path):
+    """Lesen + PaymentCounts/WarenkorbCounts je Backend; die Ergebnisse müssen gleich sein."""
+    from zahlungsbereitschaft import multiselect
+    from zahlungsbereitschaft.survey import PaymentCounts, WarenkorbCounts, iter_survey_chunks
+
+    names = ["Veränderung_Warenkorb", "Aspekte", "Zahlungsarten", "BNPL_Aenderung"]
+    results, default = {}, multiselect.BACKEND
+    try:
+        for backend in multiselect.BACKENDS:
+            multiselect.BACKEND = backend
+            pay, wk = PaymentCounts(), WarenkorbCounts()
+            chunks = iter_survey_chunks(path, "AN:AQ", names, chunksize=CHUNKSIZE)
+            while True:
+                with timer.stage(f"counts_{backend}"):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                timer.run(f"counts_{backend}", len(chunk), lambda: (pay.update(chunk), wk.update(chunk)))
+            results[backend] = {**pay.result(), **wk.result()}
+    finally:
+        multiselect.BACKEND = default
+    for key, value in results["pandas"].items():
+        other = results["arrow"][key]
+        if not (value == other if key == "total" else value.equals(other)):
+            raise SystemExit(f"Arrow-Backend weicht vom pandas-Pfad ab: {key}")
+
+
+def bench_store(timer, path):
+    """Kompakter Speicher: einmal bauen/schreiben, dann memory-mapped öffnen und zählen."""
+    from zahlungsbereitschaft.store import build_store, open_store, save_store
+    from zahlungsbereitschaft.taxonomy import UMFRAGE_ZU_VERGLEICH
+
+    store = timer.run("store", 0, build_store, path, CHUNKSIZE)
+    n = store.rows
+    with tempfile.TemporaryDirectory() as tmp:
+        timer.run("store", n, save_store, store, tmp)
+        del store
+        store = timer.run("store_count", 0, open_store, tmp)
+        timer.run("store_count", n, store.payment_counts)
+        timer.run("store_count", 0, store.payment_counts, UMFRAGE_ZU_VERGLEICH)
+        timer.run("store_count", 0, store.warenkorb_counts)
+        bench_cube(timer, store)
+        bench_segments(timer, store)
+        del store
+
+
+def bench_cube(timer, store):
+    """Würfel einmal verdichten, dann typische Ad-hoc-Kreuztabellen."""
+    from zahlungsbereitschaft.cube import SurveyCube
+
+    cube = timer.run("cube", store.rows, SurveyCube.from_store, store)
+    timer.run("cube", 0, lambda: cube.slice(method="Kreditkarte").by("BNPL_norm"))
+    timer.run("cube", 0, cube.by, ("Zahlungsart", "BNPL (Klarna)"), "BNPL_norm")
+    timer.run("cube", 0, cube.by, "Zahlungsart", "Aspekt")
+    bench_rake(timer, cube)
+
+
+def bench_rake(timer, cube):
+    """Raking: je Teilnehmendem (dünnbesetzt, Spalten = Zahlungsarten) und auf den Würfelmustern."""
+    from scipy import sparse
+    from zahlungsbereitschaft.weighting import rake
+
+    M = cube.members["Zahlungsart"] > 0
+    share = cube.weights @ M / cube.weights.sum()
+    targets = np.where((share > 0) & (share < 1), 0.1 + 0.8 * share[::-1], np.nan)
+    rows = np.repeat(np.arange(len(M)), cube.weights.astype(np.int64))
+    X = timer.run("rake", 0, lambda: sparse.csc_matrix(M)[rows])
+    res = timer.run("rake", X.shape[0], rake, X, targets)
+    cube_res = timer.run("rake", 0, rake, M, targets, base=cube.weights)
+    if not (res["converged"] and cube_res["converged"]):
+        raise SystemExit("Raking nicht konvergiert")
+
+
+def bench_segments(timer, store):
+    """Tabellen je Teilgruppe: Worker über Shared Memory, zum Vergleich in einem Prozess."""
+    from zahlungsbereitschaft.segments import analyze_segments, segment_frames
+
+    processes = max(2, os.cpu_count() or 1)  # auch auf einem Kern den Shared-Memory-Pfad messen
+    parallel = timer.run("segments", store.rows, analyze_segments, store, processes=processes)
+    serial = timer.run("segments_seq", store.rows, analyze_segments, store, processes=1)
+    a, b = segment_frames(parallel), segment_frames(serial)
+    for key in a:
+        if not a[key].equals(b[key]):
+            raise SystemExit(f"Teilgruppen parallel/seriell verschieden: {key}")
+
+
+def bench_panel(timer, statista_dir):
+    """Panel-Tabelle: alle Dateien kalt parsen (Pool), dann warm aus ``panel.arrow``."""
+    from zahlungsbereitschaft import ingest, panel
+    from zahlungsbereitschaft.statista import jahresvergleich_panel
+
+    saved = panel.PANEL_DIR, ingest.INGEST_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        panel.PANEL_DIR, ingest.INGEST_DIR = Path(tmp) / "panel", Path(tmp) / "ingest"
+        try:
+            n = len(panel.discover(statista_dir))
+            timer.run("panel", n, panel.load_panels, statista_dir)
+            long = timer.run("panel", 0, panel.load_panels, statista_dir)
+            timer.run("panel", 0, jahresvergleich_panel, long)
+        finally:
+            panel.PANEL_DIR, ingest.INGEST_DIR = saved
+
+
+def bench_fuzzy(timer, n=FUZZY_TOKENS, seed=0):
+    """Unscharfe Zuordnung: ``n`` verschiedene Tippfehler erst bewerten, dann aus der Tabelle."""
+    from zahlungsbereitschaft.fuzzy import FuzzyLookup
+    from zahlungsbereitschaft.survey import SURVEY_METHODS
+
+    rng = np.random.default_rng(seed)
+    words = list(SURVEY_METHODS)
+    tokens = []
+    for i in range(n):
+        w = words[i % len(words)]
+        j = int(rng.integers(len(w)))
+        tokens.append(f"{w[:j]}{chr(97 + int(rng.integers(26)))}{w[j + 1:]} {i}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "fuzzy.jsonl"
+        lookup = FuzzyLookup(SURVEY_METHODS, path=path)
+        timer.run("fuzzy", n, lambda: [lookup(t) for t in tokens])
+        lookup = timer.run("fuzzy", 0, FuzzyLookup, SURVEY_METHODS, path=path)
+        timer.run("fuzzy", n, lambda: [lookup(t) for t in tokens])
+
+
+def bench_bootstrap(timer, patterns):
+    """Bootstrap-Intervalle aller Anteile (Zeilen = Stichproben, über alle Prozesse)."""
+    from zahlungsbereitschaft.bootstrap import bootstrap_shares
+
+    for pat in patterns.values():
+        timer.run("bootstrap", BOOT_RESAMPLES, bootstrap_shares, pat, BOOT_RESAMPLES)
+
+
+def bench_tables(timer, total, method_counts, statista_dir, n_years):
+    from zahlungsbereitschaft import ingest
+    from zahlungsbereitschaft.statista import (
+        compare_survey_vs_statista, jahresvergleich, load_statista, vergleichsanteile,
+    )
+    from zahlungsbereitschaft.stats import (
+        P0_GRID, binomial_grid, binomial_power, chi2_batch, chi2_survey_vs_statista,
+        permutation_batch, survey_vs_statista_counts,
+    )
+    from zahlungsbereitschaft.deflation import PriceIndex
+    from zahlungsbereitschaft.survey import UMFRAGE_ZU_VERGLEICH
+    from zahlungsbereitschaft.warenkorb import (
+        build_cpi, clean_warenkorb, merge_real, warenkorb_metrics, warenkorb_windows,
+    )
+
+    # Statista: Excel ohne Cache parsen + Normalisierung über die Taxonomie
+    ingest.ENABLED = False
+    frames = timer.run("statista", 3, load_statista, statista_dir)
+    ingest.ENABLED = True
+    timer.run("statista", 0, jahresvergleich, frames)
+    bench_panel(timer, statista_dir)
+
+    # chi²: Umfrage (auf Vergleichskategorien abgebildet) vs. Statista 2023
+    import scipy.stats  # noqa: F401  (Import-Zeit nicht mitmessen)
+
+    vergleich = method_counts.assign(
+        Kategorie=[UMFRAGE_ZU_VERGLEICH.get(k.lower(), k) for k in method_counts["Kategorie"]]
+    ).groupby("Kategorie", as_index=False, sort=False)["Anzahl"].sum()
+    plotdf = compare_survey_vs_statista(vergleich, total, vergleichsanteile(frames[2023], 2023))
+    for _ in range(20):
+        timer.run("chi2", 1, chi2_survey_vs_statista, plotdf, total)
+
+    # viele Segmente auf einmal: Umfrage-Anteile verrauscht, Segmentgrößen 20–400
+    rng = np.random.default_rng(0)
+    pct = np.clip(plotdf["pct_umfrage"].to_numpy() + rng.normal(0, 5, (SEGMENTS, len(plotdf))), 0, 100)
+    tables = survey_vs_statista_counts(pct, plotdf["pct_2023"], rng.integers(20, 400, SEGMENTS))
+    timer.run("chi2_batch", SEGMENTS, chi2_batch, tables)
+    timer.run("permutation", PERM_TABLES, permutation_batch, tables[:PERM_TABLES], PERMUTATIONS)
+
+    # Binomialtests: alle Segmente × Referenzwerte p0, dazu Power-Kurven
+    n_seg = tables[:, 0].sum(axis=1)
+    k_seg = np.rint(n_seg * rng.uniform(0.3, 0.7, SEGMENTS))
+    timer.run("binom_grid", SEGMENTS * len(P0_GRID), binomial_grid, k_seg, n_seg)
+    timer.run("binom_grid", 0, binomial_power)
+
+    # CPI-Deflationierung und CAGR auf langen Reihen
+    raw = synthetic.warenkorb_frames(n_years)
+    clean = timer.run("cpi", n_years, clean_warenkorb, raw)
+    lm, bekl, food = clean["lm"], clean["bekl"], clean["food"]
+    cpi = timer.run("cpi", 0, build_cpi, clean["inflation"], lm, bekl, food)
+    df = timer.run("cpi", 0, merge_real, cpi, lm, bekl, food)
+
+    # breite Matrix: Monate × Reihen, je Region ein eigener Index
+    months = pd.period_range("1975-01", periods=DEFLATE_MONTHS, freq="M")
+    regions = [f"R{r}" for r in range(DEFLATE_REGIONS)]
+    index = PriceIndex.from_rates(months, rng.normal(0.2, 0.3, (DEFLATE_MONTHS, DEFLATE_REGIONS)),
+                                  columns=regions)
+    nominal = pd.DataFrame(rng.uniform(50, 150, (DEFLATE_MONTHS, DEFLATE_SERIES)), index=months,
+                           columns=pd.MultiIndex.from_arrays(
+                               [np.resize(regions, DEFLATE_SERIES), range(DEFLATE_SERIES)],
+                               names=["Region", "Reihe"]))
+    timer.run("deflate", DEFLATE_MONTHS * DEFLATE_SERIES, index.deflate, nominal, column_level="Region")
+    timer.run("deflate", 0, index.rebase(months[-1]).deflate, nominal, column_level="Region")
+    timer.run("cagr", len(df), warenkorb_metrics, df, years=len(df))
+    timer.run("cagr", 0, warenkorb_metrics, df, years=5)
+    tail = df.tail(WINDOW_YEARS)
+    timer.run("cagr", len(tail) * (len(tail) - 1) // 2, warenkorb_windows, tail)
+    bench_memo(timer, len(df), merge_real, cpi, lm, bekl, food)
+    return plotdf, df
+
+
+def bench_series(timer, n, seed=0):
+    """Reihen-Speicher: partitioniert schreiben, dann die letzten 5 Jahre weniger Reihen lesen
+    (Zeilen = Größe des Speichers); zum Vergleich alles lesen und in pandas filtern."""
+    from zahlungsbereitschaft.timeseries import write_series
+
+    long = synthetic.retail_series(n, seed)
+    reihen, regionen = list(long["Reihe"].cat.categories[:2]), ["R00", "R01"]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = timer.run("series_write", len(long), write_series, long, tmp)
+        start = store.last_year() - 4
+        if store.files(start=start) != 5 * 12:
+            raise SystemExit("Reihen-Speicher: Zeitfenster nicht auf die Partitionen gedrückt")
+        timer.run("series_read", len(long), store.wide, start=start, series=reihen, regions=regionen)
+
+        def scan():
+            df = store.read()
+            return df[(df["Jahr"] >= start) & df["Reihe"].isin(reihen) & df["Region"].isin(regionen)]
+
+        timer.run("series_scan", len(long), scan)
+        del store
+
+
+def bench_memo(timer, rows, func, *args):
+    """Memo-Cache: einmal rechnen und ablegen (Fehlschlag), dann lesen (Treffer)."""
+    from zahlungsbereitschaft import memo
+
+    saved = memo.MEMO_DIR, memo.BUDGET_MB
+    with tempfile.TemporaryDirectory() as tmp:
+        memo.MEMO_DIR, memo.BUDGET_MB = Path(tmp), 256
+        try:
+            timer.run("memo", rows, func, *args)
+            timer.run("memo", rows, func, *args)
+        finally:
+            memo.MEMO_DIR, memo.BUDGET_MB = saved
+
+
+def bench_plots(timer, plotdf, df):
+    os.environ["ZB_HEADLESS"] = "1"
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+    import matplotlib.pyplot  # noqa: F401  (Import-Zeit nicht mitmessen)
+
+    from zahlungsbereitschaft import plots
+    from zahlungsbereitschaft.render import FigureSpec, render
+    from zahlungsbereitschaft.warenkorb import last_years
+
+    with tempfile.TemporaryDirectory() as tmp:
+        specs = [
+            FigureSpec(Path(tmp) / "vergleich.png", plots.umfrage_vs_statista, {"plotdf": plotdf}),
+            FigureSpec(Path(tmp) / "lm.png", plots.lm_nominal_real, {"df": df}),
+            FigureSpec(Path(tmp) / "index.png", plots.warenkorb_index, {"df5": last_years(df)}),
+        ]
+        timer.run("plot", len(specs), render, specs, processes=1, force=True)
+
+
+def run_size(label, seed=0):
+    """Alle Stufen für eine Größe (im Kindprozess)."""
+    n = SIZES[label]
+    survey, statista_dir = ensure_data(n, seed)  # im Elternprozess bereits erzeugt
+    timer = Timer()
+    # die Stufen messen die Rechnung, nicht den Memo-Cache (eigene Stufe "memo")
+    from zahlungsbereitschaft import memo
+
+    memo.BUDGET_MB = 0
+    total, method_counts, patterns = bench_survey(timer, survey)
+    bench_backends(timer, survey)
+    bench_store(timer, survey)
+    bench_fuzzy(timer)
+    bench_bootstrap(timer, patterns)
+    plotdf, df = bench_tables(timer, total, method_counts, statista_dir, min(n, MAX_YEARS))
+    bench_series(timer, n, seed)
+    bench_plots(timer, plotdf, df)
+    return {"n": n, "file": survey.name, "stages": timer.result(),
+            "peak_rss_mb": max(timer.peak_mb, rss_mb())}
+
+
+def cold_start():
+    """Kaltstart eines Tabellen-Laufs (echte Daten, Excel-Cache vorher gewärmt)."""
+    from zahlungsbereitschaft.tables import COLD_START_TARGET_S, HEAVY_MODULES
+
+    probe = ("import runpy, sys; sys.argv = ['zb', '--tables'];"
+             "runpy.run_module('zahlungsbereitschaft', run_name='__main__');"
+             f"print('HEAVY', [m for m in {HEAVY_MODULES!r} if m in sys.modules], file=sys.stderr)")
+    cmd = [sys.executable, "-c", probe]
+    subprocess.run(cmd, cwd=ROOT, capture_output=True, check=True)  # Cache wärmen
+    times = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - t0)
+    heavy = proc.stderr.strip().splitlines()[-1]
+    return {"seconds": float(np.median(times)), "target_s": COLD_START_TARGET_S,
+            "heavy_modules": heavy.removeprefix("HEAVY ")}
+
+
+# -------------------------------------------------------
+# Vergleich mit der Baseline
+# -------------------------------------------------------
+def compare(result, baseline, tolerance):
+    """Liste der Regressionen (leer = alles im Rahmen)."""
+    problems = []
+    for label, cur in result["sizes"].items():
+        ref = baseline.get("sizes", {}).get(label)
+        if ref is None:
+            continue
+        for stage, s in cur["stages"].items():
+            r = ref["stages"].get(stage)
+            if r is None:
+                continue
+            if s["seconds"] > r["seconds"] * (1 + tolerance) and s["seconds"] - r["seconds"] > MIN_SECONDS:
+                problems.append(f"{label}/{stage}: {s['seconds']:.3f}s statt {r['seconds']:.3f}s "
+                                f"(+{s['seconds'] / r['seconds'] - 1:.0%})")
+            mem, ref_mem = s.get("mem_mb"), r.get("mem_mb")
+            if (mem is not None and ref_mem is not None and mem > ref_mem * (1 + tolerance)
+                    and mem - ref_mem > MIN_RSS_MB):
+                problems.append(f"{label}/{stage}: +{mem:.0f} MB statt +{ref_mem:.0f} MB Speicher")
+        if (cur["peak_rss_mb"] > ref["peak_rss_mb"] * (1 + tolerance)
+                and cur["peak_rss_mb"] - ref["peak_rss_mb"] > MIN_RSS_MB):
+            problems.append(f"{label}/peak_rss: {cur['peak_rss_mb']:.0f} MB statt "
+                            f"{ref['peak_rss_mb']:.0f} MB")
+    cs = result.get("cold_start")
+    if cs:
+        if cs["seconds"] > cs["target_s"]:
+            problems.append(f"cold_start: {cs['seconds']:.2f}s > Ziel {cs['target_s']:.2f}s")
+        if cs["heavy_modules"] != "[]":
+            problems.append(f"cold_start: Tabellen-Lauf lädt {cs['heavy_modules']}")
+    return problems
+
+
+def print_result(result):
+    for label, cur in result["sizes"].items():
+        print(f"\n{label} ({cur['n']:,} Teilnehmende, {cur['file']}), "
+              f"Spitzen-RSS {cur['peak_rss_mb']:.0f} MB")
+        for stage, s in cur["stages"].items():
+            rate = f"{s['rows_per_s']:>14,.0f} Zeilen/s" if s["rows_per_s"] else ""
+            print(f"  {stage:<13} {s['seconds']:>9.3f}s {rate}  +{s['mem_mb']:.0f} MB")
+    cs = result.get("cold_start")
+    if cs:
+        print(f"\nKaltstart --tables: {cs['seconds']:.2f}s (Ziel {cs['target_s']:.2f}s), "
+              f"schwere Module: {cs['heavy_modules']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k", help="Kommagetrennt aus " + ",".join(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.30,
+                        help="erlaubte relative Verschlechterung (Standard 0.30)")
+    parser.add_argument("--no-cold-start", action="store_true")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_size(args.child, args.seed)))
+        return
+
+    result = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "datum": time.strftime("%Y-%m-%d %H:%M"),
+        },
+        "sizes": {},
+    }
+    for label in args.sizes.split(","):
+        if label not in SIZES:
+            parser.error(f"unbekannte Größe {label!r}")
+        print(f"[{label}] …", flush=True)
+        ensure_data(SIZES[label], args.seed)
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", label, "--seed", str(args.seed)],
+            stdout=subprocess.PIPE, text=True, check=True,
+        )
+        result["sizes"][label] = json.loads(proc.stdout.strip().splitlines()[-1])
+    if not args.no_cold_start:
+        result["cold_start"] = cold_start()
+
+    print_result(result)
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    (BENCH_DIR / "last.json").write_text(json.dumps(result, indent=1), encoding="utf-8")
+
+    if args.update_baseline:
+        if args.baseline.exists():
+            # andere Größen aus der alten Baseline behalten
+            old = json.loads(args.baseline.read_text(encoding="utf-8"))
+            result["sizes"] = {**old.get("sizes", {}), **result["sizes"]}
+        args.baseline.write_text(json.dumps(result, indent=1), encoding="utf-8")
+        print(f"\nBaseline gespeichert: {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"\nKeine Baseline ({args.baseline}); nichts verglichen. "
+              "Mit --update-baseline anlegen.", file=sys.stderr)
+        sys.exit(NO_BASELINE)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    compared = [label for label in result["sizes"] if label in baseline.get("sizes", {})]
+    for label in result["sizes"]:
+        if label not in compared:
+            print(f"\n{label}: nicht in der Baseline, nicht verglichen.")
+    problems = compare(result, baseline, args.tolerance)
+    if problems:
+        print("\n" + "\n".join(f"REGRESSION {p}" for p in problems), file=sys.stderr)
+        sys.exit(1)
+    if not compared:
+        print("\nKeine der gemessenen Größen in der Baseline; nichts verglichen.", file=sys.stderr)
+        sys.exit(NO_BASELINE)
+    print(f"\nKeine Regression gegenüber der Baseline ({', '.join(compared)}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Synthetische Umfrage- und Statista-Daten für die Benchmarks.
+
+Die Umfrage hat dieselbe Spaltenlage wie der Forms-Export (B: Startzeit,
+G–I: Alter, Geschlecht, Kaufhäufigkeit, AN: Veränderung des Warenkorbs,
+AO: Aspekte, AP: Zahlungsarten, AQ: BNPL), mit
+Semikolon-getrennten Mehrfachantworten inkl. abschließendem ``;``,
+Freitext-Varianten ("Buy now pay later", "Kryptowährung"), gelegentlichen
+NBSP und fehlenden Antworten. Kleine Umfragen werden als ``.xlsx``
+geschrieben, große als ``.csv`` (Excel fasst höchstens 1 048 576 Zeilen, und
+schon bei 1 Mio. Zeilen misst man fast nur noch den XML-Parser).
+
+Alle Generatoren sind über ``seed`` reproduzierbar und arbeiten blockweise,
+damit auch 10 Mio. Zeilen mit konstantem Speicher entstehen.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from zahlungsbereitschaft.statista import EINZELHANDEL_FILE, EINZELHANDEL_NAMES, online_file
+from zahlungsbereitschaft.survey import map_bnpl
+from zahlungsbereitschaft.taxonomy import STATISTA_LABELS
+from zahlungsbereitschaft.warenkorb import ORDER_ASPEKTE, ORDER_VERAENDERUNG, QUELLEN
+
+EXCEL_MAX_ROWS = 1_048_576
+ONLINE_YEARS = (2023, 2021, 2019)  # synthetische Online-Erhebungen
+XLSX_MAX_N = 100_000  # darüber CSV
+N_COLUMNS = 43  # A … AQ
+COL_AN = 39
+COL_STARTZEIT, COL_ALTER = 1, 6  # B, G (danach H Geschlecht, I Kaufhäufigkeit)
+SURVEY_VERSION = 2  # 2: mit Startzeit, Alter, Geschlecht, Kaufhäufigkeit
+
+# Zahlungsart -> Wahrscheinlichkeit, regelmäßig genutzt zu werden (grob wie die echte Umfrage)
+METHODS = {
+    "PayPal": 0.80,
+    "Kreditkarte": 0.41,
+    "Rechnung": 0.33,
+    "Lastschrift": 0.33,
+    "Sofortüberweisung": 0.15,
+    "BNPL (Klarna)": 0.13,
+    "Apple Pay": 0.05,
+    "Buy now pay later (z. B. Klarna)": 0.02,
+    "Kryptowährungen": 0.02,
+}
+ASPEKTE = dict(zip(ORDER_ASPEKTE, [0.74, 0.38, 0.41, 0.36, 0.20, 0.05, 0.01]))
+VERAENDERUNG = dict(zip(ORDER_VERAENDERUNG, [0.28, 0.38, 0.23, 0.08, 0.03]))
+BNPL_ANTWORTEN = list(map_bnpl)  # häufiger, gleich, seltener, nie
+BNPL_P = {True: [0.35, 0.30, 0.30, 0.05], False: [0.08, 0.02, 0.05, 0.85]}
+P_MISSING = 0.01
+ALTER = {"18-24": 0.3, "25-34": 0.25, "35-44": 0.2, "45-54": 0.12, "55-64": 0.08,
+         "65 oder älter": 0.05}
+GESCHLECHT = {"Weiblich": 0.5, "Männlich": 0.47, "Divers": 0.01, "Keine Angabe": 0.02}
+HAEUFIGKEIT = {"Täglich": 0.05, "Mehrmals pro Woche": 0.15, "Wöchentlich": 0.25,
+               "Mehrmals im Monat": 0.3, "Monatlich oder seltener": 0.25}
+
+FRAGEN = {
+    COL_AN: "Wie hat sich Ihr durchschnittlicher Einkaufswert bei Online-Bestellungen "
+            "in den letzten fünf Jahren verändert?",
+    COL_AN + 1: "Für welche dieser Aspekte sind Sie heute eher bereit, einen höheren Preis zu zahlen?",
+    COL_AN + 2: "Welche der folgenden Zahlungsarten nutzen Sie beim Online-Kauf regelmäßig?",
+    COL_AN + 3: "Wie hat sich Ihre Nutzung von „Buy Now Pay Later“-Angeboten (z. B. Klarna) "
+                "in den letzten Jahren verändert?",
+}
+
+
+def survey_path(folder, n):
+    suffix = ".xlsx" if n <= XLSX_MAX_N else ".csv"
+    return Path(folder) / f"umfrage_v{SURVEY_VERSION}_{n}{suffix}"
+
+
+def _multiselect(rng, options, n):
+    """Bernoulli-Auswahl je Option -> "a;b;c;" (Masken-Strings nur einmal gebaut)."""
+    labels = list(options)
+    p = np.array(list(options.values()))
+    picked = rng.random((n, len(labels))) < p
+    masks = picked @ (1 << np.arange(len(labels)))
+    # zwei Reihenfolgen je Maske, wie bei Klick-Reihenfolgen im Formular
+    table = np.empty((2, 1 << len(labels)), dtype=object)
+    for m in range(1 << len(labels)):
+        chosen = [labels[i] for i in range(len(labels)) if m >> i & 1]
+        table[0, m] = "".join(f"{c};" for c in chosen)
+        table[1, m] = "".join(f"{c};" for c in reversed(chosen))
+    out = table[rng.integers(0, 2, n), masks]
+    return out, picked
+
+
+def survey_frame(n, seed=0, offset=0):
+    """``n`` synthetische Teilnehmende als DataFrame mit 43 Spalten (A … AQ)."""
+    rng = np.random.default_rng([seed, offset])
+    zahlungsarten, picked = _multiselect(rng, METHODS, n)
+    bnpl_spalten = [i for i, m in enumerate(METHODS) if "Klarna" in m]
+    bnpl_gewaehlt = picked[:, bnpl_spalten].any(axis=1)
+    bnpl = np.where(
+        bnpl_gewaehlt,
+        rng.choice(BNPL_ANTWORTEN, n, p=BNPL_P[True]),
+        rng.choice(BNPL_ANTWORTEN, n, p=BNPL_P[False]),
+    ).astype(object)
+    aspekte, _ = _multiselect(rng, ASPEKTE, n)
+    ver = rng.choice(list(VERAENDERUNG), n, p=list(VERAENDERUNG.values())).astype(object)
+
+    # gelegentlich geschützte Leerzeichen (wie im Forms-Export)
+    nbsp = rng.random(n) < 0.01
+    zahlungsarten[nbsp] = ["\xa0" + z for z in zahlungsarten[nbsp]]
+
+    data = {i: np.full(n, None, dtype=object) for i in range(N_COLUMNS)}
+    data[0] = np.arange(offset + 1, offset + n + 1)
+    # Merkmale für Teilgruppen aus einem eigenen Zufallsstrom (AN:AQ bleiben wie gehabt)
+    seg = np.random.default_rng([seed, offset, 1])
+    start = pd.Timestamp("2025-01-01") + pd.to_timedelta(seg.integers(0, 180 * 86_400, n), unit="s")
+    data[COL_STARTZEIT] = start.strftime("%Y-%m-%d %H:%M:%S").to_numpy(dtype=object)
+    for col, options in ((COL_ALTER, ALTER), (COL_ALTER + 1, GESCHLECHT), (COL_ALTER + 2, HAEUFIGKEIT)):
+        data[col] = seg.choice(list(options), n, p=list(options.values())).astype(object)
+    for col, values in zip(range(COL_AN, COL_AN + 4), (ver, aspekte, zahlungsarten, bnpl)):
+        values[rng.random(n) < P_MISSING] = None
+        values[values == ""] = None
+        data[col] = values
+    df = pd.DataFrame(data)
+    df.columns = ["ID"] + [FRAGEN.get(i, f"Frage {i}") for i in range(1, N_COLUMNS)]
+    return df
+
+
+def write_survey(path, n, seed=0, chunksize=500_000):
+    """Synthetische Umfrage nach ``path`` schreiben (.xlsx oder .csv), blockweise."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    if path.suffix == ".csv":
+        for i, start in enumerate(range(0, n, chunksize)):
+            chunk = survey_frame(min(chunksize, n - start), seed, start)
+            chunk.to_csv(tmp, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    else:
+        if n >= EXCEL_MAX_ROWS:
+            raise ValueError(f"{n} Zeilen passen nicht in ein Excel-Blatt, .csv verwenden")
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Sheet1")
+        header = None
+        for start in range(0, n, chunksize):
+            chunk = survey_frame(min(chunksize, n - start), seed, start)
+            if header is None:
+                header = list(chunk.columns)
+                ws.append(header)
+            for row in chunk.itertuples(index=False):
+                ws.append(list(row))
+        wb.save(tmp)
+    tmp.replace(path)
+    return path
+
+
+# -------------------------------------------------------
+# Statista
+# -------------------------------------------------------
+def _statista_sheet(wb, title, header, rows):
+    """Layout der Statista-Downloads: Blatt 2, vier Titelzeilen, Daten ab Spalte B."""
+    wb.create_sheet("Übersicht").append(["Synthetische Daten"])
+    ws = wb.create_sheet("Daten")
+    ws.append([None, title])
+    for _ in range(3):
+        ws.append([])
+    ws.append([None, *header])
+    for row in rows:
+        ws.append([None, *row])
+
+
+def write_statista_year(path, year, seed=0):
+    """Online-Zahlungsarten eines Jahres mit den echten Bezeichnungen des Jahres."""
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng([seed, year])
+    labels = list(STATISTA_LABELS[year])
+    pct = np.round(rng.uniform(1, 70, len(labels)), 1)
+    wb = Workbook(write_only=True)
+    _statista_sheet(wb, f"Online-Zahlungsarten {year}", ["", "Anteil"], zip(labels, pct))
+    wb.save(path)
+    return path
+
+
+def write_einzelhandel(path, seed=0, years=range(2016, 2025)):
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng([seed, 1])
+    rows = [[year, *np.round(rng.uniform(0.5, 50, len(EINZELHANDEL_NAMES) - 1), 1)] for year in years]
+    wb = Workbook(write_only=True)
+    _statista_sheet(wb, "Anteile von Zahlungsarten", EINZELHANDEL_NAMES, rows)
+    wb.save(path)
+    return path
+
+
+def warenkorb_frames(n_years=23, seed=0, first_year=2002):
+    """Rohe Warenkorb-Reihen wie :func:`zahlungsbereitschaft.warenkorb.load_warenkorb`.
+
+    Inflationsjahre 2000–2099 im Statista-Format "'05"; Inflation schwankt um 0 %,
+    damit auch sehr lange Reihen nicht überlaufen.
+    """
+    rng = np.random.default_rng([seed, n_years])
+    jahre = np.arange(first_year, first_year + n_years)
+    inflation_jahre = [f"'{j % 100:02d}" if 2000 <= j < 2100 else str(j) for j in jahre]
+    frames = {}
+    for name, (_, names) in QUELLEN.items():
+        if name == "inflation":
+            values = rng.normal(0.0, 1.0, n_years).round(1)
+            frames[name] = pd.DataFrame({names[0]: inflation_jahre, names[1]: values})
+        else:
+            values = 100 * np.exp(np.cumsum(rng.normal(0.02, 0.03, n_years)))
+            frames[name] = pd.DataFrame({names[0]: jahre, names[1]: values.round(2)})
+    return frames
+
+
+def retail_series(n, seed=0, first_year=1995, n_years=30, n_regions=16):
+    """Monatliche Umsatzreihen je Region und Warengruppe im langen Format von
+    :mod:`zahlungsbereitschaft.timeseries` (rund ``n`` Zeilen)."""
+    rng = np.random.default_rng([seed, n])
+    per_series = 12 * n_years
+    n_cat = max(1, -(-n // (per_series * n_regions)))
+    n_series = n_cat * n_regions
+    wachstum = rng.normal(0.001, 0.01, (per_series, n_series))
+    werte = 100 * np.exp(np.cumsum(wachstum, axis=0))  # Monate × Reihen
+    monate = np.arange(per_series)
+    return pd.DataFrame({
+        "Reihe": pd.Categorical.from_codes(np.tile(np.repeat(np.arange(n_cat), n_regions), per_series),
+                                           [f"K{c:04d}" for c in range(n_cat)]),
+        "Region": pd.Categorical.from_codes(np.tile(np.arange(n_regions), per_series * n_cat),
+                                            [f"R{r:02d}" for r in range(n_regions)]),
+        "Jahr": np.repeat(first_year + monate // 12, n_series),
+        "Monat": np.repeat(monate % 12 + 1, n_series),
+        "Wert": werte.ravel().round(2),
+    })
+
+
+def write_statista(folder, seed=0):
+    """Alle Online-Zahlungsarten-Jahre + Einzelhandel in ``folder`` schreiben."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    for year in ONLINE_YEARS:
+        write_statista_year(folder / online_file(year), year, seed)
+    write_einzelhandel(folder / EINZELHANDEL_FILE, seed)
+    return folder
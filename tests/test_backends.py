@@ -0,0 +1,61 @@
+"""Beide String-Backends (pandas, arrow) liefern dieselben Zählungen und Kreuztabellen."""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from zahlungsbereitschaft import multiselect
+from zahlungsbereitschaft.survey import (
+    WARENKORB_COLS, WARENKORB_NAMES, ZAHLUNGSARTEN_COLS, ZAHLUNGSARTEN_NAMES, count_payment_survey,
+    count_warenkorb_survey, iter_survey_chunks,
+)
+from zahlungsbereitschaft.taxonomy import UMFRAGE_ZU_VERGLEICH
+from zahlungsbereitschaft.warenkorb import ORDER_ASPEKTE, ORDER_VERAENDERUNG
+
+UMFRAGE = ROOT / "Online Zahlungsarten" / "Umfrage.xlsx"
+CHUNKSIZES = [7, 100_000]  # kleine Blöcke: Vokabular wächst über Blockgrenzen
+
+
+@pytest.fixture(params=["xlsx", "csv"])
+def export(request, tmp_path):
+    """Der eingecheckte Export, einmal als xlsx und einmal als CSV (eigener Arrow-Leser)."""
+    if request.param == "xlsx":
+        return UMFRAGE
+    path = tmp_path / "umfrage.csv"
+    pd.read_excel(UMFRAGE).to_csv(path, index=False)
+    return path
+
+
+def _counts(backend, monkeypatch, func, path, usecols, names, chunksize, **kwargs):
+    monkeypatch.setattr(multiselect, "BACKEND", backend)
+    return func(iter_survey_chunks(path, usecols, names, chunksize), **kwargs)
+
+
+def _assert_equal(a, b):
+    assert a.keys() == b.keys()
+    for key, value in a.items():
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            pd.testing.assert_frame_equal(pd.DataFrame(value), pd.DataFrame(b[key]))
+        else:
+            assert value == b[key], key
+
+
+@pytest.mark.parametrize("chunksize", CHUNKSIZES)
+@pytest.mark.parametrize("mapping", [None, UMFRAGE_ZU_VERGLEICH], ids=["fein", "vergleich"])
+def test_zahlungsarten(export, chunksize, mapping, monkeypatch):
+    args = (count_payment_survey, export, ZAHLUNGSARTEN_COLS, ZAHLUNGSARTEN_NAMES, chunksize)
+    pandas = _counts("pandas", monkeypatch, *args, mapping=mapping)
+    arrow = _counts("arrow", monkeypatch, *args, mapping=mapping)
+    assert pandas["total"] > 0 and pandas["kreuz"].to_numpy().sum() == pandas["total"]
+    _assert_equal(pandas, arrow)
+
+
+@pytest.mark.parametrize("chunksize", CHUNKSIZES)
+def test_warenkorb(export, chunksize, monkeypatch):
+    args = (count_warenkorb_survey, export, WARENKORB_COLS, WARENKORB_NAMES, chunksize)
+    kwargs = {"order_veraenderung": ORDER_VERAENDERUNG, "order_aspekte": ORDER_ASPEKTE}
+    _assert_equal(_counts("pandas", monkeypatch, *args, **kwargs),
+                  _counts("arrow", monkeypatch, *args, **kwargs))
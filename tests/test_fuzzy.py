@@ -0,0 +1,37 @@
+"""Unscharfe Zuordnung: Tippfehler ja, Teilwörter und Synonyme nicht als Tippfehler."""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from zahlungsbereitschaft import fuzzy
+from zahlungsbereitschaft.survey import SURVEY_METHODS, normalize_method
+from zahlungsbereitschaft.taxonomy import UMFRAGE_ZU_VERGLEICH
+
+
+@pytest.fixture(autouse=True)
+def fuzzy_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(fuzzy, "FUZZY_DIR", tmp_path / "fuzzy")
+    monkeypatch.setattr(fuzzy, "_LOOKUPS", {})
+
+
+@pytest.mark.parametrize("token, fein, vergleich", [
+    ("Überweisung", "Überweisung", "Überweisung/Online-Transfer"),
+    ("Banküberweisung", "Überweisung", "Überweisung/Online-Transfer"),
+    ("Sofortüberweisung", "Sofortüberweisung", "Überweisung/Online-Transfer"),
+    ("Paypl", "PayPal", "E-Wallet"),
+])
+def test_normalize_method(token, fein, vergleich):
+    assert normalize_method(token) == fein
+    assert normalize_method(token, UMFRAGE_ZU_VERGLEICH) == vergleich
+
+
+def test_teilwort_kein_tippfehler():
+    lookup = fuzzy.FuzzyLookup({"sofortüberweisung": "Sofortüberweisung"}, path=None)
+    assert lookup("überweisung") is None
+    assert lookup("sofortueberweisung") == "Sofortüberweisung"
+    # auch im Standard-Mapping: "pay" ist kein verschriebenes "paypal"
+    assert normalize_method("Pay") == "Pay"
+    assert fuzzy.FuzzyLookup(SURVEY_METHODS, path=None)("pay") is None
@@ -0,0 +1,54 @@
+"""Ein neues Statista-Jahr mit unbekannter Bezeichnung bricht das Panel nicht ab."""
+import logging
+import shutil
+import sys
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from zahlungsbereitschaft import ingest, memo, panel
+from zahlungsbereitschaft.statista import jahresvergleich_panel, online_file
+
+ONLINE = ROOT / "Online Zahlungsarten"
+NEU = "Apple Pay"  # nicht in taxonomy.STATISTA_LABELS
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    """2023 und ein „2025“ (Kopie von 2023, erste Bezeichnung durch ``NEU`` ersetzt)."""
+    monkeypatch.setattr(panel, "PANEL_DIR", tmp_path / "cache" / "panel")
+    monkeypatch.setattr(ingest, "INGEST_DIR", tmp_path / "cache" / "ingest")
+    monkeypatch.setattr(memo, "MEMO_DIR", tmp_path / "cache" / "memo")
+    folder = tmp_path / "statista"
+    folder.mkdir()
+    shutil.copy(ONLINE / online_file(2023), folder / online_file(2023))
+    wb = openpyxl.load_workbook(ONLINE / online_file(2023))
+    ws = wb.worksheets[1]
+    row = next(r for r in ws.iter_rows(min_row=6, min_col=2, max_col=3) if r[0].value)
+    row[0].value = NEU
+    wb.save(folder / online_file(2025))
+    return folder, row[1].value
+
+
+def test_unbekannte_bezeichnung(folder, caplog):
+    folder, pct = folder
+    with caplog.at_level(logging.WARNING, logger=panel.__name__):
+        long = panel.load_panels(folder, processes=1)
+    assert NEU in caplog.text
+    assert sorted(long["Jahr"].unique()) == [2023, 2025]
+    neu = long[long["Kategorie"] == NEU]
+    assert neu[["Jahr", "pct"]].values.tolist() == [[2025, pct]]
+    # die übrigen Bezeichnungen von 2025 laufen wie gehabt über die Taxonomie
+    a, b = (long[long["Jahr"] == year].set_index("Kategorie")["pct"] for year in (2023, 2025))
+    rest = b.drop(NEU)
+    assert rest.equals(a.loc[rest.index])
+
+    merged = jahresvergleich_panel(long)
+    assert [c for c in merged.columns if c.startswith("pct_")] == ["pct_2025", "pct_2023"]
+    assert NEU not in set(merged["Kategorie"])
+
+    # zweiter Lauf aus dem Panel-Cache
+    assert panel.load_panels(folder, processes=1).equals(long)
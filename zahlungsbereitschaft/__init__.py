@@ -0,0 +1,69 @@
+"""Gemeinsame Bausteine für die Auswertungen in
+"Online Zahlungsarten" und "Steigender Warenkorbwert".
+
+Die Analyse-Funktionen sind direkt importierbar, z. B.::
+
+    from zahlungsbereitschaft import load_statista, survey_counts, warenkorb_metrics
+
+Untermodule werden erst beim ersten Zugriff geladen; SciPy und Matplotlib
+nur, wenn ein Test bzw. eine Abbildung tatsächlich gebraucht wird.
+"""
+import importlib
+
+# öffentlicher Name -> Untermodul
+_API = {
+    "cache_report": "ingest",
+    "cache_stats": "ingest",
+    "read_excel_cached": "ingest",
+    "load_statista": "statista",
+    "load_einzelhandel": "statista",
+    "load_panels": "panel",
+    "panel_report": "panel",
+    "jahresvergleich_panel": "statista",
+    "jahresvergleich": "statista",
+    "vergleichsanteile": "statista",
+    "compare_survey_vs_statista": "statista",
+    "survey_counts": "survey",
+    "survey_intervals": "bootstrap",
+    "survey_store": "store",
+    "survey_cube": "cube",
+    "load_warenkorb": "warenkorb",
+    "warenkorb_table": "warenkorb",
+    "warenkorb_metrics": "warenkorb",
+    "warenkorb_growth": "warenkorb",
+    "warenkorb_windows": "warenkorb",
+    "series_store": "timeseries",
+    "write_series": "timeseries",
+    "open_series": "timeseries",
+    "PriceIndex": "deflation",
+    "chi2_survey_vs_statista": "stats",
+    "chi2_batch": "stats",
+    "permutation_batch": "stats",
+    "survey_vs_statista_batch": "stats",
+    "binomial_tests": "stats",
+    "binomial_grid": "stats",
+    "binomial_power": "stats",
+    "rake": "weighting",
+    "survey_weights": "weighting",
+    "survey_weighting": "weighting",
+    "analyze_segments": "segments",
+    "write_segments": "segments",
+    "summary_tables": "tables",
+    "run": "pipeline",
+    "ReportServer": "server",
+}
+
+__all__ = sorted(_API)
+
+
+def __getattr__(name):
+    module = _API.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_API))
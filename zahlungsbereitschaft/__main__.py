@@ -0,0 +1,83 @@
+"""Einstiegspunkt: ``python -m zahlungsbereitschaft [--force] [--jobs N] [--list] [--tables] [stufe ...]``.
+
+``--append CHARGE ...`` zählt neue Umfrage-Antworten in den gespeicherten
+Zählstand ein und schreibt die Umfrage-CSVs daraus neu (siehe :mod:`.aggregate`).
+``--serve`` startet den lokalen Berichtsserver (siehe :mod:`.server`).
+``--segments`` schreibt alle Umfrage-Tabellen je Teilgruppe (siehe :mod:`.segments`).
+"""
+import argparse
+from pathlib import Path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m zahlungsbereitschaft",
+        description="Führt die Auswertungen als inkrementelle Pipeline aus.",
+    )
+    parser.add_argument("stages", nargs="*",
+                        help="nur diese Stufen (samt Vorgängern), z. B. warenkorb oder zahlungsarten.plots")
+    parser.add_argument("--force", action="store_true", help="alle gewählten Stufen neu ausführen")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Anzahl paralleler Prozesse")
+    parser.add_argument("--list", action="store_true", help="Stufen und Abhängigkeiten anzeigen")
+    parser.add_argument("--tables", action="store_true",
+                        help="nur die Ergebnis-Tabellen ausgeben (ohne Tests, Plots und Pipeline)")
+    parser.add_argument("--append", nargs="+", type=Path, metavar="CHARGE",
+                        help="neue Antworten (xlsx/csv im Export-Layout) an den Zählstand anhängen")
+    parser.add_argument("--export-state", action="store_true",
+                        help="Umfrage-CSVs aus dem gespeicherten Zählstand schreiben")
+    parser.add_argument("--serve", action="store_true",
+                        help="Tabellen und Abbildungen über HTTP ausliefern (Neuberechnung im Hintergrund)")
+    parser.add_argument("--segments", nargs="*", metavar="MERKMAL",
+                        help="Umfrage-Tabellen je Teilgruppe (Standard: welle alter geschlecht haeufigkeit)")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse für --serve")
+    parser.add_argument("--port", type=int, default=8000, help="Port für --serve")
+    args = parser.parse_args(argv)
+
+    if args.append or args.export_state:
+        from .aggregate import append, export, load_state, save_state
+
+        state = load_state()
+        for path in args.append or []:
+            rows = append(state, path)
+            print(f"{path.name}: {rows} neue Antworten" if rows else f"{path.name}: bereits eingezählt")
+        save_state(state)
+        for path in export(state):
+            print("geschrieben:", path)
+        print(f"Zählstand: {state.total} Antworten aus {len(state.batches)} Charge(n)")
+        return
+
+    if args.serve:
+        from .server import serve
+
+        serve(args.host, args.port)
+        return
+
+    if args.segments is not None:
+        from .segments import write_segments
+
+        for path in write_segments(args.segments or None, processes=args.jobs):
+            print("geschrieben:", path)
+        return
+
+    if args.tables:
+        import pandas as pd
+
+        from .tables import summary_tables
+
+        with pd.option_context("display.width", 200, "display.max_columns", 20):
+            for name, table in summary_tables().items():
+                print(f"\n--- {name} ---")
+                print(table)
+        return
+
+    from .pipeline import default_stages, dependencies, run
+
+    if args.list:
+        for name, deps in dependencies(default_stages()).items():
+            print(f"{name:<24} <- {', '.join(sorted(deps)) or '-'}")
+        return
+    run(targets=args.stages, force=args.force, jobs=args.jobs)
+
+
+if __name__ == "__main__":
+    main()
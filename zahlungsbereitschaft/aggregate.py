@@ -0,0 +1,123 @@
+"""Inkrementelle Umfrage-Auswertung: Zählstand auf der Platte, neue Antworten anhängen.
+
+Statt bei jeder neuen Antwort-Charge die ganze Umfrage neu zu zählen, wird
+ein zusammenführbarer Zählstand (:class:`.survey.PaymentCounts` und
+:class:`.survey.WarenkorbCounts`) unter ``.state/umfrage.json`` gehalten.
+``append`` liest nur die neue Charge (Kosten O(Charge)), ``export`` schreibt
+die bekannten CSV-Dateien in ``Bilder/`` und ``Ergebnisse/`` allein aus dem
+Zählstand.
+
+Jede Charge wird über ihren SHA-256 nur einmal eingezählt; dieselbe Datei
+zweimal anzuhängen ändert nichts.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .ingest import file_sha256
+from .paths import STATE_DIR, WARENKORB_DIR, ZAHLUNGSARTEN_DIR
+from .survey import (
+    DEFAULT_CHUNKSIZE, ZAHLUNGSARTEN_NAMES, WARENKORB_NAMES, PaymentCounts, WarenkorbCounts,
+    iter_survey_chunks,
+)
+from .warenkorb import ORDER_ASPEKTE, ORDER_VERAENDERUNG
+
+STATE_FILE = STATE_DIR / "umfrage.json"
+STATE_VERSION = 1
+
+# beide Fragenblöcke in einem Lesedurchgang: AN, AO, AP, AQ
+SURVEY_COLS = "AN:AQ"
+SURVEY_NAMES = WARENKORB_NAMES + ZAHLUNGSARTEN_NAMES
+
+
+def _warenkorb_counts():
+    return WarenkorbCounts(ORDER_VERAENDERUNG, ORDER_ASPEKTE)
+
+
+@dataclass
+class SurveyState:
+    payment: PaymentCounts = field(default_factory=PaymentCounts)
+    warenkorb: WarenkorbCounts = field(default_factory=_warenkorb_counts)
+    batches: list = field(default_factory=list)  # [{"file", "sha256", "rows"}]
+
+    @property
+    def total(self):
+        return self.payment.total
+
+    def to_dict(self):
+        return {
+            "version": STATE_VERSION,
+            "batches": self.batches,
+            "payment": self.payment.to_state(),
+            "warenkorb": self.warenkorb.to_state(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unbekannte Version des Zählstands: {data.get('version')}")
+        return cls(
+            payment=PaymentCounts.from_state(data["payment"]),
+            warenkorb=WarenkorbCounts.from_state(data["warenkorb"], ORDER_VERAENDERUNG,
+                                                 ORDER_ASPEKTE),
+            batches=data["batches"],
+        )
+
+
+def load_state(path=STATE_FILE):
+    """Gespeicherten Zählstand laden (leer, wenn es noch keinen gibt)."""
+    try:
+        return SurveyState.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+    except FileNotFoundError:
+        return SurveyState()
+
+
+def save_state(state, path=STATE_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state.to_dict(), ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def count_batch(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Eine Charge (xlsx/csv im Layout des Umfrage-Exports) in einen neuen Zählstand."""
+    batch = SurveyState()
+    for chunk in iter_survey_chunks(path, SURVEY_COLS, SURVEY_NAMES, chunksize):
+        batch.payment.update(chunk)
+        batch.warenkorb.update(chunk)
+    return batch
+
+
+def append(state, path, chunksize=DEFAULT_CHUNKSIZE):
+    """Charge ``path`` einzählen; gibt die Zahl neuer Antworten zurück (0 = schon bekannt)."""
+    sha = file_sha256(path)
+    if any(b["sha256"] == sha for b in state.batches):
+        return 0
+    batch = count_batch(path, chunksize)
+    state.payment.merge(batch.payment)
+    state.warenkorb.merge(batch.warenkorb)
+    state.batches.append({"file": Path(path).name, "sha256": sha, "rows": batch.total})
+    return batch.total
+
+
+def export(state, zahlungsarten_dir=ZAHLUNGSARTEN_DIR, warenkorb_dir=WARENKORB_DIR):
+    """Die Umfrage-CSVs aus dem Zählstand schreiben (ohne alte Antworten zu lesen)."""
+    bilder = Path(zahlungsarten_dir) / "Bilder"
+    ergebnisse = Path(warenkorb_dir) / "Ergebnisse"
+    bilder.mkdir(parents=True, exist_ok=True)
+    ergebnisse.mkdir(parents=True, exist_ok=True)
+
+    res = state.payment.result()
+    res["method_counts"].to_csv(bilder / "umfrage_zahlungsarten_counts.csv", index=False)
+    res["bnpl_counts"].to_csv(bilder / "umfrage_bnpl_counts.csv", index=False)
+    res["kreuz"].to_csv(bilder / "umfrage_bnpl_kreuztabelle.csv")
+
+    umf = state.warenkorb.result()
+    umf["ver"].to_csv(ergebnisse / "umfrage_warenkorb_verteilung.csv", index=False)
+    umf["asp"].to_csv(ergebnisse / "umfrage_warenkorb_aspekte.csv", index=False)
+    return [bilder / "umfrage_zahlungsarten_counts.csv", bilder / "umfrage_bnpl_counts.csv",
+            bilder / "umfrage_bnpl_kreuztabelle.csv",
+            ergebnisse / "umfrage_warenkorb_verteilung.csv",
+            ergebnisse / "umfrage_warenkorb_aspekte.csv"]
@@ -0,0 +1,221 @@
+"""Bootstrap-Konfidenzintervalle für die Umfrage-Anteile.
+
+Statt Teilnehmende B-mal zu ziehen, wird die Umfrage zuerst auf ihre
+*verschiedenen* Antwortmuster komprimiert (Zeilen der Indikatormatrix mit
+Häufigkeit, :class:`ResponsePatterns`). Eine Bootstrap-Stichprobe ist dann
+ein Multinomial-Zug der Muster-Häufigkeiten; für einen ganzen Block von
+Stichproben ergibt sich die Gewichtsmatrix W (Stichproben × Muster) in einem
+Aufruf, und die Zählungen aller Kategorien sind ``W @ I``.
+
+Die Muster kommen aus dem Umfrage-Speicher (:mod:`.store`): Bitmasken und
+Codes werden blockweise entpackt, der Export wird nicht erneut gelesen.
+
+Die Blöcke haben feste Seeds ``[seed, block]`` und werden auf einen
+Prozesspool verteilt; das Ergebnis hängt damit nicht von der Zahl der
+Prozesse ab. Ein Block ist so groß, dass W in ``BLOCK_MB`` passt (höchstens
+``BLOCK`` Stichproben). Die Laufzeit wächst mit Stichproben × Muster, nicht
+mit der Zahl der Teilnehmenden.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .multiselect import onehot
+from .store import survey_store
+from .survey import DEFAULT_CHUNKSIZE
+from .taxonomy import FOKUS_CODES, UMFRAGE_ZU_VERGLEICH, VERGLEICHSKATEGORIEN, encode_vergleich
+
+N_RESAMPLES = 10_000
+BLOCK = 1_000  # höchstens so viele Stichproben je Block
+BLOCK_MB = 64  # Speicher für W (Block × Muster, int64) je Block
+# darunter (Stichproben × Muster) lohnt sich kein Prozesspool
+PARALLEL_MIN_WORK = 5_000_000
+
+
+class ResponsePatterns:
+    """Verschiedene Antwortmuster mit ihrer Häufigkeit.
+
+    Ein Muster ist die Zeile der Indikatormatrix über alle Fragen einer
+    Umfrage, gespeichert als sortiertes Tupel ``((item, anzahl), ...)``.
+    Items sind ``(Frage, Kategorie)``-Paare; das Vokabular wächst blockweise mit.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.patterns = {}
+
+    @property
+    def total(self):
+        return sum(self.patterns.values())
+
+    def update(self, blocks):
+        """``blocks``: {Frage: (Matrix n × k, Kategorien)} eines Umfrage-Blocks."""
+        ids = [self.items.setdefault((frage, label), len(self.items))
+               for frage, (_, labels) in blocks.items() for label in labels]
+        Z = np.hstack([np.asarray(M, dtype=np.int64) for M, _ in blocks.values()])
+        ids = np.array(ids, dtype=np.int64)
+        rows, counts = _unique_rows(Z)
+        for row, n in zip(rows, counts.tolist()):
+            nz = np.flatnonzero(row)
+            key = tuple(sorted(zip(ids[nz].tolist(), row[nz].tolist())))
+            self.patterns[key] = self.patterns.get(key, 0) + n
+        return self
+
+    def matrix(self):
+        """-> (I: Muster × Items, Häufigkeiten, Items).
+
+        Die Muster sind sortiert, damit das Ergebnis nicht von der Blockgröße abhängt.
+        """
+        keys = sorted(self.patterns)
+        I = np.zeros((len(keys), len(self.items)), dtype=np.int64)
+        for p, key in enumerate(keys):
+            for item, value in key:
+                I[p, item] = value
+        counts = np.array([self.patterns[key] for key in keys], dtype=np.int64)
+        return I, counts, list(self.items)
+
+
+def _unique_rows(Z):
+    """Verschiedene Zeilen mit Häufigkeit.
+
+    Zeilen werden als Mixed-Radix-Zahl kodiert (Einträge sind kleine Zählungen),
+    dann reicht ein ``np.unique`` über einen Vektor; nur wenn der Schlüssel nicht
+    in int64 passt, wird zeilenweise sortiert.
+    """
+    if Z.size == 0:
+        return np.unique(Z, axis=0, return_counts=True)
+    base = Z.max(axis=0) + 1
+    if np.sum(np.log2(base)) >= 62:
+        return np.unique(Z, axis=0, return_counts=True)
+    radix = np.concatenate([[1], np.cumprod(base[:-1])])
+    _, first, counts = np.unique(Z @ radix, return_index=True, return_counts=True)
+    return Z[first], counts
+
+
+def payment_patterns(store):
+    """Antwortmuster aus AP/AQ eines :class:`.store.SurveyStore`.
+
+    Zahlungsarten, BNPL-Änderung und Vergleichskategorien (Zahlungsarten über
+    ``UMFRAGE_ZU_VERGLEICH`` zusammengefasst, wie ``payment_counts(mapping=…)``).
+    """
+    methods, bnpl = store.labels["zahlungsarten"], store.labels["bnpl"]
+    mapped = [UMFRAGE_ZU_VERGLEICH.get(m.lower(), m) for m in methods]
+    vergleich = list(dict.fromkeys(mapped))
+    P = np.zeros((len(methods), len(vergleich)), dtype=np.int64)
+    P[np.arange(len(methods)), [vergleich.index(m) for m in mapped]] = 1
+    pat = ResponsePatterns()
+    for start, stop in store.blocks():
+        X = store.indicator("zahlungsarten", start, stop, counts=True)
+        pat.update({
+            "Zahlungsart": (X, methods),
+            "BNPL": (onehot(store.codes("bnpl", start, stop), len(bnpl)), bnpl),
+            "Vergleich": (X @ P, vergleich),
+        })
+    return pat
+
+
+def warenkorb_patterns(store):
+    """Antwortmuster aus AN/AO eines :class:`.store.SurveyStore`: Veränderung und Aspekte."""
+    ver, aspekte = store.labels["veraenderung"], store.labels["aspekte"]
+    pat = ResponsePatterns()
+    for start, stop in store.blocks():
+        pat.update({
+            "Veränderung": (onehot(store.codes("veraenderung", start, stop), len(ver)), ver),
+            "Aspekt": (store.indicator("aspekte", start, stop, counts=True), aspekte),
+        })
+    return pat
+
+
+# -------------------------------------------------------
+# Resampling
+# -------------------------------------------------------
+def _resample_block(I, p, n, seed, block, size):
+    """``size`` Bootstrap-Stichproben -> Zählungen je Item (size × Items)."""
+    rng = np.random.default_rng([seed, block])
+    W = rng.multinomial(n, p, size=size)
+    return W @ I
+
+
+def block_size(n_patterns, budget_mb=BLOCK_MB):
+    """Stichproben je Block, damit W (Block × Muster, int64) in ``budget_mb`` passt."""
+    return max(1, min(BLOCK, int(budget_mb * 2**20) // (8 * max(n_patterns, 1))))
+
+
+def bootstrap_counts(I, counts, n_resamples=N_RESAMPLES, seed=0, processes=None):
+    """Item-Zählungen für ``n_resamples`` Bootstrap-Stichproben (n_resamples × Items)."""
+    n = int(counts.sum())
+    p = counts / n
+    block = block_size(len(counts))
+    sizes = [min(block, n_resamples - start) for start in range(0, n_resamples, block)]
+    args = [(I, p, n, seed, block, size) for block, size in enumerate(sizes)]
+    if processes is None:
+        parallel = n_resamples * len(counts) >= PARALLEL_MIN_WORK
+        processes = (os.cpu_count() or 1) if parallel else 1
+    processes = min(processes, len(args))
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_resample_block, *zip(*args)))
+    else:
+        parts = [_resample_block(*a) for a in args]
+    return np.vstack(parts)
+
+
+def bootstrap_shares(patterns, n_resamples=N_RESAMPLES, level=0.95, seed=0, processes=None):
+    """Perzentil-Konfidenzintervalle für den Anteil jeder Kategorie.
+
+    Anteile beziehen sich wie ``Anteil_%`` in den Zähltabellen auf alle
+    Teilnehmenden. Liefert je Item Frage, Kategorie, Anzahl, Anteil_% sowie
+    CI_low_%/CI_high_% und die entsprechenden Grenzen als Anzahl.
+    """
+    I, counts, items = patterns.matrix()
+    n = int(counts.sum())
+    boot = bootstrap_counts(I, counts, n_resamples, seed, processes)
+    alpha = (1 - level) / 2
+    low, high = np.quantile(boot, [alpha, 1 - alpha], axis=0)
+    anzahl = counts @ I
+    return pd.DataFrame({
+        "Frage": [frage for frage, _ in items],
+        "Kategorie": [label for _, label in items],
+        "Anzahl": anzahl,
+        "Anteil_%": (anzahl / n * 100).round(1),
+        "CI_low_%": (low / n * 100).round(1),
+        "CI_high_%": (high / n * 100).round(1),
+        "Anzahl_low": low,
+        "Anzahl_high": high,
+    })
+
+
+def survey_intervals(kind="zahlungsarten", path=None, n_resamples=N_RESAMPLES, level=0.95,
+                     seed=0, processes=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Bootstrap-Intervalle für eine Umfrage (wie :func:`.survey.survey_counts`).
+
+    Die Antwortmuster kommen aus dem Umfrage-Speicher (:func:`.store.survey_store`).
+    """
+    from .paths import WARENKORB_DIR, ZAHLUNGSARTEN_DIR, survey_file
+
+    if kind == "zahlungsarten":
+        pat = payment_patterns(survey_store(path or survey_file(ZAHLUNGSARTEN_DIR), chunksize))
+    elif kind == "warenkorb":
+        pat = warenkorb_patterns(survey_store(path or survey_file(WARENKORB_DIR), chunksize))
+    else:
+        raise ValueError(f"Unbekannte Umfrage: {kind!r} (zahlungsarten oder warenkorb)")
+    return bootstrap_shares(pat, n_resamples, level, seed, processes)
+
+
+def frage(ci, name):
+    """Intervalle einer Frage, Kategorie als Index (zum Anfügen an die Zähltabellen)."""
+    return ci[ci["Frage"] == name].drop(columns="Frage").set_index("Kategorie")
+
+
+def vergleich_intervalle(plotdf, ci):
+    """Grenzen für ``pct_umfrage`` an ``plotdf`` (:func:`.statista.compare_survey_vs_statista`)."""
+    v = frage(ci, "Vergleich")
+    codes = encode_vergleich(list(v.index))
+    out = {}
+    for col, name in (("CI_low_%", "ci_low_umfrage"), ("CI_high_%", "ci_high_umfrage")):
+        values = np.zeros(len(VERGLEICHSKATEGORIEN))
+        values[codes[codes >= 0]] = v[col].to_numpy()[codes >= 0]
+        out[name] = values[FOKUS_CODES]
+    return plotdf.assign(**out)
@@ -0,0 +1,178 @@
+"""Kreuztabellen-Würfel über alle Umfrage-Dimensionen.
+
+Aus dem memory-mapped Speicher (:mod:`.store`) wird in einem Durchgang jede
+*verschiedene* Kombination aus Warenkorb-Veränderung, BNPL-Änderung,
+gewählten Zahlungsarten und Aspekten mit ihrer Häufigkeit gezählt (die
+„Fakten“, meist nur einige hundert bis tausend Zeilen, auch bei Millionen
+Teilnehmenden). Schneiden (``slice``) setzt die Gewichte nicht passender
+Fakten auf 0, ``by`` rechnet daraus die Kreuztabelle als gewichtetes
+Matrixprodukt; beides braucht die Rohdaten nicht mehr und dauert Mikro- bis
+wenige Millisekunden::
+
+    cube = survey_cube()
+    cube.slice(method="Kreditkarte").by("BNPL_norm")
+    cube.by(("Zahlungsart", "BNPL (Klarna)"), "BNPL_norm")   # wie ``kreuz``
+
+Gezählt werden Teilnehmende. Bei Mehrfachauswahl-Dimensionen (Zahlungsart,
+Aspekt) zählt eine Person in jeder gewählten Kategorie einmal.
+"""
+import numpy as np
+import pandas as pd
+
+from .multiselect import onehot
+from .store import BITMASKS, MISSING, survey_store
+
+# Dimension -> Spalte im Speicher
+DIMENSIONS = {
+    "Veränderung": "veraenderung",
+    "BNPL_norm": "bnpl",
+    "Zahlungsart": "zahlungsarten",
+    "Aspekt": "aspekte",
+}
+# kurze Namen für Schlüsselwort-Argumente
+ALIASES = {"method": "Zahlungsart", "aspekt": "Aspekt", "veraenderung": "Veränderung",
+           "bnpl": "BNPL_norm"}
+
+
+def _dimension(name):
+    name = ALIASES.get(name, name)
+    if name not in DIMENSIONS:
+        raise KeyError(f"Unbekannte Dimension: {name!r} ({', '.join(DIMENSIONS)})")
+    return name
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+class SurveyCube:
+    """Verschiedene Antwortkombinationen (Fakten) mit Häufigkeit.
+
+    Je Dimension liegt eine 0/1-Matrix Fakten × Kategorien bereit (spaltenweise
+    gespeichert, damit ``slice`` eine Kategorie ohne Kopie liest). Ein Teilwürfel
+    teilt diese Matrizen und setzt nur die Gewichte der übrigen Fakten auf 0.
+    """
+
+    def __init__(self, members, weights, labels):
+        self.members = members  # {Dimension: Fakten × Kategorien}
+        self.weights = weights
+        self.labels = labels
+
+    @classmethod
+    def from_store(cls, store):
+        """Ein Durchgang über den Speicher: Schlüsselzeilen blockweise verdichten."""
+        cols = list(DIMENSIONS.values())
+        keys, counts = [], []
+        for start, stop in store.blocks():
+            parts = [np.asarray(store.arrays[c][start:stop], dtype=np.uint8).reshape(stop - start, -1)
+                     for c in cols]
+            rows, n = _unique_rows(np.hstack(parts))
+            keys.append(rows)
+            counts.append(n)
+        widths = [(len(store.labels[c]) + 7) // 8 if c in BITMASKS else 1 for c in cols]
+        if keys:
+            rows, inverse = _unique_rows(np.vstack(keys), return_inverse=True)
+            weights = np.bincount(inverse, weights=np.concatenate(counts))
+        else:
+            rows, weights = np.zeros((0, sum(widths)), dtype=np.uint8), np.zeros(0)
+
+        members, labels, pos = {}, {}, 0
+        for dim, c, w in zip(DIMENSIONS, cols, widths):
+            block = rows[:, pos:pos + w]
+            pos += w
+            labels[dim] = list(store.labels[c])
+            if c in BITMASKS:
+                M = np.unpackbits(block, axis=1, count=len(labels[dim]), bitorder="little")
+            else:
+                codes = block[:, 0].astype(np.int64)
+                codes[codes == MISSING] = -1
+                M = onehot(codes, len(labels[dim]))
+            members[dim] = np.asfortranarray(M, dtype=float)
+        return cls(members, weights, labels)
+
+    @property
+    def total(self):
+        return int(round(self.weights.sum()))
+
+    def __len__(self):
+        return int(np.count_nonzero(self.weights))
+
+    def _hit(self, dim, values):
+        """Fakten, die (mindestens) eine der Kategorien ``values`` enthalten."""
+        labels = self.labels[dim]
+        hit = np.zeros(len(self.weights), dtype=bool)
+        for v in _as_list(values):
+            if v not in labels:
+                raise KeyError(f"Unbekannte Kategorie für {dim}: {v!r} ({', '.join(map(str, labels))})")
+            hit |= self.members[dim][:, labels.index(v)] > 0
+        return hit
+
+    def slice(self, **where):
+        """Teilwürfel: ``dimension=wert`` bzw. ``dimension=[wert, ...]`` (eine davon).
+
+        Bei Zahlungsart/Aspekt heißt das „gewählt“; ``dimension=("!", wert)``
+        wählt Teilnehmende, die ``wert`` *nicht* gewählt haben. Unbekannte
+        Dimensionen oder Kategorien (Tippfehler) -> ``KeyError``.
+        """
+        weights = self.weights
+        for name, value in where.items():
+            dim = _dimension(name)
+            negate = isinstance(value, tuple) and len(value) == 2 and value[0] == "!"
+            hit = self._hit(dim, value[1] if negate else value)
+            weights = weights * (~hit if negate else hit)
+        return SurveyCube(self.members, weights, self.labels)
+
+    def by(self, *dims):
+        """Kreuztabelle (Anzahl Teilnehmende) über ``dims``.
+
+        Eine Dimension -> Series, zwei -> DataFrame, mehr -> Series mit MultiIndex.
+        ``(dimension, kategorie)`` ist eine Ja/Nein-Dimension („kategorie gewählt“).
+        """
+        if not dims:
+            return self.total
+        mats, axes, names = [], [], []
+        for d in dims:
+            if isinstance(d, tuple):
+                hit = self._hit(_dimension(d[0]), d[1]).astype(float)
+                mats.append(np.column_stack([1 - hit, hit]))
+                axes.append([False, True])
+                names.append(d[1])
+            else:
+                dim = _dimension(d)
+                mats.append(self.members[dim])
+                axes.append(self.labels[dim])
+                names.append(dim)
+        weights = self.weights
+        keep = np.flatnonzero(weights)
+        if 2 * len(keep) < len(weights):  # schmaler Teilwürfel: nur die übrigen Fakten
+            weights, mats = weights[keep], [m[keep] for m in mats]
+        if len(mats) == 1:
+            table = weights @ mats[0]
+        elif len(mats) == 2:
+            table = (mats[0] * weights[:, None]).T @ mats[1]
+        else:
+            letters = "abcdefghijklmnopqrstuvwxyz"[:len(mats)]
+            spec = "f," + ",".join(f"f{c}" for c in letters) + "->" + letters
+            table = np.einsum(spec, weights, *mats, optimize=True)
+        table = np.rint(table).astype(np.int64)
+        if len(dims) == 1:
+            return pd.Series(table, index=pd.Index(axes[0], name=names[0]), name="Anzahl")
+        if len(dims) == 2:
+            return pd.DataFrame(table, index=pd.Index(axes[0], name=names[0]),
+                                columns=pd.Index(axes[1], name=names[1]))
+        index = pd.MultiIndex.from_product(axes, names=names)
+        return pd.Series(table.ravel(), index=index, name="Anzahl")
+
+
+def _unique_rows(rows, return_inverse=False):
+    """Verschiedene Byte-Zeilen (als ``void`` verglichen) mit Häufigkeit bzw. Rückabbildung."""
+    rows = np.ascontiguousarray(rows)
+    view = rows.view(np.dtype((np.void, rows.shape[1]))).ravel()
+    _, first, inverse, counts = np.unique(view, return_index=True, return_inverse=True,
+                                          return_counts=True)
+    return (rows[first], inverse.ravel()) if return_inverse else (rows[first], counts)
+
+
+def survey_cube(path=None):
+    """Würfel für einen Export (über :func:`.store.survey_store`)."""
+    return SurveyCube.from_store(survey_store(path))
@@ -0,0 +1,109 @@
+"""Deflationierung über einen kumulierten Log-Preisindex.
+
+Der Index wird einmal als ``log P_t`` (kumulierte Summe von ``log1p(Rate)``
+bzw. Logarithmus der Indexstände) gespeichert. Ein anderes Basisjahr ist nur
+ein anderer Offset (O(1), die Reihe wird nicht neu berechnet), und ein
+Deflator für beliebige Perioden ist ``exp(offset - log P_t)``.
+
+Nominale Reihen werden als breite Matrix (Perioden × Reihen) in einem
+Broadcast deflationiert; die Zuordnung läuft über den Perioden-Index
+(``Index.get_indexer``), nicht über wiederholte ``merge``-Aufrufe. Perioden
+können Jahre, Monate (``pd.PeriodIndex``) oder beliebige andere Schlüssel
+sein. Mit mehreren Spalten (z. B. je Region) deflationiert jede Reihe mit dem
+Index ihrer Region.
+"""
+import numpy as np
+import pandas as pd
+
+
+class PriceIndex:
+    """Kumulierter Log-Preisindex.
+
+    ``log_level`` ist log P_t (Perioden × 1 oder × Spalten). Ohne ``base`` gilt
+    P_t so, wie übergeben (Stand 100 = Basis); mit ``base`` ist der Stand
+    dieser Periode 100.
+    """
+
+    def __init__(self, periods, log_level, base=None, columns=None):
+        self.periods = pd.Index(periods)
+        if not self.periods.is_unique:
+            raise ValueError("Perioden des Preisindex sind nicht eindeutig")
+        self.log = np.asarray(log_level, dtype=float)
+        self.columns = None if columns is None else pd.Index(columns)
+        self.base = base
+        # Offset der Basisperiode: einziger Wert, der beim Umbasieren neu bestimmt wird
+        self.offset = np.log(100.0) if base is None else self.log[self.periods.get_loc(base)]
+
+    @classmethod
+    def from_rates(cls, periods, rates_pct, base=None, columns=None):
+        """Aus Veränderungsraten in % (Inflation je Periode): log P_t = Σ log(1 + r/100).
+
+        Basis ist die erste Periode, sofern ``base`` nichts anderes sagt.
+        """
+        rates = np.asarray(rates_pct, dtype=float)
+        periods = pd.Index(periods)
+        base = periods[0] if base is None else base
+        return cls(periods, np.cumsum(np.log1p(rates / 100.0), axis=0), base, columns)
+
+    @classmethod
+    def from_levels(cls, periods, levels, base=None, columns=None):
+        """Aus Indexständen; ohne ``base`` bleiben die Stände unverändert."""
+        return cls(periods, np.log(np.asarray(levels, dtype=float)), base, columns)
+
+    def rebase(self, base):
+        """Derselbe Index mit Basisperiode ``base`` (teilt die Log-Reihe, O(1))."""
+        return PriceIndex(self.periods, self.log, base, self.columns)
+
+    def level(self):
+        """Indexstände (Basis = 100) als Series bzw. DataFrame je Spalte."""
+        values = 100.0 * np.exp(self.log - self.offset)
+        if values.ndim == 1:
+            return pd.Series(values, index=self.periods, name="CPI")
+        return pd.DataFrame(values, index=self.periods, columns=self.columns)
+
+    def factors(self, periods):
+        """Deflatoren 100 / CPI für ``periods``; unbekannte Perioden -> NaN."""
+        pos = self.periods.get_indexer(pd.Index(periods))
+        f = np.exp(self.offset - self.log[np.maximum(pos, 0)])
+        f[pos < 0] = np.nan
+        return f
+
+    def deflate(self, nominal, periods=None, column_level=None):
+        """Nominale Reihen -> reale Reihen (Preise der Basisperiode).
+
+        ``nominal``: DataFrame/Series mit Perioden als Index, oder ein Array
+        (Perioden × Reihen) zusammen mit ``periods``. Bei einem Index mit
+        mehreren Spalten (Regionen) bestimmt ``column_level`` (Name bzw. Ebene
+        der DataFrame-Spalten), welche Index-Spalte für eine Reihe gilt.
+        """
+        if isinstance(nominal, (pd.DataFrame, pd.Series)):
+            f = self._factor_matrix(nominal.index, nominal, column_level)
+            return nominal * (f if nominal.ndim == 2 else f[:, 0])
+        values = np.asarray(nominal, dtype=float)
+        f = self.factors(periods)
+        return values * (f[:, None] if values.ndim == 2 and f.ndim == 1 else f)
+
+    def _factor_matrix(self, periods, frame, column_level):
+        f = self.factors(periods)
+        if f.ndim == 1:
+            return f[:, None]
+        if not isinstance(frame, pd.DataFrame):
+            raise ValueError("Mehrspaltiger Preisindex braucht einen DataFrame")
+        keys = frame.columns if column_level is None else frame.columns.get_level_values(column_level)
+        cols = self.columns.get_indexer(keys)
+        if (cols < 0).any():
+            raise KeyError(f"Kein Preisindex für: {sorted(set(keys[cols < 0]))}")
+        return f[:, cols]
+
+
+def deflate_frame(nominal, index, columns=None, suffix=("_nom", "_real")):
+    """Ausgewählte nominale Spalten eines DataFrames deflationieren und anhängen.
+
+    ``columns`` (Standard: alle Spalten mit Endung ``suffix[0]``) werden als
+    eine Matrix deflationiert; die Ergebnisse heißen ``…suffix[1]``.
+    """
+    old, new = suffix
+    columns = [c for c in nominal.columns if str(c).endswith(old)] if columns is None else list(columns)
+    real = index.deflate(nominal[columns])
+    real.columns = [str(c).removesuffix(old) + new for c in columns]
+    return pd.concat([nominal, real], axis=1)
@@ -0,0 +1,139 @@
+"""Unscharfe Zuordnung freier Zahlungsarten-Antworten über Trigramme.
+
+Trifft ein Token kein Wort der Zuordnung (``survey.SURVEY_METHODS`` bzw.
+``taxonomy.UMFRAGE_ZU_VERGLEICH``) exakt, wird es mit allen Schlüsseln und
+Kategorien über Zeichen-Trigramme verglichen (Dice-Koeffizient, Wörter wie bei
+pg_trgm mit Leerzeichen aufgefüllt). Liegt der beste Treffer über
+``THRESHOLD``, gilt dessen Kategorie (``"Paypall"`` -> PayPal), sonst bleibt
+das Token eine eigene Kategorie (``"Sonstiges"``). Ein Token, das echtes
+Teilwort eines Eintrags ist, ist kein Tippfehler davon und wird diesem nie
+zugeordnet (``"Überweisung"`` ist nicht ``"Sofortüberweisung"``).
+
+Jede Entscheidung wird je Zuordnung einmal getroffen und als Zeile an
+``.cache/fuzzy/<Zuordnung>.jsonl`` angehängt. Spätere Läufe lesen diese
+Tabelle und bewerten nur noch unbekannte Strings; im eingeschwungenen Zustand
+ist die Zuordnung ein Wörterbuch-Zugriff.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from . import ingest
+from .paths import CACHE_DIR
+
+FUZZY_DIR = CACHE_DIR / "fuzzy"
+FUZZY_VERSION = 2  # 2: keine Zuordnung auf Einträge, die das Token enthalten
+# Mindest-Ähnlichkeit (Dice über Trigramme); "paypl" -> "paypal" ≈ 0,62,
+# "google pay" -> "apple pay" ≈ 0,48 bleibt eigene Kategorie
+THRESHOLD = 0.6
+
+
+def trigrams(text):
+    """Menge der Zeichen-Trigramme (kleingeschrieben, vorne zwei, hinten ein Leerzeichen)."""
+    s = f"  {text.lower()} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class TrigramIndex:
+    """Invertierter Index Trigramm -> Einträge; ``scores`` zählt Treffer per ``bincount``."""
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        grams = [trigrams(k) for k in self.keys]
+        self._sizes = np.array([len(g) for g in grams], dtype=float)
+        postings = {}
+        for i, g in enumerate(grams):
+            for t in g:
+                postings.setdefault(t, []).append(i)
+        self._postings = {t: np.array(ids, dtype=np.int64) for t, ids in postings.items()}
+
+    def scores(self, text):
+        """Dice-Koeffizient von ``text`` zu jedem Eintrag."""
+        query = trigrams(text)
+        hits = [self._postings[t] for t in query if t in self._postings]
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.keys)) if hits else 0
+        return 2 * shared / (len(query) + self._sizes)
+
+    def best(self, text):
+        """(Eintrag, Ähnlichkeit) mit der höchsten Ähnlichkeit; ``(None, 0.0)`` ohne Einträge.
+
+        Einträge, in denen ``text`` als echtes Teilwort steckt, zählen nicht: geteilte
+        Trigramme wären dort kein Tippfehler, sondern nur ein kürzeres Wort.
+        """
+        if not self.keys:
+            return None, 0.0
+        s = self.scores(text)
+        s = np.where([text != k and text in k for k in self.keys], 0.0, s)
+        i = int(np.argmax(s))
+        return self.keys[i], float(s[i])
+
+
+class FuzzyLookup:
+    """Token (kleingeschrieben) -> Kategorie der Zuordnung oder ``None``, mit dauerhafter Tabelle."""
+
+    def __init__(self, mapping, threshold=THRESHOLD, path=None):
+        # Schlüssel und die Kategorien selbst sind Ziele
+        self.targets = {k.lower(): v for k, v in mapping.items()}
+        for v in mapping.values():
+            self.targets.setdefault(v.lower(), v)
+        self.index = TrigramIndex(self.targets)
+        self.threshold = threshold
+        if path is None and ingest.ENABLED:
+            spec = json.dumps([FUZZY_VERSION, threshold, sorted(self.targets.items())],
+                              ensure_ascii=False)
+            path = FUZZY_DIR / f"{hashlib.sha1(spec.encode('utf-8')).hexdigest()[:16]}.jsonl"
+        self.path = path
+        self.decisions = self._load()
+
+    def _load(self):
+        decisions = {}
+        if self.path is None:
+            return decisions
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        token, key = json.loads(line)
+                    except ValueError:  # abgebrochene letzte Zeile
+                        continue
+                    decisions[token] = key
+        except FileNotFoundError:
+            pass
+        return decisions
+
+    def _remember(self, token, key):
+        self.decisions[token] = key
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # eine Zeile je Entscheidung; O_APPEND hält parallele Prozesse auseinander
+        line = json.dumps([token, key], ensure_ascii=False) + "\n"
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def __call__(self, token):
+        try:
+            key = self.decisions[token]
+        except KeyError:
+            key, score = self.index.best(token)
+            if score < self.threshold:
+                key = None
+            self._remember(token, key)
+        return None if key is None else self.targets[key]
+
+
+_LOOKUPS = {}
+
+
+def fuzzy_lookup(mapping):
+    """Eine :class:`FuzzyLookup` je Zuordnung (pro Prozess wiederverwendet)."""
+    key = id(mapping)
+    found = _LOOKUPS.get(key)
+    if found is None or found[0] is not mapping:
+        found = _LOOKUPS[key] = (mapping, FuzzyLookup(mapping))
+    return found[1]
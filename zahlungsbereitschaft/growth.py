@@ -0,0 +1,77 @@
+"""Wachstum und CAGR für beliebige Zeitfenster über kumulierte Log-Summen.
+
+Je Reihe wird einmal ``L_t = log x_t`` gespeichert (die kumulierte Summe der
+Log-Veränderungen ab dem ersten Jahr, plus ``log x_0``). Für ein Fenster
+``a..b`` ist dann
+
+* Wachstum = ``exp(L_b - L_a) - 1``,
+* CAGR = ``exp((L_b - L_a) / (b - a)) - 1``,
+
+also O(1) je Fenster und Reihe. Alle Fenster (jede Länge, jedes Startjahr)
+für alle Reihen sind ein Broadcast über die Differenzen der Log-Stände.
+Nicht positive oder fehlende Werte ergeben NaN (der Logarithmus ist dort
+nicht definiert), ebenso Fenster der Länge 0 bei der CAGR.
+"""
+import numpy as np
+import pandas as pd
+
+# Kennzahlen je Fenster (Prozent), Reihenfolge wie in der 5-Jahres-Zusammenfassung
+KENNZAHLEN = ["Wachstum_nom_%", "Wachstum_real_%", "CAGR_nom_%", "CAGR_real_%"]
+
+
+def _pct(diff, years):
+    """Log-Differenzen (… × 2: nominal/real) und Fensterlängen -> Kennzahlen in % (… × 4)."""
+    years = np.asarray(years, dtype=float)[..., None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.where(years > 0, np.expm1(diff / years), np.nan)
+    return np.concatenate([np.expm1(diff), cagr], axis=-1) * 100
+
+
+class GrowthIndex:
+    """Log-Stände je Jahr × Reihe × (nominal, real)."""
+
+    def __init__(self, years, log_level, labels):
+        self.years = pd.Index(years)
+        if not (self.years.is_unique and self.years.is_monotonic_increasing):
+            raise ValueError("Jahre müssen eindeutig und aufsteigend sein")
+        self.log = np.asarray(log_level, dtype=float)
+        self.labels = pd.Index(labels)
+
+    @classmethod
+    def from_frame(cls, df, reihen, year="Jahr"):
+        """``reihen``: [(nominal, real, Anzeigename), ...] wie ``warenkorb.REIHEN``."""
+        df = df.dropna(subset=[year]).sort_values(year)
+        values = np.stack([df[[nom, real]].to_numpy(dtype=float) for nom, real, _ in reihen], axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log = np.where(values > 0, np.log(values), np.nan)
+        return cls(df[year].astype(int), log, [label for _, _, label in reihen])
+
+    def metrics(self, series, start, end):
+        """Wachstum und CAGR (nominal/real, in %) der Reihe ``series`` von ``start`` bis ``end``."""
+        k = self.labels.get_loc(series)
+        a, b = self.years.get_loc(start), self.years.get_loc(end)
+        values = _pct(self.log[b, k] - self.log[a, k], end - start)
+        return pd.Series(values, index=KENNZAHLEN, name=series)
+
+    def windows(self, min_years=1):
+        """Alle Fenster (Startjahr × Endjahr, mindestens ``min_years`` lang) für alle Reihen.
+
+        Tidy: Reihe, Start, Ende, Jahre und die Kennzahlen (``KENNZAHLEN``).
+        """
+        a, b = np.triu_indices(len(self.years), 1)
+        years = self.years.to_numpy()
+        span = years[b] - years[a]
+        keep = span >= min_years
+        a, b, span = a[keep], b[keep], span[keep]
+        order = np.lexsort((years[a], span))  # nach Fensterlänge, dann Startjahr
+        a, b, span = a[order], b[order], span[order]
+        values = _pct(self.log[b] - self.log[a], span[:, None])  # Fenster × Reihen × 4
+        n, k = len(a), len(self.labels)
+        out = pd.DataFrame({
+            "Reihe": np.repeat(self.labels.to_numpy(), n),
+            "Start": np.tile(years[a], k),
+            "Ende": np.tile(years[b], k),
+            "Jahre": np.tile(span, k),
+        })
+        out[KENNZAHLEN] = values.transpose(1, 0, 2).reshape(n * k, len(KENNZAHLEN))
+        return out
@@ -0,0 +1,166 @@
+"""Spaltenbasierter Cache für die Statista-Excel-Dateien.
+
+Jede Kombination aus Datei, Blatt, skiprows, usecols und names wird beim
+ersten Lesen als Arrow-IPC-Datei (unkomprimiert) abgelegt. Danach wird nur
+noch diese Datei memory-mapped gelesen, openpyxl wird nicht mehr gebraucht.
+Ungültig wird ein Eintrag, wenn sich Größe/mtime UND der Inhalts-Hash der
+Excel-Datei ändern (ein ``git checkout`` allein erzwingt also kein Neu-Parsen).
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .paths import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+INGEST_DIR = CACHE_DIR / "ingest"
+
+# ZB_NO_CACHE=1 schaltet den Cache komplett ab (z. B. zum Vergleichen)
+ENABLED = os.environ.get("ZB_NO_CACHE", "") in ("", "0")
+
+_stats = {"hits": 0, "misses": 0}
+
+
+def cache_stats():
+    """Treffer/Fehlschläge seit Prozessstart."""
+    return dict(_stats)
+
+
+def cache_report():
+    return f"Excel-Cache: {_stats['hits']} Treffer, {_stats['misses']} Fehlschläge"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def hash_value(h, value):
+    """Wert in den Hash ``h`` einspeisen (Render-Manifest, Memo-Schlüssel).
+
+    DataFrames/Series per ``pd.util.hash_pandas_object`` samt Spalten, Index-Namen
+    und dtypes, Arrays über ihre Bytes, Dateipfade über den Inhalt,
+    verschachtelte dicts/Listen rekursiv, alles andere über ``repr``.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        cols = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        dtypes = [str(t) for t in np.atleast_1d(value.dtypes)]
+        h.update(repr((type(value).__name__, cols, value.index.names, dtypes)).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.dtype.str, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(f"dict{len(value)}".encode())
+        for k in sorted(value, key=repr):
+            hash_value(h, k)
+            hash_value(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for v in value:
+            hash_value(h, v)
+    elif isinstance(value, Path) and value.is_file():
+        h.update(f"file:{file_sha256(value)}".encode())
+    else:
+        h.update(repr(value).encode())
+    h.update(b"\0")
+
+
+def _cache_key(path, sheet_name, skiprows, usecols, names, header):
+    spec = json.dumps(
+        [str(Path(path).resolve()), sheet_name, skiprows, usecols,
+         list(names) if names is not None else None, header],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(spec.encode("utf-8")).hexdigest()
+
+
+def _is_fresh(meta, path, stat):
+    if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    # Zeitstempel geändert -> Inhalt vergleichen
+    if meta["size"] == stat.st_size and meta["sha256"] == file_sha256(path):
+        return True
+    return False
+
+
+def _to_arrow_safe(df):
+    # Arrow verträgt keine gemischten object-Spalten (z. B. 2019 und "'19"),
+    # solche Spalten werden als Text abgelegt, fehlende Werte bleiben fehlend.
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col]).startswith("mixed"):
+            df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+
+def write_arrow(df, target):
+    """DataFrame als unkomprimierte Arrow-IPC-Datei schreiben (atomar)."""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        table = pa.Table.from_pandas(_to_arrow_safe(df), preserve_index=False)
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    # unkomprimiert, damit das Lesen per memory map ohne Kopie geht
+    feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, target)
+
+
+def read_arrow(source):
+    """Arrow-IPC-Datei memory-mapped als DataFrame lesen."""
+    import pyarrow.feather as feather
+
+    return feather.read_table(source, memory_map=True).to_pandas()
+
+
+def read_excel_cached(path, sheet_name=0, skiprows=None, usecols=None, names=None, header=0):
+    """Wie ``pd.read_excel``, aber mit Arrow-Cache unter ``.cache/ingest``."""
+    path = Path(path)
+    if not ENABLED:
+        return pd.read_excel(path, sheet_name=sheet_name, skiprows=skiprows,
+                             usecols=usecols, names=names, header=header)
+
+    key = _cache_key(path, sheet_name, skiprows, usecols, names, header)
+    data_file = INGEST_DIR / f"{key}.arrow"
+    meta_file = INGEST_DIR / f"{key}.json"
+    stat = path.stat()
+
+    if data_file.exists() and meta_file.exists():
+        meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        if _is_fresh(meta, path, stat):
+            _stats["hits"] += 1
+            log.debug("Cache-Treffer: %s (Blatt %s, %s)", path.name, sheet_name, usecols)
+            if meta["mtime_ns"] != stat.st_mtime_ns:
+                meta["mtime_ns"] = stat.st_mtime_ns
+                meta_file.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+            return read_arrow(data_file)
+
+    _stats["misses"] += 1
+    log.debug("Cache-Fehlschlag: %s (Blatt %s, %s)", path.name, sheet_name, usecols)
+    df = pd.read_excel(path, sheet_name=sheet_name, skiprows=skiprows,
+                       usecols=usecols, names=names, header=header)
+    write_arrow(df, data_file)
+    meta = {
+        "source": str(path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(path),
+    }
+    meta_file.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    # Ergebnis aus dem Cache zurückgeben, damit Treffer und Fehlschlag
+    # garantiert dieselben Datentypen liefern
+    return read_arrow(data_file)
@@ -0,0 +1,128 @@
+"""Inhaltsadressierter Cache für abgeleitete Tabellen (``merged``, ``plotdf``, CPI-``df`` …).
+
+``@memoize`` vor einer reinen Funktion legt ihr Ergebnis unter
+``.cache/memo/<schlüssel>.pkl`` ab. Der Schlüssel ist ein SHA-256 über
+
+* den Quelltext des Moduls der Funktion und der unter ``code`` genannten
+  Paketmodule (wie bei den Pipeline-Stufen),
+* alle Argumente über :func:`.ingest.hash_value` (wie beim Render-Manifest):
+  DataFrames/Series per ``pd.util.hash_pandas_object``, Arrays über ihre
+  Bytes, Dateipfade über den Inhalt, verschachtelte dicts/Listen rekursiv.
+
+Ändert sich nichts davon, wird das Ergebnis gelesen statt neu berechnet
+(Pickle, Protokoll 5, damit Index, Kategorien und Tupel exakt zurückkommen).
+Jeder Treffer setzt die mtime der Datei neu; überschreitet der Cache
+``ZB_MEMO_MB`` (Standard 256 MB), fallen die am längsten nicht benutzten
+Einträge weg (LRU). ``ZB_NO_CACHE=1`` schaltet auch diesen Cache ab.
+"""
+import functools
+import hashlib
+import importlib
+import inspect
+import logging
+import os
+import pickle
+from pathlib import Path
+
+from . import ingest
+from .paths import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+MEMO_DIR = CACHE_DIR / "memo"
+MEMO_VERSION = 1
+BUDGET_MB = float(os.environ.get("ZB_MEMO_MB", 256))
+
+_stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+
+def memo_stats():
+    """Treffer/Fehlschläge/verdrängte Einträge seit Prozessstart."""
+    return dict(_stats)
+
+
+# -------------------------------------------------------
+# Schlüssel
+# -------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def _code_hash(func, code):
+    h = hashlib.sha256(f"{MEMO_VERSION}:{func.__module__}.{func.__qualname__}".encode())
+    modules = [inspect.getmodule(func)] + [importlib.import_module(f".{m}", __package__) for m in code]
+    for module in modules:
+        h.update(inspect.getsource(module).encode())
+    return h.hexdigest()
+
+
+def memo_key(func, args, kwargs, code=()):
+    h = hashlib.sha256(_code_hash(func, tuple(code)).encode())
+    ingest.hash_value(h, args)
+    ingest.hash_value(h, kwargs)
+    return h.hexdigest()
+
+
+# -------------------------------------------------------
+# Ablage
+# -------------------------------------------------------
+def _store(path, result):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(result, f, protocol=5)
+    os.replace(tmp, path)
+
+
+def evict(budget_mb=None, folder=None):
+    """Älteste Einträge (mtime = letzter Zugriff) löschen, bis der Cache ins Budget passt."""
+    budget = (BUDGET_MB if budget_mb is None else budget_mb) * 2**20
+    folder = MEMO_DIR if folder is None else Path(folder)
+    entries = []
+    for p in folder.glob("*.pkl"):
+        try:
+            st = p.stat()
+        except FileNotFoundError:  # parallel verdrängt
+            continue
+        entries.append((st.st_mtime_ns, st.st_size, p))
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries):
+        if total <= budget:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+        _stats["evicted"] += 1
+    return total
+
+
+def memoize(func=None, *, code=()):
+    """Decorator: Ergebnis von ``func`` über Argument- und Code-Hash cachen.
+
+    ``code``: weitere Paketmodule (z. B. ``("taxonomy",)``), deren Änderung das
+    Ergebnis ungültig macht. Nur für reine Funktionen verwenden.
+    """
+    if func is None:
+        return functools.partial(memoize, code=code)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not ingest.ENABLED or BUDGET_MB <= 0:
+            return func(*args, **kwargs)
+        path = MEMO_DIR / f"{memo_key(func, args, kwargs, code)}.pkl"
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # abgeschnitten oder Klasse/Modul inzwischen umbenannt: wie ein Fehlschlag
+            path.unlink(missing_ok=True)
+        else:
+            _stats["hits"] += 1
+            os.utime(path)  # LRU: letzter Zugriff
+            return result
+        _stats["misses"] += 1
+        log.debug("Memo-Fehlschlag: %s", func.__qualname__)
+        result = func(*args, **kwargs)
+        _store(path, result)
+        evict()
+        return result
+
+    return wrapper
@@ -0,0 +1,196 @@
+"""Mehrfachauswahl-Spalten als dünnbesetzte Indikatormatrix (Teilnehmende × Kategorie).
+
+Statt ``.str.split(";").explode().map(normalize_method)`` pro Token wird jede
+*verschiedene* Antwort nur einmal zerlegt und normalisiert: ``pd.factorize``
+bildet die Antworten auf Codes ab, die wenigen eindeutigen Antworten werden
+über ein festes Token -> Spalten-Wörterbuch in eine kleine CSR-Matrix übersetzt,
+und die Zeilen für alle Teilnehmenden entstehen per Zeilenindex ``U[codes]``.
+Zählungen, Anteile, Kreuztabellen und Ko-Okkurrenz sind danach reine
+Matrix-Reduktionen.
+
+Das Faktorisieren (und in :func:`.survey.clean_column` das Bereinigen) läuft
+wahlweise über pandas (``ZB_BACKEND=pandas``, Standard) oder über
+PyArrow-Stringarrays mit ``pyarrow.compute`` (``ZB_BACKEND=arrow``:
+``dictionary_encode`` statt Hashing von Python-Objekten). Beide liefern
+dieselben Codes in derselben Reihenfolge; Spalten, die sich nicht als Strings
+nach Arrow übernehmen lassen (z. B. Zahlen aus Excel), laufen über pandas.
+"""
+import functools
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+BACKENDS = ("pandas", "arrow")
+BACKEND = os.environ.get("ZB_BACKEND", "pandas")
+
+
+def resolve_backend(backend=None):
+    """``backend`` bzw. ``ZB_BACKEND`` prüfen."""
+    backend = BACKEND if backend is None else backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unbekanntes Backend: {backend!r} (pandas oder arrow)")
+    return backend
+
+
+def arrow_strings(values):
+    """Series -> ``pyarrow`` StringArray (fehlend = null) oder ``None``, wenn keine reinen Strings."""
+    import pyarrow as pa
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return None
+    try:
+        arr = pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if pa.types.is_null(arr.type):
+        return arr.cast(pa.string())
+    return arr if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type) else None
+
+
+def arrow_factorize(arr):
+    """StringArray -> (Codes, fehlend = -1; Wörterbuch als StringArray) per ``dictionary_encode``."""
+    import pyarrow.compute as pc
+
+    enc = pc.dictionary_encode(arr)
+    codes = pc.fill_null(enc.indices, -1).to_numpy(zero_copy_only=False)
+    return codes.astype(np.int64), enc.dictionary
+
+
+def factorize(values, backend=None):
+    """(Codes, eindeutige Werte) in Reihenfolge des ersten Auftretens; fehlend = -1."""
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values, dtype=object)
+    if resolve_backend(backend) == "arrow":
+        arr = arrow_strings(values)
+        if arr is not None:
+            codes, dictionary = arrow_factorize(arr)
+            return codes, dictionary.to_pylist()
+    return pd.factorize(values, use_na_sentinel=True)
+
+
+class MultiSelectTokenizer:
+    """Übersetzt Semikolon-getrennte Antworten in eine CSR-Matrix.
+
+    Das Vokabular (Kategorie -> Spalte) wächst über mehrere ``transform``-Aufrufe
+    mit, sodass blockweise gebaute Matrizen dieselben Spalten-Ids verwenden.
+    """
+
+    def __init__(self, normalize=None, sep=";"):
+        self.sep = sep
+        # Normalisierung pro Roh-Token nur einmal ausführen
+        self._normalize = functools.lru_cache(maxsize=None)(normalize or str.strip)
+        self.vocabulary = {}
+        # bereinigte Antwort -> Spalten-Ids (das "kompilierte" Wörterbuch)
+        self._answer_ids = {}
+
+    @property
+    def columns(self):
+        return list(self.vocabulary)
+
+    def _ids(self, answer):
+        ids = self._answer_ids.get(answer)
+        if ids is None:
+            ids = []
+            for token in answer.split(self.sep):
+                label = self._normalize(token).strip()
+                if label:
+                    ids.append(self.vocabulary.setdefault(label, len(self.vocabulary)))
+            ids = self._answer_ids[answer] = tuple(ids)
+        return ids
+
+    def transform(self, answers, backend=None):
+        """Antworten (Series mit bereinigten Strings) -> CSR-Matrix (n × k).
+
+        Einträge sind Anzahlen; eine doppelt genannte Kategorie zählt doppelt,
+        wie bei ``value_counts`` auf der explodierten Serie.
+        """
+        from scipy import sparse  # erst beim ersten Zählen laden
+
+        codes, uniques = factorize(answers, backend)
+        rows = [self._ids(str(a)) for a in uniques]
+        rows.append(())  # Leerzeile für fehlende Antworten
+        codes = np.where(codes < 0, len(uniques), codes)
+
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        indices = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int32,
+                              count=int(indptr[-1]))
+        uniq = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), indices, indptr),
+            shape=(len(rows), len(self.vocabulary)),
+        )
+        uniq.sum_duplicates()
+        return uniq[codes]
+
+
+class CategoryCodes:
+    """Einfachauswahl-Antworten -> fortlaufende Integer-Codes (Vokabular wächst mit)."""
+
+    def __init__(self):
+        self.vocabulary = {}
+
+    @property
+    def labels(self):
+        return list(self.vocabulary)
+
+    def transform(self, values, backend=None):
+        codes, uniques = factorize(values, backend)
+        lookup = np.array(
+            [self.vocabulary.setdefault(u, len(self.vocabulary)) for u in uniques] + [-1],
+            dtype=np.int64,
+        )
+        return lookup[codes]  # -1 (fehlend) landet auf dem letzten Eintrag = -1
+
+
+def grow(counts, size):
+    """Zählvektor/-matrix auf ``size`` Spalten auffüllen (Vokabular ist gewachsen)."""
+    pad = size - counts.shape[-1]
+    if pad <= 0:
+        return counts
+    widths = [(0, 0)] * (counts.ndim - 1) + [(0, pad)]
+    return np.pad(counts, widths)
+
+
+def column_counts(X):
+    """Anzahl Nennungen je Kategorie."""
+    return np.asarray(X.sum(axis=0)).ravel().astype(np.int64)
+
+
+def binary(X):
+    """0/1-Indikatormatrix (Mehrfachnennungen derselben Kategorie zählen einmal)."""
+    Xb = X.copy()
+    Xb.data = (Xb.data > 0).astype(np.int32)
+    return Xb
+
+
+def has_category(X, col):
+    """Bool-Vektor: Teilnehmende, die Kategorie ``col`` gewählt haben."""
+    if col is None or col >= X.shape[1]:
+        return np.zeros(X.shape[0], dtype=bool)
+    return np.asarray(X[:, col].todense()).ravel() > 0
+
+
+def cooccurrence(X, columns):
+    """Wie oft wurden zwei Kategorien gemeinsam gewählt (Diagonale = Teilnehmende je Kategorie)."""
+    Xb = binary(X)
+    co = (Xb.T @ Xb).toarray()
+    return pd.DataFrame(co, index=columns, columns=columns)
+
+
+def crosstab_codes(row_codes, col_codes, n_rows, n_cols):
+    """Kreuztabelle zweier Code-Vektoren per ``bincount`` (fehlende Codes < 0 fallen weg)."""
+    ok = (row_codes >= 0) & (col_codes >= 0)
+    flat = row_codes[ok] * n_cols + col_codes[ok]
+    return np.bincount(flat, minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+
+
+def onehot(codes, k):
+    """Code-Vektor (fehlend < 0) -> 0/1-Matrix n × k."""
+    M = np.zeros((len(codes), k), dtype=np.int64)
+    ok = codes >= 0
+    M[np.flatnonzero(ok), codes[ok]] = 1
+    return M
@@ -0,0 +1,183 @@
+"""Alle Statista-Tabellen eines Ordners als eine lange Tabelle (Quelle, Jahr, Kategorie, pct).
+
+Die Excel-Dateien werden am Namen erkannt:
+
+* ``<Quelle> <Jahr>.xlsx`` (z. B. ``Online Zahlungsarten 2023.xlsx``): eine
+  Erhebung, je Zeile Bezeichnung und Anteil. Die Bezeichnungen laufen über
+  :func:`.taxonomy.shares_by_code` auf die feinen Kategorien; Bezeichnungen
+  ohne Eintrag in ``taxonomy.STATISTA_LABELS`` bleiben (mit Warnung) als
+  eigene Kategorie erhalten.
+* ``<Quelle>.xlsx`` ohne Jahr (z. B. ``Anteile von Zahlungsarten.xlsx``): eine
+  Zeitreihe, je Zeile ein Jahr, je Spalte eine Kategorie. Die Spaltenköpfe
+  kommen aus dem Blatt und laufen über ``taxonomy.EINZELHANDEL_LABELS``.
+
+Geparst werden nur neue oder geänderte Dateien, parallel in einem
+Prozesspool. Je Datei liegt ein Teil unter ``.cache/panel/<Ordner>/`` (gleiche
+Frische-Prüfung wie der Excel-Cache); die zusammengesetzte Tabelle steht in
+``panel.arrow``. Ein neues Jahr kostet damit einen Parse, keine Codeänderung.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import ingest
+from .ingest import file_sha256, read_arrow, read_excel_cached, write_arrow
+from .paths import CACHE_DIR, ZAHLUNGSARTEN_DIR
+from .taxonomy import EINZELHANDEL_LABELS, KATEGORIEN, encode, shares_by_code
+
+log = logging.getLogger(__name__)
+
+PANEL_DIR = CACHE_DIR / "panel"
+PANEL_VERSION = 1
+COLUMNS = ["Quelle", "Jahr", "Kategorie", "pct"]
+
+# Dateien im selben Ordner, die keine Statista-Tabellen sind (kleingeschrieben)
+SKIP = ("umfrage",)
+# "<Quelle> <Jahr>"
+_NAME = re.compile(r"^(?P<quelle>.*\S)\s+(?P<jahr>(?:19|20)\d\d)$")
+
+_stats = {"parsed": 0, "reused": 0}
+
+
+def panel_report():
+    """Geparste bzw. aus dem Panel-Cache übernommene Dateien seit Prozessstart.
+
+    Geparst wird meist in Pool-Prozessen, deren Excel-Cache-Zähler
+    (``cache_report``) hier nicht ankommen.
+    """
+    return f"Statista-Panel: {_stats['parsed']} Dateien geparst, {_stats['reused']} aus dem Cache"
+
+
+def discover(folder=ZAHLUNGSARTEN_DIR):
+    """[(Pfad, Quelle, Jahr oder None), ...] aller Statista-Dateien, nach Quelle und Jahr."""
+    found = []
+    for path in Path(folder).glob("*.xlsx"):
+        if path.name.startswith("~$") or path.stem.casefold() in SKIP:
+            continue
+        m = _NAME.match(path.stem)
+        if m:
+            found.append((path, m["quelle"], int(m["jahr"])))
+        else:
+            found.append((path, path.stem, None))
+    return sorted(found, key=lambda f: (f[1], -1 if f[2] is None else f[2]))
+
+
+def parse_file(path, quelle, jahr=None):
+    """Eine Datei -> lange Tabelle (``COLUMNS``)."""
+    if jahr is not None:
+        df = read_excel_cached(path, skiprows=4, sheet_name=1,
+                               names=["Methode", "Prozent"], usecols="B:C")
+        df = df.assign(Methode=df["Methode"].astype(str).str.strip())
+        unknown = encode(df["Methode"], jahr, strict=False) < 0
+        pct = shares_by_code(df[~unknown], jahr)
+        codes = np.flatnonzero(~np.isnan(pct))
+        # neue Bezeichnungen: eigene Kategorie, wie die Spaltenköpfe der Zeitreihen
+        extra = df[unknown].assign(Prozent=pd.to_numeric(df["Prozent"][unknown], errors="coerce"))
+        extra = extra.groupby("Methode", sort=False)["Prozent"].sum()
+        if len(extra):
+            log.warning("%s: Zahlungsart(en) ohne Eintrag in taxonomy.STATISTA_LABELS, "
+                        "als eigene Kategorie übernommen: %s", path.name, list(extra.index))
+        return pd.DataFrame({
+            "Quelle": quelle,
+            "Jahr": np.full(len(codes) + len(extra), jahr, dtype=np.int64),
+            "Kategorie": np.concatenate([np.asarray(KATEGORIEN, dtype=object)[codes],
+                                         extra.index.to_numpy(dtype=object)]),
+            "pct": np.concatenate([pct[codes], extra.to_numpy(dtype=float)]),
+        }, columns=COLUMNS)
+
+    # Zeitreihe: erste belegte Spalte = Jahr, danach eine Spalte je Kategorie
+    df = read_excel_cached(path, skiprows=4, sheet_name=1).dropna(axis=1, how="all")
+    jahre = pd.to_numeric(df.iloc[:, 0], errors="coerce")
+    values = df.iloc[:, 1:].apply(pd.to_numeric, errors="coerce")[jahre.notna()]
+    values = values.dropna(axis=1, how="all")  # z. B. die Einheitenspalte "in %"
+    values.columns = [EINZELHANDEL_LABELS.get(str(c).strip(), str(c).strip()) for c in values.columns]
+    n, k = values.shape
+    return pd.DataFrame({
+        "Quelle": quelle,
+        "Jahr": np.repeat(jahre[jahre.notna()].to_numpy(dtype=np.int64), k),
+        "Kategorie": np.tile(np.asarray(values.columns, dtype=object), n),
+        "pct": values.to_numpy(dtype=float).ravel(),
+    }, columns=COLUMNS)
+
+
+def _parse_all(files, processes=None):
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(files))
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            return list(pool.map(parse_file, *zip(*files)))
+    return [parse_file(*f) for f in files]
+
+
+def _concat(parts):
+    if not parts:
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in
+                             zip(COLUMNS, [str, np.int64, str, float])})
+    return pd.concat(parts, ignore_index=True)
+
+
+def panel_dir(folder):
+    """Ablage der Teile eines Ordners (ein Verzeichnis je Ordnerpfad)."""
+    key = hashlib.sha1(str(Path(folder).resolve()).encode("utf-8")).hexdigest()[:16]
+    return PANEL_DIR / key
+
+
+def load_panels(folder=ZAHLUNGSARTEN_DIR, processes=None):
+    """Lange Tabelle aller Statista-Dateien in ``folder``; parst nur Neues/Geändertes."""
+    files = discover(folder)
+    if not ingest.ENABLED:
+        _stats["parsed"] += len(files)
+        return _concat(_parse_all(files, processes))
+
+    target = panel_dir(folder)
+    manifest_file, panel_file = target / "manifest.json", target / "panel.arrow"
+    try:
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    if manifest.get("version") != PANEL_VERSION:
+        manifest = {"version": PANEL_VERSION, "files": {}}
+    entries = manifest["files"]
+
+    todo, touched = [], False
+    for path, quelle, jahr in files:
+        meta, stat = entries.get(path.name), path.stat()
+        if (meta is None or not (target / meta["part"]).exists()
+                or [meta["quelle"], meta["jahr"]] != [quelle, jahr]
+                or not ingest._is_fresh(meta, path, stat)):
+            todo.append((path, quelle, jahr))
+        elif meta["mtime_ns"] != stat.st_mtime_ns:
+            meta["mtime_ns"] = stat.st_mtime_ns
+            touched = True
+
+    _stats["parsed"] += len(todo)
+    _stats["reused"] += len(files) - len(todo)
+    target.mkdir(parents=True, exist_ok=True)
+    for (path, quelle, jahr), part in zip(todo, _parse_all(todo, processes)):
+        name = f"{hashlib.sha1(path.name.encode('utf-8')).hexdigest()[:16]}.arrow"
+        write_arrow(part, target / name)
+        stat = path.stat()
+        entries[path.name] = {"part": name, "quelle": quelle, "jahr": jahr, "size": stat.st_size,
+                              "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(path)}
+    gone = set(entries) - {path.name for path, _, _ in files}
+    for name in gone:
+        (target / entries.pop(name)["part"]).unlink(missing_ok=True)
+    log.debug("Statista-Panels: %d Dateien, %d neu geparst, %d entfernt",
+              len(files), len(todo), len(gone))
+
+    if todo or gone or not panel_file.exists():
+        parts = [read_arrow(target / entries[path.name]["part"]) for path, _, _ in files]
+        write_arrow(_concat(parts), panel_file)
+    if todo or gone or touched:
+        tmp = manifest_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, manifest_file)
+    return read_arrow(panel_file)
@@ -0,0 +1,21 @@
+import os
+from pathlib import Path
+
+# Projektwurzel = Ordner oberhalb des Pakets
+ROOT = Path(__file__).resolve().parent.parent
+
+ZAHLUNGSARTEN_DIR = ROOT / "Online Zahlungsarten"
+WARENKORB_DIR = ROOT / "Steigender Warenkorbwert"
+
+# Alle Caches landen hier (per ZB_CACHE_DIR überschreibbar)
+CACHE_DIR = Path(os.environ.get("ZB_CACHE_DIR", ROOT / ".cache"))
+
+# Dauerhafter Zustand (z. B. Zählstand der Umfrage), anders als der Cache nicht
+# ohne Weiteres wiederherstellbar (per ZB_STATE_DIR überschreibbar)
+STATE_DIR = Path(os.environ.get("ZB_STATE_DIR", ROOT / ".state"))
+
+
+def survey_file(folder):
+    """Umfrage-Export eines Analyseordners; ZB_UMFRAGE zeigt auf einen anderen
+    Export (z. B. eine große CSV-Datei)."""
+    return Path(os.environ.get("ZB_UMFRAGE", Path(folder) / "Umfrage.xlsx"))
@@ -0,0 +1,551 @@
+"""Inkrementelle Pipeline über beide Analysen (``python -m zahlungsbereitschaft``).
+
+Jede Stufe deklariert ihre Eingaben und Ausgaben als Dateien. Daraus ergibt
+sich der Abhängigkeitsgraph: eine Stufe hängt von allen Stufen ab, die eine
+ihrer Eingaben schreiben. Zwischenergebnisse liegen als Arrow- bzw.
+JSON-Dateien unter ``.cache/pipeline/``.
+
+Eine Stufe wird nur neu ausgeführt, wenn
+
+* sich der Inhalt einer Eingabe geändert hat (SHA-256, per Größe/mtime
+  abgekürzt),
+* sich ihr Code geändert hat (Quelltext der Stufe + aller Paketmodule, die
+  sie direkt oder über deren Importe erreicht, siehe :func:`stage_modules`),
+* eine Ausgabe fehlt, oder ``--force`` gesetzt ist.
+
+Schreibt eine Stufe inhaltlich identische Ausgaben, laufen die nachfolgenden
+Stufen nicht erneut. Unabhängige Stufen laufen parallel in einem Prozesspool.
+"""
+import ast
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from . import bootstrap, cube, panel, statista, stats, store, taxonomy, warenkorb, weighting
+from .ingest import file_sha256, read_arrow, write_arrow
+from .paths import CACHE_DIR, WARENKORB_DIR, ZAHLUNGSARTEN_DIR, survey_file
+from .render import FigureSpec, render
+
+PIPELINE_DIR = CACHE_DIR / "pipeline"
+STATE = PIPELINE_DIR / "state.json"
+
+
+@dataclass(eq=False)
+class Stage:
+    name: str
+    func: object  # func(inp, out): Funktion auf Modulebene (picklebar)
+    inputs: dict
+    outputs: dict
+    code: tuple = field(default_factory=tuple)  # weitere Paketmodule (die importierten findet code_hash)
+
+
+# -------------------------------------------------------
+# Laden/Speichern der Zwischenergebnisse
+# -------------------------------------------------------
+def _load(path):
+    path = Path(path)
+    if path.suffix == ".arrow":
+        return read_arrow(path)
+    if path.suffix == ".json":
+        return json.loads(path.read_text(encoding="utf-8"))
+    if path.suffix == ".csv":
+        return pd.read_csv(path)
+    return path  # Quelldateien (xlsx) liest die Stufe selbst
+
+
+def _save(obj, path):
+    path = Path(path)
+    if path.suffix == ".arrow":
+        write_arrow(obj, path)
+    elif path.suffix == ".json":
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(obj, ensure_ascii=False, indent=1), encoding="utf-8")
+    else:
+        raise ValueError(f"Unbekanntes Format: {path}")
+
+
+def _tmp(name):
+    return PIPELINE_DIR / name
+
+
+# -------------------------------------------------------
+# Stufen: Steigender Warenkorbwert
+# -------------------------------------------------------
+def wk_load(inp, out):
+    frames = warenkorb.load_warenkorb(inp["inflation"].parent)
+    for name, df in frames.items():
+        _save(df, out[name])
+
+
+def wk_clean(inp, out):
+    for name, df in warenkorb.clean_warenkorb(inp).items():
+        _save(df, out[name])
+
+
+def wk_cpi(inp, out):
+    _save(warenkorb.build_cpi(inp["inflation"], inp["lm"], inp["bekl"], inp["food"]), out["cpi"])
+
+
+def wk_merge(inp, out):
+    df = warenkorb.merge_real(inp["cpi"], inp["lm"], inp["bekl"], inp["food"])
+    df.to_csv(out["auswertung"], index=False)
+
+
+def wk_survey(inp, out):
+    res = store.survey_store(inp["umfrage"]).warenkorb_counts(
+        warenkorb.ORDER_VERAENDERUNG, warenkorb.ORDER_ASPEKTE).result()
+    _save(res["ver"], out["ver"])
+    _save(res["asp"], out["asp"])
+    _save({"total": int(res["total"])}, out["total"])
+
+
+def wk_bootstrap(inp, out):
+    _save(bootstrap.survey_intervals("warenkorb", inp["umfrage"]), out["ci"])
+
+
+def wk_metrics(inp, out):
+    df5, summary = warenkorb.warenkorb_metrics(inp["auswertung"])
+    _save(df5, out["df5"])
+    _save(summary, out["summary"])
+    _save(warenkorb.warenkorb_windows(inp["auswertung"]), out["fenster"])
+
+
+def wk_tests(inp, out):
+    k = warenkorb.anteil_gestiegen(inp["ver"])
+    n = inp["total"]["total"]
+    pvalues = stats.binomial_tests(k, n)
+    _save({
+        "k": k, "n": n,
+        "p_empf_anstieg": k / n * 100,
+        "p_real_5j": warenkorb.growth_pct(inp["df5"]["LM_Umsatz_real"]),
+        "p_0.5": pvalues[0.5], "p_0.33": pvalues[1/3],
+    }, out["tests"])
+    _save(stats.binomial_sensitivity(k, n), out["sensitivitaet"])
+    _save(stats.binomial_power().reset_index().rename(columns=str), out["power"])
+
+
+def wk_plots(inp, out):
+    from . import plots
+
+    render([
+        FigureSpec(out["lm"], plots.lm_nominal_real, {"df": inp["auswertung"]}),
+        FigureSpec(out["konsum"], plots.konsum_nominal_real, {"df": inp["auswertung"]}),
+        FigureSpec(out["index"], plots.warenkorb_index, {"df5": inp["df5"]}),
+        FigureSpec(out["verteilung"], plots.warenkorb_verteilung,
+                   {"ver": inp["ver"], "ci": bootstrap.frage(inp["ci"], "Veränderung")},
+                   {"order": warenkorb.ORDER_VERAENDERUNG}),
+        FigureSpec(out["aspekte"], plots.warenkorb_aspekte,
+                   {"asp": inp["asp"], "ci": bootstrap.frage(inp["ci"], "Aspekt")}),
+    ], processes=1)
+
+
+def wk_weighting(inp, out):
+    # Gewichte auf die Statista-Anteile 2023 der Zahlungsarten (weighting.py)
+    wuerfel = cube.survey_cube(inp["umfrage"])
+    gew = weighting.survey_weights(wuerfel, weighting.statista_targets(inp["vergleich_2023"]["pct_2023"]))
+    tabellen = weighting.weighted_tables(wuerfel, gew["weights"], ver=inp["ver"].fillna(0),
+                                         asp=inp["asp"].fillna(0))
+    for name in ("ver", "asp"):
+        Path(out[name]).parent.mkdir(parents=True, exist_ok=True)
+        tabellen[name].to_csv(out[name], index=False)
+
+
+def wk_exports(inp, out):
+    for name in ("summary", "fenster", "ver", "asp", "ci", "sensitivitaet", "power"):
+        Path(out[name]).parent.mkdir(parents=True, exist_ok=True)
+        inp[name].to_csv(out[name], index=False)
+
+
+# -------------------------------------------------------
+# Stufen: Online Zahlungsarten
+# -------------------------------------------------------
+def za_load(inp, out):
+    # alle Statista-Dateien des Ordners, geparst wird nur Neues/Geändertes
+    _save(panel.load_panels(ZAHLUNGSARTEN_DIR, processes=1), out["panel"])
+
+
+def za_clean(inp, out):
+    # gemeinsame Kategorie-Norm (taxonomy.py) für alle Jahre
+    _save(statista.jahresvergleich_panel(inp["panel"]), out["jahresvergleich"])
+    pct = statista.vergleichsanteile_panel(inp["panel"], 2023)
+    _save(pd.DataFrame({"Kategorie": taxonomy.VERGLEICHSKATEGORIEN, "pct_2023": pct}),
+          out["vergleich_2023"])
+    _save(statista.einzelhandel_panel(inp["panel"]), out["einzelhandel"])
+
+
+def za_survey(inp, out):
+    umfrage = store.survey_store(inp["umfrage"])
+    res = umfrage.payment_counts().result()
+    _save(res["method_counts"], out["method_counts"])
+    _save(res["bnpl_counts"], out["bnpl_counts"])
+    _save(res["kreuz"].reset_index(), out["kreuz"])
+    vergleich = umfrage.payment_counts(mapping=taxonomy.UMFRAGE_ZU_VERGLEICH).result()
+    _save(vergleich["method_counts"], out["vergleich_counts"])
+    _save({"total": int(res["total"])}, out["total"])
+
+
+def za_bootstrap(inp, out):
+    _save(bootstrap.survey_intervals("zahlungsarten", inp["umfrage"]), out["ci"])
+
+
+def za_merge(inp, out):
+    plotdf = statista.compare_survey_vs_statista(
+        inp["vergleich_counts"], inp["total"]["total"], inp["vergleich_2023"]["pct_2023"])
+    _save(plotdf.reset_index(), out["plotdf"])
+
+
+def za_tests(inp, out):
+    plotdf = inp["plotdf"].set_index("Kategorie")
+    _save(stats.chi2_survey_vs_statista(plotdf, inp["total"]["total"],
+                                        permutations=stats.N_PERMUTATIONS), out["chi2"])
+
+
+def _kreuz(df):
+    return df.set_index("Zahlungsarten")
+
+
+def za_plots(inp, out):
+    from . import plots
+
+    jahre = inp["jahresvergleich"]
+    neuestes = next(c for c in jahre.columns if c.startswith("pct_"))
+    jahre = jahre.sort_values(neuestes, ascending=False).fillna(0)
+    ci = inp["ci"]
+    render([
+        FigureSpec(out["jahre"], plots.vergleich_jahre, {"plotdf": jahre}),
+        FigureSpec(out["einzelhandel"], plots.einzelhandel_linien,
+                   {"zahlungsarten": inp["einzelhandel"]}),
+        FigureSpec(out["vergleich"], plots.umfrage_vs_statista,
+                   {"plotdf": bootstrap.vergleich_intervalle(inp["plotdf"].set_index("Kategorie"), ci)}),
+        FigureSpec(out["hbar"], plots.zahlungsarten_hbar,
+                   {"method_counts": inp["method_counts"], "ci": bootstrap.frage(ci, "Zahlungsart")}),
+        FigureSpec(out["bnpl"], plots.bnpl_aenderung_bar,
+                   {"bnpl_counts": inp["bnpl_counts"], "ci": bootstrap.frage(ci, "BNPL")}),
+        FigureSpec(out["kreuz"], plots.bnpl_kreuz_stacked, {"kreuz": _kreuz(inp["kreuz"])}),
+    ], processes=1)
+
+
+def za_exports(inp, out):
+    inp["method_counts"].to_csv(out["method_counts"], index=False)
+    inp["bnpl_counts"].to_csv(out["bnpl_counts"], index=False)
+    _kreuz(inp["kreuz"]).to_csv(out["kreuz"])
+    inp["ci"].to_csv(out["ci"], index=False)
+
+
+def za_weighting(inp, out):
+    wuerfel = cube.survey_cube(inp["umfrage"])
+    gew = weighting.survey_weights(wuerfel, weighting.statista_targets(inp["vergleich_2023"]["pct_2023"]))
+    tabellen = weighting.weighted_tables(wuerfel, gew["weights"],
+                                         plotdf=inp["plotdf"].set_index("Kategorie"),
+                                         bnpl_counts=inp["bnpl_counts"])
+    gew["ziele"].to_csv(out["ziele"], index=False)
+    tabellen["plotdf"].to_csv(out["plotdf"])
+    tabellen["bnpl_counts"].to_csv(out["bnpl_counts"], index=False)
+
+
+# -------------------------------------------------------
+# Graph
+# -------------------------------------------------------
+def default_stages():
+    wk, za = WARENKORB_DIR, ZAHLUNGSARTEN_DIR
+    raw = {name: _tmp(f"wk_raw_{name}.arrow") for name in warenkorb.QUELLEN}
+    clean = {name: _tmp(f"wk_clean_{name}.arrow") for name in warenkorb.QUELLEN}
+    auswertung = wk / "warenkorb_auswertung.csv"
+    wk_bilder, wk_erg, za_bilder = wk / "Bilder", wk / "Ergebnisse", za / "Bilder"
+    wk_ver, wk_asp, wk_total = _tmp("wk_ver.arrow"), _tmp("wk_asp.arrow"), _tmp("wk_total.json")
+    df5, summary, fenster = _tmp("wk_df5.arrow"), _tmp("wk_summary.arrow"), _tmp("wk_fenster.arrow")
+    wk_ci, za_ci = _tmp("wk_ci.arrow"), _tmp("za_ci.arrow")
+    wk_sens, wk_power = _tmp("wk_sensitivitaet.arrow"), _tmp("wk_power.arrow")
+
+    za_panel, za_einzelhandel = _tmp("za_panel.arrow"), _tmp("za_einzelhandel.arrow")
+    jahresvergleich, vergleich_2023 = _tmp("za_jahresvergleich.arrow"), _tmp("za_vergleich_2023.arrow")
+    umfrage = {name: _tmp(f"za_{name}.arrow")
+               for name in ("method_counts", "bnpl_counts", "kreuz", "vergleich_counts")}
+    za_total, plotdf = _tmp("za_total.json"), _tmp("za_plotdf.arrow")
+
+    return [
+        # ---------- Steigender Warenkorbwert ----------
+        Stage("warenkorb.load", wk_load,
+              {name: wk / datei for name, (datei, _) in warenkorb.QUELLEN.items()}, raw),
+        Stage("warenkorb.clean", wk_clean, raw, clean),
+        Stage("warenkorb.cpi", wk_cpi,
+              {k: clean[k] for k in ("inflation", "lm", "bekl", "food")}, {"cpi": _tmp("wk_cpi.arrow")}),
+        Stage("warenkorb.merge", wk_merge,
+              {"cpi": _tmp("wk_cpi.arrow"), **{k: clean[k] for k in ("lm", "bekl", "food")}},
+              {"auswertung": auswertung}),
+        Stage("warenkorb.umfrage", wk_survey, {"umfrage": survey_file(wk)},
+              {"ver": wk_ver, "asp": wk_asp, "total": wk_total}),
+        Stage("warenkorb.bootstrap", wk_bootstrap, {"umfrage": survey_file(wk)}, {"ci": wk_ci}),
+        Stage("warenkorb.metrics", wk_metrics, {"auswertung": auswertung},
+              {"df5": df5, "summary": summary, "fenster": fenster}),
+        Stage("warenkorb.tests", wk_tests, {"ver": wk_ver, "total": wk_total, "df5": df5},
+              {"tests": _tmp("wk_tests.json"), "sensitivitaet": wk_sens, "power": wk_power}),
+        Stage("warenkorb.plots", wk_plots,
+              {"auswertung": auswertung, "df5": df5, "ver": wk_ver, "asp": wk_asp, "ci": wk_ci},
+              {"lm": wk_bilder / "lm_umsatz_nominal_vs_real.png",
+               "konsum": wk_bilder / "konsum_nominal_vs_real.png",
+               "index": wk_bilder / "warenkorb_index_lm_5J.png",
+               "verteilung": wk_bilder / "umfrage_warenkorb_verteilung.png",
+               "aspekte": wk_bilder / "umfrage_warenkorb_aspekte.png"}),
+        Stage("warenkorb.exports", wk_exports,
+              {"summary": summary, "fenster": fenster, "ver": wk_ver, "asp": wk_asp, "ci": wk_ci,
+               "sensitivitaet": wk_sens, "power": wk_power},
+              {"summary": wk_erg / "statista_warenkorb_5J_summary.csv",
+               "fenster": wk_erg / "statista_warenkorb_zeitfenster.csv",
+               "ver": wk_erg / "umfrage_warenkorb_verteilung.csv",
+               "asp": wk_erg / "umfrage_warenkorb_aspekte.csv",
+               "ci": wk_erg / "umfrage_warenkorb_konfidenzintervalle.csv",
+               "sensitivitaet": wk_erg / "binomialtest_sensitivitaet.csv",
+               "power": wk_erg / "binomialtest_power.csv"}),
+        Stage("warenkorb.gewichtung", wk_weighting,
+              {"umfrage": survey_file(wk), "vergleich_2023": vergleich_2023, "ver": wk_ver, "asp": wk_asp},
+              {"ver": wk_erg / "umfrage_warenkorb_verteilung_gewichtet.csv",
+               "asp": wk_erg / "umfrage_warenkorb_aspekte_gewichtet.csv"}),
+
+        # ---------- Online Zahlungsarten ----------
+        Stage("zahlungsarten.load", za_load,
+              {path.name: path for path, _, _ in panel.discover(za)},
+              {"panel": za_panel}),
+        Stage("zahlungsarten.clean", za_clean, {"panel": za_panel},
+              {"jahresvergleich": jahresvergleich, "vergleich_2023": vergleich_2023,
+               "einzelhandel": za_einzelhandel}),
+        Stage("zahlungsarten.umfrage", za_survey, {"umfrage": survey_file(za)},
+              {**umfrage, "total": za_total}),
+        Stage("zahlungsarten.bootstrap", za_bootstrap, {"umfrage": survey_file(za)}, {"ci": za_ci}),
+        Stage("zahlungsarten.merge", za_merge,
+              {"vergleich_counts": umfrage["vergleich_counts"], "total": za_total,
+               "vergleich_2023": vergleich_2023},
+              {"plotdf": plotdf}),
+        Stage("zahlungsarten.tests", za_tests, {"plotdf": plotdf, "total": za_total},
+              {"chi2": _tmp("za_chi2.json")}),
+        Stage("zahlungsarten.plots", za_plots,
+              {"jahresvergleich": jahresvergleich, "einzelhandel": za_einzelhandel,
+               "plotdf": plotdf, "ci": za_ci,
+               **{k: umfrage[k] for k in ("method_counts", "bnpl_counts", "kreuz")}},
+              {"jahre": za_bilder / statista.jahresvergleich_datei(statista.online_years(za)),
+               "einzelhandel": za_bilder / "Zahlungsarten_Einzelhandel.png",
+               "vergleich": za_bilder / "Vergleich_Umfrage_vs_Statista.png",
+               "hbar": za_bilder / "umfrage_zahlungsarten_hbar.png",
+               "bnpl": za_bilder / "umfrage_bnpl_aenderung_bar.png",
+               "kreuz": za_bilder / "umfrage_bnpl_kreuztabelle_stacked.png"}),
+        Stage("zahlungsarten.exports", za_exports,
+              {"ci": za_ci, **{k: umfrage[k] for k in ("method_counts", "bnpl_counts", "kreuz")}},
+              {"method_counts": za_bilder / "umfrage_zahlungsarten_counts.csv",
+               "bnpl_counts": za_bilder / "umfrage_bnpl_counts.csv",
+               "kreuz": za_bilder / "umfrage_bnpl_kreuztabelle.csv",
+               "ci": za_bilder / "umfrage_konfidenzintervalle.csv"}),
+        Stage("zahlungsarten.gewichtung", za_weighting,
+              {"umfrage": survey_file(za), "vergleich_2023": vergleich_2023, "plotdf": plotdf,
+               "bnpl_counts": umfrage["bnpl_counts"]},
+              {"ziele": za_bilder / "umfrage_gewichtung_ziele.csv",
+               "plotdf": za_bilder / "umfrage_vs_statista_gewichtet.csv",
+               "bnpl_counts": za_bilder / "umfrage_bnpl_counts_gewichtet.csv"}),
+    ]
+
+
+def dependencies(stages):
+    """Stufe -> Menge der Stufen, die eine ihrer Eingaben schreiben."""
+    producer = {}
+    for s in stages:
+        for path in s.outputs.values():
+            key = Path(path).resolve()
+            if key in producer:
+                raise ValueError(f"{path} wird von {producer[key]} und {s.name} geschrieben")
+            producer[key] = s.name
+    deps = {s.name: {producer[Path(p).resolve()] for p in s.inputs.values()
+                     if Path(p).resolve() in producer} for s in stages}
+    # Zyklen früh erkennen
+    seen, order = set(), []
+    while len(order) < len(stages):
+        ready = [n for n in deps if n not in seen and deps[n] <= seen]
+        if not ready:
+            raise ValueError(f"Zyklus in der Pipeline: {sorted(set(deps) - seen)}")
+        seen.update(ready)
+        order.extend(ready)
+    return deps
+
+
+# -------------------------------------------------------
+# Change-Detection
+# -------------------------------------------------------
+PACKAGE_DIR = Path(__file__).parent
+
+
+def _imports(tree):
+    """Paketmodule, die ein Syntaxbaum importiert (auch lazy in Funktionen)."""
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.level == 1:
+            found.update([node.module.split(".")[0]] if node.module else [a.name for a in node.names])
+        elif isinstance(node, ast.ImportFrom) and (node.module or "").startswith(f"{__package__}."):
+            found.add(node.module.split(".")[1])
+        elif isinstance(node, ast.Import):
+            found.update(a.name.split(".")[1] for a in node.names
+                         if a.name.startswith(f"{__package__}."))
+    return {m for m in found if (PACKAGE_DIR / f"{m}.py").is_file()}
+
+
+def _function_deps(func, sources, modules):
+    """Quelltext von ``func`` und der Pipeline-Helfer, die sie aufruft; erreichte Paketmodule."""
+    if func in sources:
+        return
+    source = inspect.getsource(func)
+    sources[func] = source
+    tree = ast.parse(inspect.cleandoc(source) if source[:1].isspace() else source)
+    modules.update(_imports(tree))
+    for name in {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}:
+        obj = func.__globals__.get(name)
+        module = getattr(obj, "__name__", "") if inspect.ismodule(obj) else getattr(obj, "__module__", "")
+        if not (module or "").startswith(f"{__package__}."):
+            continue
+        if module == __name__ and inspect.isfunction(obj):
+            _function_deps(obj, sources, modules)
+        elif module != __name__:
+            modules.add(module.split(".")[1])
+
+
+def stage_modules(stage):
+    """Alle Paketmodule, von denen eine Stufe abhängt (transitiv über ihre Importe)."""
+    sources, todo = {}, set(stage.code)
+    _function_deps(stage.func, sources, todo)
+    seen = set()
+    while todo:
+        mod = todo.pop()
+        if mod in seen or mod == __name__.split(".")[1]:
+            continue
+        seen.add(mod)
+        todo |= _imports(ast.parse((PACKAGE_DIR / f"{mod}.py").read_bytes())) - seen
+    return sorted(seen), sources
+
+
+def code_hash(stage):
+    h = hashlib.sha256()
+    modules, sources = stage_modules(stage)
+    for source in sources.values():
+        h.update(source.encode())
+    for mod in modules:
+        h.update((PACKAGE_DIR / f"{mod}.py").read_bytes())
+    return h.hexdigest()
+
+
+def _fingerprint(path, known):
+    """SHA-256 einer Datei; bei gleicher Größe/mtime aus dem letzten Lauf übernommen."""
+    st = Path(path).stat()
+    if known and known.get("size") == st.st_size and known.get("mtime_ns") == st.st_mtime_ns:
+        return known
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": file_sha256(path)}
+
+
+def _load_state():
+    try:
+        return json.loads(STATE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(state):
+    STATE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, STATE)
+
+
+def _inputs_fingerprint(stage, old):
+    old = old or {}
+    return {str(p): _fingerprint(p, old.get(str(p))) for p in stage.inputs.values()}
+
+
+def is_stale(stage, entry, fingerprints, code):
+    if not entry or entry.get("code") != code:
+        return True
+    if any(not Path(p).exists() for p in stage.outputs.values()):
+        return True
+    old = entry.get("inputs", {})
+    return any(old.get(p, {}).get("sha256") != fp["sha256"] for p, fp in fingerprints.items())
+
+
+# -------------------------------------------------------
+# Ausführung
+# -------------------------------------------------------
+def _run_stage(stage):
+    os.environ["ZB_HEADLESS"] = "1"
+    t0 = time.perf_counter()
+    inp = {k: _load(p) for k, p in stage.inputs.items()}
+    stage.func(inp, stage.outputs)
+    return time.perf_counter() - t0
+
+
+def run(stages=None, targets=None, force=False, jobs=None):
+    """Führt alle veralteten Stufen aus; gibt {Stufe: "ausgeführt"|"aktuell"} zurück.
+
+    ``targets`` beschränkt den Lauf auf die genannten Stufen (bzw. Präfixe wie
+    ``warenkorb``) samt ihren Vorgängern.
+    """
+    stages = default_stages() if stages is None else stages
+    deps = dependencies(stages)
+    if targets:
+        wanted = {s.name for s in stages
+                  if any(s.name == t or s.name.startswith(t + ".") for t in targets)}
+        if not wanted:
+            raise ValueError(f"Unbekannte Stufe(n): {targets}")
+        todo = list(wanted)
+        while todo:
+            for d in deps[todo.pop()]:
+                if d not in wanted:
+                    wanted.add(d)
+                    todo.append(d)
+        stages = [s for s in stages if s.name in wanted]
+    by_name = {s.name: s for s in stages}
+
+    state = _load_state()
+    status, running, pending, done = {}, {}, {}, set()
+    workers = jobs or os.cpu_count() or 1
+
+    def submit_ready(pool):
+        # so lange wiederholen, bis keine weitere Stufe als "aktuell" abgehakt wird
+        progressed = True
+        while progressed:
+            progressed = False
+            for name, s in by_name.items():
+                if name in status or name in pending or not deps[name] <= done:
+                    continue
+                missing = [str(p) for p in s.inputs.values() if not Path(p).exists()]
+                if missing:
+                    raise FileNotFoundError(f"{name}: Eingabe fehlt: {missing}")
+                code = code_hash(s)
+                fps = _inputs_fingerprint(s, state.get(name, {}).get("inputs"))
+                if force or is_stale(s, state.get(name), fps, code):
+                    pending[name] = {"code": code, "inputs": fps}
+                    running[pool.submit(_run_stage, s)] = name
+                else:
+                    state[name]["inputs"] = fps  # mtime nachziehen
+                    status[name] = "aktuell"
+                    done.add(name)
+                    progressed = True
+                    print(f"  = {name}")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        submit_ready(pool)
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                seconds = fut.result()
+                state[name] = pending.pop(name)
+                _save_state(state)
+                status[name] = "ausgeführt"
+                done.add(name)
+                print(f"  ✓ {name} ({seconds:.2f}s)")
+            submit_ready(pool)
+
+    _save_state(state)
+    ran = sum(v == "ausgeführt" for v in status.values())
+    print(f"Pipeline: {ran} Stufe(n) ausgeführt, {len(status) - ran} aktuell")
+    return status
@@ -0,0 +1,214 @@
+"""Alle Abbildungen als Funktionen über fertig berechneten Tabellen.
+
+Jede Funktion bekommt nur Tabellen/Optionen und gibt die Figure zurück.
+Speichern, Change-Detection und Parallelisierung übernimmt :mod:`.render`.
+"""
+import matplotlib.pyplot as plt
+import matplotlib.ticker as mticker
+import numpy as np
+
+
+def _count_errors(ci, labels, counts):
+    """Fehlerbalken (2 × n, in Anzahl) aus Bootstrap-Grenzen (:mod:`.bootstrap`), sonst None."""
+    if ci is None:
+        return None
+    c = ci.reindex(list(labels))
+    counts = np.asarray(counts, dtype=float)
+    low = c["Anzahl_low"].fillna(0).to_numpy()
+    high = c["Anzahl_high"].fillna(0).to_numpy()
+    return np.vstack([counts - low, high - counts]).clip(min=0)
+
+
+# -------------------------------------------------------
+# Online Zahlungsarten
+# -------------------------------------------------------
+def vergleich_jahre(plotdf):
+    """Bevorzugte Online-Zahlungsarten, alle Jahre ``pct_<Jahr>`` (Frage2.py)."""
+    spalten = sorted(c for c in plotdf.columns if c.startswith("pct_"))
+    ax = plotdf.plot(x="Kategorie", y=spalten, kind="bar")
+    ax.set_ylabel("in %")
+    ax.set_title("Bevorzugte Online-Zahlungsarten – Vergleich "
+                 + "/".join(c.removeprefix("pct_") for c in spalten))
+    plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+    ax.figure.tight_layout()
+    return ax.figure
+
+
+def einzelhandel_linien(zahlungsarten):
+    """Zahlungsarten im stationären Handel (Frage2.py)."""
+    ax = zahlungsarten.plot(
+        x="Jahr",
+        y=["Bar", "Girocard", "Kreditkarte", "Lastschrift"],
+        kind="line",
+        marker="o"
+    )
+    ax.set_ylabel("Anteil am Umsatz in %")
+    ax.set_title("Zahlungsarten im stationären Handel 2016–2024")
+    ax.figure.tight_layout()
+    return ax.figure
+
+
+def umfrage_vs_statista(plotdf):
+    """Horizontaler Vergleichsplot Umfrage vs. Statista 2023.
+
+    Enthält ``plotdf`` die Spalten ci_low_umfrage/ci_high_umfrage
+    (:func:`.bootstrap.vergleich_intervalle`), bekommen die Umfrage-Balken Fehlerbalken.
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    plotdf[["pct_umfrage", "pct_2023"]].plot(kind="barh", ax=ax)
+    ax.set_xlabel("in %"); ax.set_ylabel("")
+    ax.set_title("Vergleich Zahlungsarten: Eigene Umfrage vs. Statista 2023")
+    ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    umfrage, statista = ax.containers[:2]
+    ax.bar_label(statista, fmt="%.1f", label_type="edge", padding=2)
+    if "ci_low_umfrage" in plotdf:
+        # Umfrage-Werte hinter das Intervall schreiben, damit sie den Fehlerbalken nicht überdecken
+        pct = plotdf["pct_umfrage"].to_numpy()
+        high = np.maximum(plotdf["ci_high_umfrage"].to_numpy(), pct)
+        err = np.vstack([pct - plotdf["ci_low_umfrage"], high - pct]).clip(min=0)
+        y = [b.get_y() + b.get_height() / 2 for b in umfrage]
+        ax.errorbar(pct, y, xerr=err, fmt="none", ecolor="black", capsize=3)
+        for x, yi, v in zip(high, y, pct):
+            ax.text(x, yi, f" {v:.1f}", va="center")
+    else:
+        ax.bar_label(umfrage, fmt="%.1f", label_type="edge", padding=2)
+    fig.tight_layout()
+    return fig
+
+
+def zahlungsarten_hbar(method_counts, ci=None):
+    """A) Zahlungsarten – horizontale Balken (aussagekräftig bei langen Labels).
+
+    ``ci``: Bootstrap-Grenzen je Kategorie (:func:`.bootstrap.frage`) -> Fehlerbalken.
+    """
+    mc = method_counts.sort_values("Anzahl")
+    err = _count_errors(ci, mc["Kategorie"], mc["Anzahl"])
+    fig, ax = plt.subplots()
+    ax.barh(mc["Kategorie"], mc["Anzahl"], xerr=err, capsize=3)
+    ends = mc["Anzahl"] if err is None else mc["Anzahl"] + err[1]
+    for i, (v, x, p) in enumerate(zip(mc["Anzahl"], ends, mc["Anteil_%"])):
+        ax.text(x, i, f" {v} ({p}%)", va="center")
+    ax.set_title("Regelmäßig genutzte Online-Zahlungsarten (Mehrfachauswahl)")
+    ax.set_xlabel("Anzahl Antworten")
+    ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    fig.tight_layout()
+    return fig
+
+
+def bnpl_aenderung_bar(bnpl_counts, ci=None):
+    """B) BNPL-Nutzungsänderung – Balkendiagramm (``ci`` wie bei :func:`zahlungsarten_hbar`)."""
+    bc = bnpl_counts.sort_values("Anzahl", ascending=False)
+    err = _count_errors(ci, bc["Kategorie"], bc["Anzahl"])
+    fig, ax = plt.subplots()
+    ax.bar(bc["Kategorie"], bc["Anzahl"], yerr=err, capsize=3)
+    ends = bc["Anzahl"] if err is None else bc["Anzahl"] + err[1]
+    for x, v, y, p in zip(bc["Kategorie"], bc["Anzahl"], ends, bc["Anteil_%"]):
+        ax.text(x, y, f"{v} ({p}%)", ha="center", va="bottom")
+    ax.set_title("BNPL (z. B. Klarna) – Nutzungsänderung")
+    ax.set_ylabel("Anzahl Personen")
+    ax.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    plt.setp(ax.get_xticklabels(), rotation=0)
+    fig.tight_layout()
+    return fig
+
+
+def bnpl_kreuz_stacked(kreuz):
+    """C) 100%-gestapeltes Balkendiagramm: BNPL in Zahlungsarten vs. BNPL-Historie."""
+    kreuz_pct = (kreuz.T / kreuz.sum(axis=1)).T * 100
+    fig, ax = plt.subplots()
+    bottom = None
+    for col in kreuz_pct.columns:
+        vals = kreuz_pct[col].values
+        ax.bar(kreuz_pct.index, vals, bottom=bottom, label=col)
+        bottom = vals if bottom is None else bottom + vals
+    ax.set_title("BNPL-Auswahl (Zahlungsarten) vs. BNPL-Nutzungsänderung")
+    ax.set_ylabel("Anteil in % (100% je Gruppe)")
+    ax.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    ax.legend(title="Antwort")
+    fig.tight_layout()
+    return fig
+
+
+# -------------------------------------------------------
+# Steigender Warenkorbwert
+# -------------------------------------------------------
+def lm_nominal_real(df):
+    """a) Lebensmittel-Einzelhandel: nominal vs real (Frage1.py)."""
+    fig, ax = plt.subplots()
+    ax.plot(df["Jahr"], df["LM_Umsatz_nom"], marker="o", label="nominal")
+    ax.plot(df["Jahr"], df["LM_Umsatz_real"], marker="o", label="real (inflationsbereinigt)")
+    ax.set_title("Lebensmitteleinzelhandel – Umsatz nominal vs. real")
+    ax.set_xlabel("Jahr"); ax.set_ylabel("Mio. €")
+    ax.legend()
+    ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    fig.tight_layout()
+    return fig
+
+
+def konsum_nominal_real(df):
+    """b) Konsumausgaben Food & Bekleidung: nominal vs real (Frage1.py)."""
+    fig, ax = plt.subplots()
+    ax.plot(df["Jahr"], df["Food_nom"], marker="o", label="Food nominal")
+    ax.plot(df["Jahr"], df["Food_real"], marker="o", label="Food real")
+    ax.plot(df["Jahr"], df["Bekl_nom"], marker="o", label="Bekleidung nominal")
+    ax.plot(df["Jahr"], df["Bekl_real"], marker="o", label="Bekleidung real")
+    ax.set_title("Konsumausgaben – nominal vs. real")
+    ax.set_xlabel("Jahr"); ax.set_ylabel("Mrd. €/Index-Einheiten")
+    ax.legend()
+    ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    fig.tight_layout()
+    return fig
+
+
+def _to_index(series):
+    base = float(series.iloc[0])
+    return series / base * 100.0
+
+
+def warenkorb_index(df5):
+    """Index-Plot (Startjahr = 100) nominal vs. real, Lebensmittelhandel (auswertung.py)."""
+    fig, ax = plt.subplots(figsize=(9, 6))
+    ax.plot(df5["Jahr"], _to_index(df5["LM_Umsatz_nom"]), marker="o", label="nominal")
+    ax.plot(df5["Jahr"], _to_index(df5["LM_Umsatz_real"]), marker="o",
+            label="real (inflationsbereinigt)")
+    ax.set_title("Lebensmitteleinzelhandel – Index (Startjahr = 100), letzte 5 Jahre")
+    ax.set_xlabel("Jahr"); ax.set_ylabel("Index (Start = 100)")
+    ax.legend()
+    ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    fig.tight_layout()
+    return fig
+
+
+def warenkorb_verteilung(ver, order, ci=None):
+    """Plot 1: Veränderung Warenkorbwert (vertikal, feste Reihenfolge, optional mit Fehlerbalken)."""
+    ver_sorted = ver.set_index("Antwort").reindex(order).reset_index()
+    err = _count_errors(ci, ver_sorted["Antwort"], ver_sorted["Anzahl"])
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bars = ax.bar(ver_sorted["Antwort"], ver_sorted["Anzahl"], yerr=err, capsize=3)
+    ax.set_title("Umfrage: Veränderung des Warenkorbwerts (letzte 5 Jahre)")
+    ax.set_ylabel("Anzahl Personen")
+    ax.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    plt.setp(ax.get_xticklabels(), rotation=25, ha="right")
+    tops = np.zeros(len(bars)) if err is None else err[1]
+    for rect, top, cnt, pct in zip(bars, tops, ver_sorted["Anzahl"], ver_sorted["Anteil_%"]):
+        ax.text(rect.get_x()+rect.get_width()/2, rect.get_height()+top+0.2,
+                f"{int(cnt)} ({pct}%)", ha="center", va="bottom")
+    fig.tight_layout()
+    return fig
+
+
+def warenkorb_aspekte(asp, ci=None):
+    """Plot 2: Aspekte (horizontal, mit Labels am Balkenende, optional mit Fehlerbalken)."""
+    asp_sorted = asp.sort_values("Anzahl")
+    err = _count_errors(ci, asp_sorted["Aspekt"], asp_sorted["Anzahl"])
+    fig, ax = plt.subplots(figsize=(11, 6))
+    bars = ax.barh(asp_sorted["Aspekt"], asp_sorted["Anzahl"], xerr=err, capsize=3)
+    ax.set_title("Umfrage: Wofür sind Teilnehmende eher bereit, mehr zu zahlen?")
+    ax.set_xlabel("Anzahl Personen")
+    ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    ends = np.zeros(len(bars)) if err is None else err[1]
+    for rect, end, cnt, pct in zip(bars, ends, asp_sorted["Anzahl"], asp_sorted["Anteil_%"]):
+        ax.text(rect.get_width()+end+0.2, rect.get_y()+rect.get_height()/2,
+                f"{int(cnt)} ({pct}%)", va="center")
+    fig.tight_layout()
+    return fig
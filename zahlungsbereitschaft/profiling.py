@@ -0,0 +1,170 @@
+"""Messpunkte für die Stufen der Auswertungsskripte.
+
+Eingeschaltet über ``ZB_PROFILE=1`` oder ``--profile`` beim Skriptaufruf::
+
+    ZB_PROFILE=1 python Frage2.py
+    python auswertung.py --profile=umfrage      # zusätzlich cProfile für "umfrage"
+
+Ein anderer Wert als ``1`` (bzw. ``--profile=<stufe>``) nennt die Stufe, die
+zusätzlich unter cProfile läuft. Je Stufe werden Laufzeit, CPU-Zeit (inkl.
+beendeter Kindprozesse, z. B. Render-Pool), verarbeitete Zeilen, Zeilen/s und
+der ``tracemalloc``-Höchststand erfasst. ``write()`` legt
+``Ergebnisse/profil/<skript>.json`` und ``.csv`` ab (cProfile:
+``<skript>_<stufe>.prof``, lesbar mit ``python -m pstats``).
+
+Ausgeschaltet liefert :func:`profiler` ein Objekt, dessen ``stage`` immer
+denselben leeren Kontext zurückgibt: kein tracemalloc, keine Uhr, keine Datei.
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+PROFILE_DIR = "profil"  # Unterordner von Ergebnisse/
+CSV_COLUMNS = ["stufe", "wall_s", "cpu_s", "zeilen", "zeilen_pro_s", "peak_mb"]
+
+
+def _setting(argv=None):
+    """``None`` (aus), ``""`` (an) oder Name der cProfile-Stufe."""
+    argv = sys.argv[1:] if argv is None else argv
+    for arg in argv:
+        if arg == "--profile":
+            return ""
+        if arg.startswith("--profile="):
+            return arg.partition("=")[2]
+    value = os.environ.get("ZB_PROFILE", "")
+    if value in ("", "0"):
+        return None
+    return "" if value == "1" else value
+
+
+def _cpu():
+    import resource
+
+    own, children = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+class _NullStage:
+    rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullProfiler:
+    """Ausgeschaltete Messung."""
+
+    enabled = False
+
+    def stage(self, name, rows=0):
+        return _NULL_STAGE
+
+    def write(self):
+        return None
+
+
+class _Stage:
+    def __init__(self, profiler, name, rows):
+        self.profiler, self.name, self.rows = profiler, name, rows
+
+    def __enter__(self):
+        import tracemalloc
+
+        stack = self.profiler._stack
+        if stack:  # Höchststand der äußeren Stufe vor dem Zurücksetzen sichern
+            stack[-1]._peak = max(stack[-1]._peak, tracemalloc.get_traced_memory()[1])
+        stack.append(self)
+        tracemalloc.reset_peak()
+        self._peak = 0
+        self._cprofile = None
+        if self.name == self.profiler.cprofile_stage:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+        self._cpu0, self._t0 = _cpu(), time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        import tracemalloc
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        wall = time.perf_counter() - self._t0
+        cpu = _cpu() - self._cpu0
+        peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+        self.profiler._stack.pop()
+        if self.profiler._stack:
+            outer = self.profiler._stack[-1]
+            outer._peak = max(outer._peak, peak)
+        self.profiler.records.append({
+            "stufe": self.name,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "zeilen": int(self.rows),
+            "zeilen_pro_s": round(self.rows / wall, 1) if self.rows and wall > 0 else None,
+            "peak_mb": round(peak / 2**20, 3),
+        })
+        if self._cprofile is not None:
+            self.profiler._cprofiles[self.name] = self._cprofile
+        return False
+
+
+class Profiler:
+    """Eingeschaltete Messung für ein Skript (``name``) mit Ablage in ``folder/Ergebnisse``."""
+
+    enabled = True
+
+    def __init__(self, folder, name, cprofile_stage=None):
+        import tracemalloc
+
+        self.folder, self.name = Path(folder), name
+        self.cprofile_stage = cprofile_stage or None
+        self.records = []
+        self._stack, self._cprofiles = [], {}
+        self._t0 = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name, rows=0):
+        """Kontext für eine Stufe; ``rows`` auch nachträglich über ``.rows`` setzbar."""
+        return _Stage(self, name, rows)
+
+    def write(self):
+        """Trace als JSON und CSV schreiben; gibt den Ordner zurück."""
+        target = self.folder / "Ergebnisse" / PROFILE_DIR
+        target.mkdir(parents=True, exist_ok=True)
+        trace = {
+            "skript": self.name,
+            "gesamt_s": round(time.perf_counter() - self._t0, 6),
+            "python": sys.version.split()[0],
+            "stufen": self.records,
+        }
+        tmp = target / f"{self.name}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(trace, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, target / f"{self.name}.json")
+        lines = [",".join(CSV_COLUMNS)]
+        lines += [",".join("" if r[c] is None else str(r[c]) for c in CSV_COLUMNS) for r in self.records]
+        (target / f"{self.name}.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        for stage, prof in self._cprofiles.items():
+            prof.dump_stats(target / f"{self.name}_{stage}.prof")
+        print(f"Profil: {target / self.name}.json")
+        return target
+
+
+def profiler(script, argv=None):
+    """Messung für das Skript ``script`` (``__file__``); ausgeschaltet ein :class:`NullProfiler`."""
+    setting = _setting(argv)
+    if setting is None:
+        return NullProfiler()
+    script = Path(script).resolve()
+    return Profiler(script.parent, script.stem, setting)
@@ -0,0 +1,119 @@
+"""Abbildungen rendern: headless, parallel und nur bei geänderten Daten.
+
+Eine Abbildung wird als :class:`FigureSpec` beschrieben (Zieldatei,
+Plot-Funktion aus :mod:`.plots`, Tabellen, Optionen). Vor dem Rendern wird
+ein Hash über Tabellen, Optionen, dpi und den Quelltext der Plot-Funktion
+gebildet; stimmt er mit dem letzten Lauf überein und existiert die PNG-Datei,
+wird sie übersprungen.
+
+Headless-Modus (``ZB_HEADLESS=1`` oder ``--headless``): Agg-Backend, kein
+``plt.show()``, die übrigen Abbildungen werden in einem Prozesspool gebaut.
+Sonst wird wie bisher im Hauptprozess gezeichnet und am Ende angezeigt.
+"""
+import hashlib
+import inspect
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .ingest import hash_value
+from .paths import CACHE_DIR
+
+MANIFEST = CACHE_DIR / "render.json"
+
+
+@dataclass(eq=False)
+class FigureSpec:
+    output: Path
+    plot: object  # Funktion auf Modulebene (muss für den Prozesspool picklebar sein)
+    tables: dict
+    options: dict = field(default_factory=dict)
+    dpi: int = 300
+
+
+def headless():
+    return os.environ.get("ZB_HEADLESS", "") not in ("", "0") or "--headless" in sys.argv
+
+
+def spec_hash(spec):
+    h = hashlib.sha256()
+    h.update(inspect.getsource(spec.plot).encode())
+    h.update(repr((sorted(spec.options.items()), spec.dpi)).encode())
+    for name in sorted(spec.tables):
+        h.update(name.encode())
+        hash_value(h, spec.tables[name])
+    return h.hexdigest()
+
+
+def _load_manifest():
+    try:
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(manifest):
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, MANIFEST)
+
+
+def _draw(spec, close):
+    import matplotlib.pyplot as plt
+
+    fig = spec.plot(**spec.tables, **spec.options)
+    Path(spec.output).parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(spec.output, dpi=spec.dpi)
+    if close:
+        plt.close(fig)
+    return str(spec.output)
+
+
+def _render_worker(spec):
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+    return _draw(spec, close=True)
+
+
+def render(specs, processes=None, force=False):
+    """Rendert alle geänderten Abbildungen; gibt die neu geschriebenen Pfade zurück."""
+    manifest = _load_manifest()
+    keys = [str(Path(s.output).resolve()) for s in specs]
+    hashes = [spec_hash(s) for s in specs]
+    todo = [s for s, key, h in zip(specs, keys, hashes)
+            if force or not Path(s.output).exists() or manifest.get(key) != h]
+
+    if headless():
+        import matplotlib
+
+        matplotlib.use("Agg", force=True)
+        if len(todo) > 1 and (processes is None or processes > 1):
+            workers = min(len(todo), processes or os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                done = list(pool.map(_render_worker, todo))
+        else:
+            done = [_draw(s, close=True) for s in todo]
+    else:
+        # interaktiv: alle Abbildungen zeigen, aber nur geänderte speichern
+        done = [_draw(s, close=False) for s in todo]
+        for s in specs:
+            if s not in todo:
+                s.plot(**s.tables, **s.options)
+
+    # neu laden, falls ein anderes Skript parallel gerendert hat
+    manifest = _load_manifest()
+    written = {str(Path(p).resolve()) for p in done}
+    manifest.update({k: h for k, h in zip(keys, hashes) if k in written})
+    _save_manifest(manifest)
+    print(f"Abbildungen: {len(done)} gerendert, {len(specs) - len(done)} unverändert")
+
+    if not headless():
+        import matplotlib.pyplot as plt
+
+        plt.show()
+    return done
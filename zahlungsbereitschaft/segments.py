@@ -0,0 +1,167 @@
+"""Segmentierte Auswertung: alle Umfrage-Tabellen je Teilgruppe, parallel über Shared Memory.
+
+Teilgruppen sind die Gruppen der Merkmale im Umfrage-Speicher (:mod:`.store`):
+Welle (Monat der Startzeit), Alter, Geschlecht und Kaufhäufigkeit
+(``survey.SEGMENT_COLS``; weitere Merkmale, z. B. eine Region, kommen dort dazu).
+
+Die kodierten Arrays des Speichers (Bitmasken, Codes, Mehrfachnennungen)
+werden einmal in einen Block ``multiprocessing.shared_memory`` kopiert. Die
+Worker hängen sich beim Start über den Namen an diesen Block und sehen die
+Arrays als NumPy-Sichten. Über die Prozessgrenze gehen nur Merkmal und
+Gruppencode hin und die kleinen Ergebnistabellen zurück; die Daten selbst
+werden weder gepickelt noch kopiert.
+
+Je Gruppe entstehen dieselben Tabellen wie für die ganze Stichprobe
+(``method_counts``, ``bnpl_counts``, ``kreuz``, ``ver``, ``asp``). Sie landen in
+Langform (Merkmal, Gruppe, Teilnehmende, …) unter ``Ergebnisse/segmente/``
+der beiden Analyseordner, neben den bisherigen CSVs.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .paths import WARENKORB_DIR, ZAHLUNGSARTEN_DIR, survey_file
+from .store import SurveyStore, survey_store
+from .survey import SEGMENT_NAMES
+from .warenkorb import ORDER_ASPEKTE, ORDER_VERAENDERUNG
+
+SEGMENT_DIR = "Ergebnisse/segmente"  # relativ zum Analyseordner
+# Tabelle -> (Analyseordner, Datei) wie bei der Auswertung der ganzen Stichprobe
+TABLES = {
+    "method_counts": (ZAHLUNGSARTEN_DIR, "umfrage_zahlungsarten_counts.csv"),
+    "bnpl_counts": (ZAHLUNGSARTEN_DIR, "umfrage_bnpl_counts.csv"),
+    "kreuz": (ZAHLUNGSARTEN_DIR, "umfrage_bnpl_kreuztabelle.csv"),
+    "ver": (WARENKORB_DIR, "umfrage_warenkorb_verteilung.csv"),
+    "asp": (WARENKORB_DIR, "umfrage_warenkorb_aspekte.csv"),
+}
+_ALIGN = 64  # Byte-Ausrichtung der Arrays im Block
+
+_store = None  # im Worker: SurveyStore auf dem Shared-Memory-Block
+_shm = None
+
+
+# -------------------------------------------------------
+# Shared Memory
+# -------------------------------------------------------
+def _view(buf, spec):
+    offset, shape, dtype = spec
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=buf, offset=offset)
+
+
+class SharedStore:
+    """Arrays eines :class:`.store.SurveyStore` in einem Shared-Memory-Block (Kontextmanager)."""
+
+    def __init__(self, store):
+        self.layout, size = {}, 0
+        for name, array in store.arrays.items():
+            self.layout[name] = (size, array.shape, array.dtype.str)
+            size += -(-array.nbytes // _ALIGN) * _ALIGN
+        self.labels = store.labels
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, _ALIGN))
+        for name, array in store.arrays.items():
+            _view(self.shm.buf, self.layout[name])[...] = array
+
+    @property
+    def spec(self):
+        """Argumente für :func:`_attach` (Name, Lage der Arrays, Kategorien)."""
+        return self.shm.name, self.layout, self.labels
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _open_shared(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # ab Python 3.13
+    except TypeError:
+        # ältere Versionen melden den Block (erneut) beim resource_tracker des
+        # Elternprozesses an; freigegeben wird er trotzdem nur dort
+        return shared_memory.SharedMemory(name=name)
+
+
+def _attach(name, layout, labels):
+    """Worker-Initialisierung: Speicher als Sichten auf den Block."""
+    global _shm, _store
+    _shm = _open_shared(name)
+    _store = SurveyStore({n: _view(_shm.buf, spec) for n, spec in layout.items()}, labels)
+
+
+# -------------------------------------------------------
+# Tabellen je Gruppe
+# -------------------------------------------------------
+def store_tables(store, mask=None):
+    """Alle Umfrage-Tabellen eines Speichers, mit ``mask`` nur für diese Zeilen."""
+    pay = store.payment_counts(mask=mask).result()
+    wk = store.warenkorb_counts(ORDER_VERAENDERUNG, ORDER_ASPEKTE, mask=mask).result()
+    kreuz = pay["kreuz"].reset_index().rename_axis(columns=None)
+    return {"total": pay["total"], "method_counts": pay["method_counts"],
+            "bnpl_counts": pay["bnpl_counts"], "kreuz": kreuz, "ver": wk["ver"], "asp": wk["asp"]}
+
+
+def _group_tables(name, code, store=None):
+    store = _store if store is None else store
+    # Zeilenmaske statt Teil-Speicher: gezählt wird direkt auf den (geteilten) Arrays
+    return store_tables(store, store.arrays[name] == code)
+
+
+def analyze_segments(store, segments=None, processes=None):
+    """{(Merkmal, Gruppe): Tabellen} für alle Gruppen der ``segments`` (Standard: alle Merkmale).
+
+    Mit mehr als einem Prozess liegen die Arrays dabei in Shared Memory.
+    """
+    segments = SEGMENT_NAMES if segments is None else list(segments)
+    unknown = [name for name in segments if name not in SEGMENT_NAMES]
+    if unknown:
+        raise ValueError(f"Unbekannte Merkmale: {unknown} (verfügbar: {', '.join(SEGMENT_NAMES)})")
+    tasks = [(name, code) for name in segments
+             for code in sorted(range(len(store.labels[name])), key=store.labels[name].__getitem__)]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(tasks))
+    if processes > 1:
+        with SharedStore(store) as shared, \
+                ProcessPoolExecutor(max_workers=processes, initializer=_attach,
+                                    initargs=shared.spec) as pool:
+            results = list(pool.map(_group_tables, *zip(*tasks)))
+    else:
+        results = [_group_tables(name, code, store) for name, code in tasks]
+    return {(name, store.labels[name][code]): res for (name, code), res in zip(tasks, results)}
+
+
+def segment_frames(results):
+    """Ergebnis von :func:`analyze_segments` -> {Tabelle: Langform}, dazu ``segmente`` (Gruppengrößen)."""
+    out = {"segmente": pd.DataFrame(
+        [(name, group, res["total"]) for (name, group), res in results.items()],
+        columns=["Merkmal", "Gruppe", "Teilnehmende"])}
+    for table in TABLES:
+        parts = [res[table].assign(Merkmal=name, Gruppe=group, Teilnehmende=res["total"])
+                 for (name, group), res in results.items()]
+        frame = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        lead = ["Merkmal", "Gruppe", "Teilnehmende"]
+        out[table] = frame[lead + [c for c in frame.columns if c not in lead]] if parts else frame
+    return out
+
+
+def write_segments(segments=None, processes=None):
+    """Tabellen je Gruppe für beide Analysen nach ``<Analyseordner>/Ergebnisse/segmente/``."""
+    written, cache = [], {}
+    for folder in (ZAHLUNGSARTEN_DIR, WARENKORB_DIR):
+        path = Path(survey_file(folder)).resolve()
+        if path not in cache:
+            cache[path] = segment_frames(analyze_segments(survey_store(path), segments, processes))
+        frames = cache[path]
+        out = folder / SEGMENT_DIR
+        out.mkdir(parents=True, exist_ok=True)
+        for table, (target, filename) in {"segmente": (folder, "segmente.csv"), **TABLES}.items():
+            if target == folder:
+                frames[table].to_csv(out / filename, index=False)
+                written.append(out / filename)
+    return written
@@ -0,0 +1,243 @@
+"""Kleiner Berichtsserver (asyncio, nur Standardbibliothek): ``python -m zahlungsbereitschaft --serve``.
+
+Ausgeliefert wird ausschließlich aus dem Speicher:
+
+* ``/`` – Übersicht mit Links,
+* ``/tables/<name>.json`` bzw. ``.csv`` – die Tabellen aus
+  :func:`.tables.summary_tables`,
+* ``/files/<Ordner>/<Bilder|Ergebnisse>/…`` – PNGs, CSVs und Messungen der
+  Auswertungen, auch aus Unterordnern (``Ergebnisse/segmente/``,
+  ``Ergebnisse/profil/``),
+* ``/status`` – Stand der letzten Neuberechnung.
+
+Jede Antwort trägt ein ETag (SHA-1 des Inhalts). Bei passendem
+``If-None-Match`` kommt ``304 Not Modified`` ohne Inhalt.
+
+Ein Hintergrund-Task vergleicht alle ``INTERVAL_S`` Sekunden Größe und mtime
+der Eingaben (Statista-Dateien, Umfrage-Exporte, Paketquellen). Bei einer
+Änderung laufen die Pipeline (Plots, CSVs) und ``summary_tables`` in einem
+frischen Prozess. Danach wird der Speicher in einem Schritt ausgetauscht. Bis
+dahin liefert der Server den alten Stand; eine Anfrage wartet also nie auf
+pandas oder Matplotlib.
+"""
+import asyncio
+import hashlib
+import html
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
+
+from .paths import ROOT, WARENKORB_DIR, ZAHLUNGSARTEN_DIR, survey_file
+
+INTERVAL_S = 2.0
+# Ausgabeordner (samt Unterordnern), deren Dateien ausgeliefert werden
+FILE_DIRS = [folder / sub for folder in (ZAHLUNGSARTEN_DIR, WARENKORB_DIR)
+             for sub in ("Bilder", "Ergebnisse")]
+CONTENT_TYPES = {
+    ".png": "image/png",
+    ".csv": "text/csv; charset=utf-8",
+    ".json": "application/json; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+    ".prof": "application/octet-stream",  # cProfile-Dumps aus Ergebnisse/profil/
+}
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed"}
+
+
+@dataclass(frozen=True)
+class Resource:
+    body: bytes
+    content_type: str
+    etag: str
+
+
+def resource(body, content_type):
+    return Resource(body, content_type, f'"{hashlib.sha1(body).hexdigest()[:20]}"')
+
+
+# -------------------------------------------------------
+# Neuberechnung (im Kindprozess) und Laden der Dateien
+# -------------------------------------------------------
+def input_files():
+    """Dateien, deren Änderung eine Neuberechnung auslöst."""
+    files = [p for folder in (ZAHLUNGSARTEN_DIR, WARENKORB_DIR) for p in folder.glob("*.xlsx")]
+    files += [survey_file(ZAHLUNGSARTEN_DIR), survey_file(WARENKORB_DIR)]
+    files += Path(__file__).resolve().parent.glob("*.py")
+    return sorted(set(files))
+
+
+def fingerprint(files=None):
+    out = []
+    for p in input_files() if files is None else files:
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        out.append((str(p), st.st_size, st.st_mtime_ns))
+    return tuple(out)
+
+
+def _table_bytes(table):
+    import pandas as pd
+
+    if isinstance(table, pd.Series):
+        table = table.to_frame()
+    csv = table.to_csv(index=not isinstance(table.index, pd.RangeIndex)).encode("utf-8")
+    if not isinstance(table.index, pd.RangeIndex):
+        table = table.reset_index()
+    table.columns = [str(c) for c in table.columns]
+    data = table.to_json(orient="records", force_ascii=False, date_format="iso").encode("utf-8")
+    return data, csv
+
+
+def recompute(run_pipeline=True):
+    """Pipeline (inkrementell) + Tabellen; Rückgabe {Name: (JSON, CSV)} als Bytes."""
+    if run_pipeline:
+        from .pipeline import run
+
+        run()
+    from .tables import summary_tables
+
+    return {name: _table_bytes(table) for name, table in summary_tables().items()}
+
+
+def load_files(dirs=None):
+    """{URL-Pfad: Resource} für alle Dateien der Ausgabeordner (rekursiv)."""
+    out = {}
+    for folder in FILE_DIRS if dirs is None else dirs:
+        for p in sorted(Path(folder).rglob("*")):
+            ctype = CONTENT_TYPES.get(p.suffix.lower())
+            if ctype and p.is_file():
+                rel = p.resolve().relative_to(ROOT).as_posix()
+                out[f"/files/{rel}"] = resource(p.read_bytes(), ctype)
+    return out
+
+
+def _index(paths):
+    items = "\n".join(f'<li><a href="{quote(p)}">{html.escape(p)}</a></li>' for p in sorted(paths))
+    page = (f"<!doctype html><meta charset=utf-8><title>Zahlungsbereitschaft</title>"
+            f"<h1>Zahlungsbereitschaft – Ergebnisse</h1><ul>\n{items}\n</ul>")
+    return resource(page.encode("utf-8"), CONTENT_TYPES[".html"])
+
+
+# -------------------------------------------------------
+# Server
+# -------------------------------------------------------
+class ReportServer:
+    """In-Memory-Cache + HTTP/1.1 über ``asyncio.start_server``."""
+
+    def __init__(self, run_pipeline=True, interval=INTERVAL_S, dirs=None):
+        self.run_pipeline = run_pipeline
+        self.interval = interval
+        self.dirs = dirs
+        self.resources = {"/": _index([])}
+        self.status = {"generation": 0, "updated": None, "seconds": None, "error": None,
+                       "recomputing": False}
+        self._fingerprint = None
+        # frischer Prozess je Neuberechnung, damit geänderte Paketquellen auch importiert werden
+        self._pool = ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1)
+
+    async def refresh(self):
+        """Einmal neu berechnen und den Speicher austauschen."""
+        loop = asyncio.get_running_loop()
+        self.status["recomputing"] = True
+        t0 = time.perf_counter()
+        fp = await asyncio.to_thread(fingerprint)
+        try:
+            tables = await loop.run_in_executor(self._pool, recompute, self.run_pipeline)
+            files = await asyncio.to_thread(load_files, self.dirs)
+        except Exception as exc:  # alter Stand bleibt erhalten
+            self.status["error"] = f"{type(exc).__name__}: {exc}"
+        else:
+            resources = dict(files)
+            for name, (data, csv) in tables.items():
+                resources[f"/tables/{name}.json"] = resource(data, CONTENT_TYPES[".json"])
+                resources[f"/tables/{name}.csv"] = resource(csv, CONTENT_TYPES[".csv"])
+            resources["/"] = _index(resources)
+            self.resources = resources
+            self.status.update(generation=self.status["generation"] + 1, error=None,
+                               updated=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        self._fingerprint = fp
+        self.status.update(recomputing=False, seconds=round(time.perf_counter() - t0, 3))
+
+    async def watch(self):
+        """Hintergrund-Task: bei geänderten Eingaben neu berechnen."""
+        while True:
+            if await asyncio.to_thread(fingerprint) != self._fingerprint:
+                await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def lookup(self, path):
+        if path == "/status":
+            return resource(json.dumps(self.status).encode("utf-8"), CONTENT_TYPES[".json"])
+        return self.resources.get(path)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, 400, None, keep_alive=False)
+                    break
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+                if method not in ("GET", "HEAD"):
+                    await self._send(writer, 405, None, keep_alive)
+                else:
+                    res = self.lookup(unquote(urlsplit(target).path))
+                    if res is None:
+                        await self._send(writer, 404, None, keep_alive)
+                    elif res.etag in {t.strip() for t in headers.get("if-none-match", "").split(",")}:
+                        await self._send(writer, 304, res, keep_alive, body=False)
+                    else:
+                        await self._send(writer, 200, res, keep_alive, body=method == "GET")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, status, res, keep_alive, body=True):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}"]
+        payload = b""
+        if res is not None:
+            lines += [f"ETag: {res.etag}", "Cache-Control: no-cache",
+                      f"Content-Type: {res.content_type}"]
+            if status == 200:
+                lines.append(f"Content-Length: {len(res.body)}")
+                payload = res.body if body else b""
+        else:
+            lines.append("Content-Length: 0")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Berichtsserver: http://{host}:{port}/ (Neuberechnung im Hintergrund)")
+        watcher = asyncio.create_task(self.watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+            self._pool.shutdown(cancel_futures=True)
+
+
+def serve(host="127.0.0.1", port=8000, run_pipeline=True, interval=INTERVAL_S):
+    try:
+        asyncio.run(ReportServer(run_pipeline, interval).serve(host, port))
+    except KeyboardInterrupt:
+        pass
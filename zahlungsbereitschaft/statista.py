@@ -0,0 +1,133 @@
+"""Statista-Tabellen zu Zahlungsarten laden und vergleichbar machen."""
+import numpy as np
+import pandas as pd
+
+from .ingest import read_excel_cached
+from .memo import memoize
+from .panel import discover
+from .paths import ZAHLUNGSARTEN_DIR
+from .taxonomy import (
+    FOKUS_CODES, KATEGORIEN, VERGLEICHSKATEGORIEN, encode, encode_vergleich, fokus_index,
+    rollup_vergleich, shares_by_code, shares_table, yearly_shares,
+)
+
+EINZELHANDEL_FILE = "Anteile von Zahlungsarten.xlsx"
+# Quellen in der langen Panel-Tabelle (:mod:`.panel`)
+ONLINE_QUELLE = "Online Zahlungsarten"
+EINZELHANDEL_QUELLE = "Anteile von Zahlungsarten"
+EINZELHANDEL_NAMES = ["Jahr", "Bar", "Girocard", "Kreditkarte", "Lastschrift", "Sonstige",
+                      "Rechnung", "Maestro/V-Pay", "Handelskarte"]
+
+
+def online_file(year):
+    """Dateiname einer Online-Erhebung, z. B. ``Online Zahlungsarten 2023.xlsx``."""
+    return f"{ONLINE_QUELLE} {year}.xlsx"
+
+
+def online_years(folder=ZAHLUNGSARTEN_DIR):
+    """Jahre der Online-Erhebungen in ``folder`` (neuestes zuerst), am Dateinamen erkannt."""
+    return sorted((jahr for _, quelle, jahr in discover(folder)
+                   if quelle == ONLINE_QUELLE and jahr is not None), reverse=True)
+
+
+def jahresvergleich_datei(years):
+    """Dateiname der Jahresvergleichs-Abbildung, z. B. ``Vergleich Online-Zahlungsarten 2019-2023.png``."""
+    return f"Vergleich Online-Zahlungsarten {min(years)}-{max(years)}.png"
+
+
+def load_statista(folder=ZAHLUNGSARTEN_DIR, years=None):
+    """Online-Zahlungsarten je Jahr -> {Jahr: DataFrame(Methode, Prozent)}.
+
+    Ohne ``years`` alle Jahre im Ordner (:func:`online_years`); für den
+    Jahresvergleich über alle Quellen siehe :func:`jahresvergleich_panel`.
+    """
+    years = online_years(folder) if years is None else years
+    return {
+        year: read_excel_cached(folder / online_file(year), skiprows=4, sheet_name=1,
+                                names=["Methode", "Prozent"], usecols="B:C")
+        for year in years
+    }
+
+
+def load_einzelhandel(folder=ZAHLUNGSARTEN_DIR):
+    """Anteile der Zahlungsarten im stationären Einzelhandel (ein Jahr je Zeile)."""
+    return read_excel_cached(folder / EINZELHANDEL_FILE, skiprows=4, sheet_name=1,
+                             names=EINZELHANDEL_NAMES, usecols="B:J")
+
+
+@memoize(code=("taxonomy",))
+def jahresvergleich(frames):
+    """Alle Jahre in einer Tabelle + Differenzen des neuesten Jahres zu den übrigen."""
+    return _differenzen(yearly_shares(frames), list(frames))
+
+
+@memoize(code=("taxonomy",))
+def jahresvergleich_panel(panel, quelle=ONLINE_QUELLE):
+    """Wie :func:`jahresvergleich`, aber über alle Jahre einer Quelle der Panel-Tabelle."""
+    mat, years = _panel_matrix(panel, quelle)
+    return _differenzen(shares_table(mat, years), years)
+
+
+def _panel_matrix(panel, quelle):
+    """Anteile einer Quelle als Matrix Codes × Jahre (neuestes Jahr zuerst).
+
+    Kategorien außerhalb der Taxonomie (siehe :func:`.panel.parse_file`) haben
+    keinen Code und fehlen in der Matrix.
+    """
+    sub = panel[panel["Quelle"] == quelle]
+    years = sorted(sub["Jahr"].unique().tolist(), reverse=True)
+    mat = np.full((len(KATEGORIEN), len(years)), np.nan)
+    codes = encode(sub["Kategorie"], strict=False)
+    known = codes >= 0
+    col = pd.Index(years).get_indexer(sub["Jahr"][known])
+    mat[codes[known], col] = sub["pct"].to_numpy(dtype=float)[known]
+    return mat, years
+
+
+def einzelhandel_panel(panel, quelle=EINZELHANDEL_QUELLE):
+    """Zeitreihe einer Quelle wieder breit: "Jahr" + eine Spalte je Kategorie."""
+    sub = panel[panel["Quelle"] == quelle]
+    wide = sub.pivot(index="Jahr", columns="Kategorie", values="pct")
+    wide = wide[pd.unique(sub["Kategorie"])].reset_index()
+    wide.columns.name = None
+    return wide
+
+
+def _differenzen(merged, years):
+    latest, *others = sorted(years, reverse=True)
+    for year in others:
+        # Differenzen berechnen (wo Werte fehlen -> NaN)
+        merged[f"Δ{latest % 100:02d}_vs_{year % 100:02d}"] = (
+            merged[f"pct_{latest}"] - merged[f"pct_{year}"]
+        )
+    return merged
+
+
+def vergleichsanteile(df, year):
+    """Anteile eines Statista-Jahres je grober Vergleichskategorie (Vektor über Codes)."""
+    return rollup_vergleich(shares_by_code(df, year))
+
+
+def vergleichsanteile_panel(panel, year, quelle=ONLINE_QUELLE):
+    """Wie :func:`vergleichsanteile`, aber aus der Panel-Tabelle."""
+    mat, years = _panel_matrix(panel, quelle)
+    return rollup_vergleich(mat[:, years.index(year)])
+
+
+@memoize(code=("taxonomy",))
+def compare_survey_vs_statista(method_counts, total, statista_pct):
+    """Umfrage-Anteile und Statista-Anteile für die Fokus-Kategorien nebeneinander.
+
+    ``method_counts`` sind die Umfrage-Zählungen (Kategorie, Anzahl) in den
+    Vergleichskategorien, ``statista_pct`` der Vektor aus :func:`vergleichsanteile`.
+    """
+    pct = (method_counts["Anzahl"].to_numpy() / total * 100).round(1)
+    pct_umfrage = np.full(len(VERGLEICHSKATEGORIEN), np.nan)
+    # Umfrage-Kategorien auf dieselben Codes bringen (freie Antworten fallen raus)
+    codes = encode_vergleich(list(method_counts["Kategorie"]))
+    pct_umfrage[codes[codes >= 0]] = pct[codes >= 0]
+    # Fokus-Kategorien per Code auswählen, Kurznamen für gute Lesbarkeit
+    return pd.DataFrame(
+        {"pct_umfrage": pct_umfrage[FOKUS_CODES], "pct_2023": np.asarray(statista_pct)[FOKUS_CODES]},
+        index=fokus_index(),
+    ).fillna(0)
@@ -0,0 +1,240 @@
+"""Statistische Tests der Auswertungen.
+
+Die Chi²-Tests laufen als Stapel: ``chi2_batch`` rechnet beliebig viele
+Kontingenztafeln gleicher Form (T × r × k) in einem vektorisierten Durchgang,
+``permutation_batch`` ist die exakte Alternative für dünn besetzte Tafeln
+(Zeilen unter H0 multivariat hypergeometrisch bei festen Rändern).
+``survey_vs_statista_batch`` baut daraus den Vergleich Umfrage vs. Statista
+für viele Segmente (Altersgruppen, Wellen, …) und Kategorie-Teilmengen.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+N_PERMUTATIONS = 10_000
+# Tafeln je Prozess-Aufgabe beim Permutationstest
+PERMUTATION_BATCH = 64
+
+
+def survey_vs_statista_counts(pct_umfrage, pct_statista, N):
+    """Prozentwerte auf Zählwerte der Stichprobengröße N skalieren -> Tafeln (..., 2, k)."""
+    umf = np.rint(np.asarray(pct_umfrage, dtype=float) / 100 * np.asarray(N, dtype=float)[..., None])
+    stat = np.rint(np.asarray(pct_statista, dtype=float) / 100 * np.asarray(N, dtype=float)[..., None])
+    umf, stat = np.broadcast_arrays(umf, stat)
+    return np.stack([umf, stat], axis=-2)
+
+
+def _pearson(obs, keep, yates=None):
+    """Pearson-Statistik je Tafel; Spalten mit ``keep == False`` zählen nicht."""
+    row = obs.sum(axis=-1, keepdims=True)
+    col = obs.sum(axis=-2, keepdims=True)
+    n = row.sum(axis=-2, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exp = np.where(keep[..., None, :], row * col / n, 0.0)
+        diff = obs - exp
+        if yates is not None:
+            # Yates-Korrektur wie scipy.stats.chi2_contingency (nur bei dof == 1)
+            shrink = np.minimum(0.5, np.abs(diff)) * yates[..., None, None]
+            diff = diff - np.sign(diff) * shrink
+        terms = np.where(exp > 0, diff ** 2 / exp, 0.0)
+    return terms.sum(axis=(-2, -1))
+
+
+def chi2_batch(tables, haldane=True, correction=True):
+    """Chi²-Unabhängigkeitstest für einen Stapel von Tafeln (T × r × k).
+
+    Pro Tafel wie :func:`chi2_survey_vs_statista`: Spalten, die überall 0 sind,
+    fallen weg; bleibt eine 0, wird +0.5 addiert (Haldane–Anscombe). Mit
+    ``correction`` gilt bei dof == 1 die Yates-Korrektur wie in SciPy.
+    Gibt ``(chi2, p, dof)`` als Arrays der Länge T zurück.
+    """
+    from scipy.stats import chi2 as chi2_dist
+
+    obs = np.array(tables, dtype=float, ndmin=3)
+    r = obs.shape[-2]
+    keep = obs.sum(axis=-2) > 0  # T × k
+    if haldane:
+        zero = ((obs == 0) & keep[:, None, :]).any(axis=(-2, -1))
+        obs = obs + np.where(zero[:, None, None] & keep[:, None, :], 0.5, 0.0)
+    dof = (r - 1) * (keep.sum(axis=-1) - 1)
+    yates = (dof == 1) if correction else None
+    stat = _pearson(obs, keep, yates)
+    stat = np.where(dof > 0, stat, 0.0)
+    p = np.where(dof > 0, chi2_dist.sf(stat, np.maximum(dof, 1)), 1.0)
+    return stat, p, dof
+
+
+def _permuted_tables(rng, rowsum, colsum, n_permutations):
+    """Tafeln mit festen Rändern unter H0 (n_permutations × r × k)."""
+    r, k = len(rowsum), len(colsum)
+    if r == 2:
+        # 2 × k: erste Zeile multivariat hypergeometrisch, die zweite ist der Rest
+        first = rng.multivariate_hypergeometric(colsum, rowsum[0], size=n_permutations)
+        return np.stack([first, colsum - first], axis=1)
+    # allgemein: Spalten-Labels der Einzelfälle mischen und auf die Zeilen aufteilen
+    labels = np.repeat(np.arange(k), colsum)
+    perm = rng.permuted(np.broadcast_to(labels, (n_permutations, len(labels))), axis=1)
+    rows = np.repeat(np.arange(r), rowsum)
+    flat = (np.arange(n_permutations)[:, None] * r + rows) * k + perm
+    return np.bincount(flat.ravel(), minlength=n_permutations * r * k).reshape(n_permutations, r, k)
+
+
+def _permutation_chunk(tables, n_permutations, seed, offset):
+    """p-Werte des Permutationstests für einige Tafeln (Seeds ``[seed, Tafel]``)."""
+    out = np.empty(len(tables))
+    for i, table in enumerate(tables):
+        rng = np.random.default_rng([seed, offset + i])
+        table = np.rint(table).astype(np.int64)
+        table = table[:, table.sum(axis=0) > 0]
+        table = table[table.sum(axis=1) > 0]
+        if table.shape[0] < 2 or table.shape[1] < 2:
+            out[i] = 1.0
+            continue
+        keep = np.ones(table.shape[1], dtype=bool)
+        observed = _pearson(table.astype(float), keep)
+        sim = _permuted_tables(rng, table.sum(axis=1), table.sum(axis=0), n_permutations)
+        stats = _pearson(sim.astype(float), keep)
+        # Toleranz, damit Tafeln mit gleicher Statistik sicher mitzählen
+        hits = np.count_nonzero(stats >= observed * (1 - 1e-12))
+        out[i] = (hits + 1) / (n_permutations + 1)
+    return out
+
+
+def permutation_batch(tables, n_permutations=N_PERMUTATIONS, seed=0, processes=None):
+    """Permutationstest (Pearson-Statistik, feste Ränder) für einen Stapel von Tafeln.
+
+    Geeignet für kleine/dünn besetzte Tafeln, bei denen die Chi²-Näherung
+    nicht trägt; Haldane-Korrektur ist hier nicht nötig. Die Tafeln werden in
+    Gruppen auf ``processes`` Prozesse verteilt; jede Tafel hat ihren eigenen
+    Seed, das Ergebnis hängt also nicht von der Aufteilung ab.
+    """
+    tables = np.array(tables, dtype=float, ndmin=3)
+    starts = range(0, len(tables), PERMUTATION_BATCH)
+    args = [(tables[s:s + PERMUTATION_BATCH], n_permutations, seed, s) for s in starts]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(args))
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_permutation_chunk, *zip(*args)))
+    else:
+        parts = [_permutation_chunk(*a) for a in args]
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def survey_vs_statista_batch(pct_umfrage, pct_statista, N, subsets=None, permutations=0,
+                             seed=0, processes=None):
+    """Vergleich Umfrage vs. Statista für viele Segmente und Kategorie-Teilmengen.
+
+    ``pct_umfrage``: DataFrame Segment × Kategorie (Anteile in %), ``N``:
+    Teilnehmende je Segment (Series oder Skalar), ``pct_statista``: Series je
+    Kategorie. ``subsets`` ordnet einem Namen eine Kategorienliste zu (Standard:
+    alle Kategorien). Mit ``permutations > 0`` kommt ``p_perm`` hinzu.
+    Ergebnis: eine Zeile je (Segment, Teilmenge) mit chi2, p, dof.
+    """
+    pct_umfrage = pd.DataFrame(pct_umfrage)
+    pct_statista = pd.Series(pct_statista).reindex(pct_umfrage.columns)
+    N = pd.Series(N, index=pct_umfrage.index, dtype=float)
+    subsets = subsets or {"alle": list(pct_umfrage.columns)}
+    tables = survey_vs_statista_counts(pct_umfrage.to_numpy(), pct_statista.to_numpy(), N.to_numpy())
+    # alle Teilmengen über eine Maske: ausgeblendete Spalten sind 0 und fallen weg
+    masks = np.array([pct_umfrage.columns.isin(cols) for cols in subsets.values()])
+    stack = (tables[:, None] * masks[None, :, None, :]).reshape(-1, *tables.shape[1:])
+    chi2, p, dof = chi2_batch(stack)
+    out = pd.DataFrame(
+        {"chi2": chi2, "p": p, "dof": dof},
+        index=pd.MultiIndex.from_product([pct_umfrage.index, list(subsets)],
+                                         names=[pct_umfrage.index.name or "Segment", "Teilmenge"]),
+    )
+    if permutations:
+        out["p_perm"] = permutation_batch(stack, permutations, seed, processes)
+    return out
+
+
+def chi2_survey_vs_statista(plotdf, N, permutations=0):
+    """Chi²-Test Umfrage vs. Statista auf ZÄHLWERTEN.
+
+    Die Prozentwerte werden auf die Stichprobengröße N skaliert; Spalten, die
+    in beiden Gruppen 0 sind, fallen weg, sonst Haldane–Anscombe (+0.5).
+    Mit ``permutations > 0`` zusätzlich ``p_perm`` aus dem Permutationstest.
+    """
+    # Statista-Prozente auf die Stichprobengröße N skalieren, dann wie ein Stapel aus einer Tafel
+    cont = survey_vs_statista_counts(plotdf["pct_umfrage"], plotdf["pct_2023"], N)
+    chi2, p, dof = chi2_batch(cont)
+    res = {"chi2": float(chi2[0]), "p": float(p[0]), "dof": int(dof[0])}
+    if permutations:
+        res["p_perm"] = float(permutation_batch(cont, permutations, processes=1)[0])
+    return res
+
+
+# -------------------------------------------------------
+# Binomialtests (Warenkorb-Wahrnehmung)
+# -------------------------------------------------------
+# Referenzanteile für Sensitivitätsanalysen und geplante Stichprobengrößen
+P0_GRID = np.round(np.arange(0.05, 0.951, 0.01), 2)
+PLANNED_N = (39, 50, 100, 200, 300, 500, 1000)
+P_TRUE_GRID = np.round(np.arange(0.50, 0.801, 0.05), 2)
+
+
+def binomial_grid(k, n, p0s=P0_GRID):
+    """p-Werte einseitiger Binomialtests (H1: Anteil > p0) für alle Segmente × p0.
+
+    ``k``/``n`` sind Skalare oder Vektoren (ein Eintrag je Segment); gerechnet
+    wird über ``binom.sf`` mit Broadcasting statt einem ``binomtest`` je Zelle.
+    P(X ≥ k) = sf(k - 1) ist derselbe p-Wert wie ``binomtest(..., "greater")``.
+    """
+    from scipy.stats import binom
+
+    k = np.atleast_1d(np.asarray(k, dtype=float))[:, None]
+    n = np.atleast_1d(np.asarray(n, dtype=float))[:, None]
+    p0s = np.asarray(p0s, dtype=float)[None, :]
+    return binom.sf(k - 1, n, p0s)
+
+
+def binomial_sensitivity(k, n, p0s=P0_GRID, segments=None):
+    """:func:`binomial_grid` als Tabelle: eine Zeile je (Segment, p0) mit k, n und p-Wert."""
+    k, n = np.atleast_1d(k), np.atleast_1d(n)
+    segments = ["gesamt"] if segments is None and len(k) == 1 else segments
+    segments = list(range(len(k))) if segments is None else list(segments)
+    grid = binomial_grid(k, n, p0s)
+    return pd.DataFrame({
+        "Segment": np.repeat(segments, len(p0s)),
+        "p0": np.tile(p0s, len(k)),
+        "k": np.repeat(k, len(p0s)),
+        "n": np.repeat(n, len(p0s)),
+        "p_wert": grid.ravel(),
+    })
+
+
+def binomial_critical(n, p0=0.5, alpha=0.05):
+    """Kleinstes k, ab dem der einseitige Test (H1: Anteil > p0) auf Niveau alpha verwirft."""
+    from scipy.stats import binom
+
+    n = np.asarray(n, dtype=float)
+    c = binom.isf(alpha, n, p0) + 1
+    # isf ist auf Gleitkomma-Rundung empfindlich: am Rand nachprüfen
+    c = np.where(binom.sf(c - 2, n, p0) <= alpha, c - 1, c)
+    return np.where(binom.sf(c - 1, n, p0) <= alpha, c, c + 1)
+
+
+def binomial_power(n=PLANNED_N, p_true=P_TRUE_GRID, p0=0.5, alpha=0.05):
+    """Teststärke des einseitigen Binomialtests: DataFrame n × wahrer Anteil.
+
+    Für jede geplante Stichprobengröße der kritische Wert (exakt, diskret),
+    dann P(X ≥ k_krit) unter dem wahren Anteil – alles in einem Broadcast.
+    """
+    from scipy.stats import binom
+
+    n = np.asarray(n, dtype=float)
+    crit = binomial_critical(n, p0, alpha)
+    power = binom.sf(crit[:, None] - 1, n[:, None], np.asarray(p_true, dtype=float)[None, :])
+    return pd.DataFrame(power, index=pd.Index(n.astype(int), name="n"),
+                        columns=pd.Index(p_true, name="p_wahr"))
+
+
+def binomial_tests(k, n, p0s=(0.5, 1/3)):
+    """Einseitige Binomialtests (H1: Anteil > p0) für mehrere Referenzwerte."""
+    pvalues = binomial_grid(k, n, p0s)[0]
+    return {p0: float(p) for p0, p in zip(p0s, pvalues)}
@@ -0,0 +1,355 @@
+"""Kompakter, memory-mapped Speicher der Umfrage-Antworten (AN:AQ).
+
+Als pandas-Strings („PayPal;Kreditkarte;Rechnung“) kostet jede Antwort
+Hunderte Bytes. Der Speicher legt die vier Fragen stattdessen so ab:
+
+* Mehrfachauswahl (AO Aspekte, AP Zahlungsarten): eine Bitmaske je
+  Teilnehmendem (Bit j = Kategorie j, ``np.packbits`` mit ``bitorder="little"``,
+  also ⌈k/8⌉ Bytes je Zeile),
+* Einfachauswahl (AN Veränderung, AQ BNPL nach ``map_bnpl``): ``uint8``-Codes,
+  ``MISSING`` = keine Antwort,
+* Merkmale für Teilgruppen (B Startzeit als Welle, G Alter, H Geschlecht,
+  I Kaufhäufigkeit; :mod:`.segments`): ebenfalls ``uint8``-Codes.
+
+Kategorien stehen in der Reihenfolge des ersten Auftretens in ``meta.json``,
+die Arrays als ``.npy`` daneben. Geöffnet wird per ``np.load(mmap_mode="r")``;
+eine Million Teilnehmende belegen wenige MB und sind sofort lesbar.
+
+Die Bitmaske speichert, *ob* eine Kategorie gewählt wurde. Die seltenen
+Mehrfachnennungen derselben Kategorie (z. B. „Klarna“ und „Buy now pay later“)
+stehen zusätzlich als Tabelle ``(Zeile, Kategorie, weitere Nennungen)`` in
+``<spalte>_extra.npy``, damit Zählungen genau denen aus den Strings entsprechen.
+
+Beim Bauen wird jeder Block sofort gepackt und an Rohdateien im Zielordner
+angehängt; im Speicher bleiben nur Vokabulare und Blockgrößen. Erst am Ende
+werden die Blöcke (auf die endgültige Breite aufgefüllt) in die ``.npy``
+kopiert. Der Speicherbedarf hängt so von der Blockgröße ab, nicht von der
+Zahl der Teilnehmenden.
+
+Der Speicher liegt unter ``.cache/store/`` und wird wie der Excel-Cache
+(:mod:`.ingest`) über Größe, Änderungszeit und SHA-256 des Exports invalidiert.
+"""
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from . import ingest
+from .aggregate import SURVEY_COLS, SURVEY_NAMES
+from .multiselect import CategoryCodes, MultiSelectTokenizer, crosstab_codes
+from .paths import CACHE_DIR
+from .survey import (
+    DEFAULT_CHUNKSIZE, SEGMENT_COLS, SEGMENT_NAMES, PaymentCounts, WarenkorbCounts, clean_column,
+    iter_survey_chunks, map_bnpl, normalize_method, segment_column,
+)
+
+STORE_DIR = CACHE_DIR / "store"
+# 2: Zahlungsarten mit unscharfer Zuordnung (fuzzy.py), 3: Merkmale für Teilgruppen,
+# 4: Überweisung als eigene Zahlungsart (nicht mehr unscharf Sofortüberweisung)
+STORE_VERSION = 4
+MISSING = 255  # uint8-Code für fehlende Einfachauswahl
+
+# Spalte -> Art der Ablage
+BITMASKS = ("aspekte", "zahlungsarten")
+CODES = ("veraenderung", "bnpl") + tuple(SEGMENT_NAMES)
+ARRAYS = BITMASKS + CODES + tuple(f"{name}_extra" for name in BITMASKS)
+
+
+def _pack(X, width, offset):
+    """CSR-Indikatormatrix -> (Bitmasken n × ``width`` Bytes, Mehrfachnennungen m × 3)."""
+    X = X.tocoo()
+    bits = np.zeros((X.shape[0], width * 8), dtype=bool)
+    bits[X.row, X.col] = True
+    dup = X.data > 1
+    extra = np.column_stack([X.row[dup] + offset, X.col[dup], X.data[dup] - 1]).astype(np.int64)
+    return np.packbits(bits, axis=1, bitorder="little"), extra
+
+
+def _codes(codes, labels):
+    if len(labels) >= MISSING:
+        raise ValueError(f"Zu viele Antwortkategorien für uint8: {len(labels)}")
+    return np.where(codes < 0, MISSING, codes).astype(np.uint8)
+
+
+class SurveyStore:
+    """Bitmasken und Codes einer Umfrage; ``labels`` je Spalte in Code-Reihenfolge."""
+
+    def __init__(self, arrays, labels):
+        self.arrays = arrays
+        self.labels = labels
+
+    @property
+    def rows(self):
+        return len(self.arrays["bnpl"])
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def indicator(self, name, start=0, stop=None, counts=False, rows=None):
+        """0/1-Matrix (Zeilen × Kategorien) einer Mehrfachauswahl-Spalte.
+
+        ``counts=True``: Anzahl Nennungen statt 0/1 (Mehrfachnennungen zählen mehrfach).
+        ``rows``: nur diese Zeilen des Bereichs (aufsteigend, relativ zu ``start``).
+        """
+        packed = self.arrays[name][start:stop]
+        if rows is not None:
+            packed = packed[rows]
+        k = len(self.labels[name])
+        X = np.unpackbits(packed, axis=1, count=k, bitorder="little").astype(np.int64)
+        if counts:
+            extra = self.arrays[f"{name}_extra"]
+            stop = self.rows if stop is None else stop
+            sel = extra[(extra[:, 0] >= start) & (extra[:, 0] < stop)]
+            pos = sel[:, 0] - start
+            if rows is not None:
+                i = np.searchsorted(rows, pos)
+                hit = i < len(rows)
+                hit[hit] = rows[i[hit]] == pos[hit]
+                sel, pos = sel[hit], i[hit]
+            np.add.at(X, (pos, sel[:, 1]), sel[:, 2])
+        return X
+
+    def codes(self, name, start=0, stop=None, rows=None):
+        """Codes einer Einfachauswahl-Spalte (fehlend = -1), ``rows`` wie bei :meth:`indicator`."""
+        c = self.arrays[name][start:stop]
+        c = (c if rows is None else c[rows]).astype(np.int64)
+        c[c == MISSING] = -1
+        return c
+
+    def blocks(self, size=DEFAULT_CHUNKSIZE):
+        """Zeilenbereiche ``(start, stop)``, damit entpackte Matrizen klein bleiben."""
+        for start in range(0, self.rows, size):
+            yield start, min(start + size, self.rows)
+
+    # ---------------------------------------------------
+    # Zählstände (wie :mod:`.survey`, aber ohne Strings)
+    # ---------------------------------------------------
+    def _masked_blocks(self, mask):
+        """Blöcke ``(start, stop, rows)``; ``rows`` = Zeilen der ``mask`` im Block (ohne Maske None)."""
+        for start, stop in self.blocks():
+            yield start, stop, None if mask is None else np.flatnonzero(mask[start:stop])
+
+    def payment_counts(self, mapping=None, bnpl_category="BNPL (Klarna)", mask=None):
+        """:class:`.survey.PaymentCounts` aus AP/AQ.
+
+        ``mapping`` (z. B. ``UMFRAGE_ZU_VERGLEICH``) fasst Kategorien zusammen wie
+        beim Zählen aus den Strings (Nennungen werden addiert). ``mask``
+        (boolesch, eine Zeile je Teilnehmendem) beschränkt die Zählung auf eine
+        Teilgruppe: je Block werden nur deren Zeilen entpackt, ein Teil-Speicher
+        entsteht nicht.
+        """
+        methods = self.labels["zahlungsarten"]
+        if mapping is not None:
+            mapped = [mapping.get(m.lower(), m) for m in methods]
+            methods = list(dict.fromkeys(mapped))
+            P = np.zeros((len(mapped), len(methods)), dtype=np.int64)
+            P[np.arange(len(mapped)), [methods.index(m) for m in mapped]] = 1
+        k, m = len(methods), len(self.labels["bnpl"])
+        col = methods.index(bnpl_category) if bnpl_category in methods else None
+        counts = np.zeros(k, dtype=np.int64)
+        cooc = np.zeros((k, k), dtype=np.int64)
+        kreuz = np.zeros((2, m), dtype=np.int64)
+        total = 0
+        for start, stop, rows in self._masked_blocks(mask):
+            X = self.indicator("zahlungsarten", start, stop, counts=True, rows=rows)
+            if mapping is not None:
+                X = X @ P
+            Xb = (X > 0).astype(np.int64)
+            total += len(X)
+            counts += X.sum(axis=0)
+            cooc += Xb.T @ Xb
+            has_bnpl = Xb[:, col] if col is not None else np.zeros(len(X), dtype=np.int64)
+            kreuz += crosstab_codes(has_bnpl, self.codes("bnpl", start, stop, rows), 2, m)
+        return PaymentCounts.from_state({
+            "total": total, "methods": methods, "counts": counts.tolist(),
+            "cooc": cooc.tolist(), "bnpl": self.labels["bnpl"], "kreuz": kreuz.tolist(),
+        }, bnpl_category=bnpl_category)
+
+    def warenkorb_counts(self, order_veraenderung=None, order_aspekte=None, mask=None):
+        """:class:`.survey.WarenkorbCounts` aus AN/AO (``mask`` wie bei :meth:`payment_counts`)."""
+        ver = np.zeros(len(self.labels["veraenderung"]), dtype=np.int64)
+        asp = np.zeros(len(self.labels["aspekte"]), dtype=np.int64)
+        total = 0
+        for start, stop, rows in self._masked_blocks(mask):
+            c = self.codes("veraenderung", start, stop, rows)
+            total += len(c)
+            ver += np.bincount(c[c >= 0], minlength=len(ver))
+            asp += self.indicator("aspekte", start, stop, counts=True, rows=rows).sum(axis=0)
+        return WarenkorbCounts.from_state({
+            "total": total, "veraenderung": self.labels["veraenderung"], "ver": ver.tolist(),
+            "aspekte": self.labels["aspekte"], "asp": asp.tolist(),
+        }, order_veraenderung, order_aspekte)
+
+
+# -------------------------------------------------------
+# Bauen, Schreiben, Öffnen
+# -------------------------------------------------------
+class _Spool:
+    """Blöcke (Zeilen × Breite) an eine Rohdatei anhängen; die Breite darf wachsen."""
+
+    def __init__(self, path, dtype=np.uint8):
+        self.path, self.dtype = Path(path), np.dtype(dtype)
+        self.shapes = []
+        self.file = open(self.path, "wb")
+
+    def append(self, block):
+        block = np.ascontiguousarray(block, dtype=self.dtype)
+        self.shapes.append(block.shape)
+        block.tofile(self.file)
+
+    def save(self, target, width=None):
+        """Als ``.npy`` ablegen; Blöcke werden rechts mit Nullen auf ``width`` aufgefüllt."""
+        self.file.close()
+        rows = sum(shape[0] for shape in self.shapes)
+        shape = (rows,) if width is None else (rows, width)
+        tmp = target.with_name(f"{target.stem}.{os.getpid()}.tmp.npy")
+        if rows == 0:
+            np.save(tmp, np.zeros(shape, dtype=self.dtype))
+        else:
+            out = np.lib.format.open_memmap(tmp, mode="w+", dtype=self.dtype, shape=shape)
+            pos = offset = 0
+            for block_shape in self.shapes:
+                n = int(np.prod(block_shape))
+                if n:
+                    src = np.memmap(self.path, dtype=self.dtype, mode="r", offset=offset,
+                                    shape=block_shape)
+                    if width is None:
+                        out[pos:pos + block_shape[0]] = src
+                    else:
+                        out[pos:pos + block_shape[0], :block_shape[1]] = src
+                    del src
+                pos += block_shape[0]
+                offset += n * self.dtype.itemsize
+            out.flush()
+            del out
+        self.path.unlink()
+        os.replace(tmp, target)
+
+
+def build_store(path, chunksize=DEFAULT_CHUNKSIZE, folder=None, source=None):
+    """Export (xlsx/csv) einmal streamen -> :class:`SurveyStore`.
+
+    Mit ``folder`` wird der Speicher dort abgelegt (``source`` landet in
+    ``meta.json``) und memory-mapped zurückgegeben, sonst in einem temporären
+    Ordner gebaut und in den Arbeitsspeicher geladen.
+    """
+    if folder is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            mapped = build_store(path, chunksize, tmp)
+            store = SurveyStore({name: np.array(a) for name, a in mapped.arrays.items()}, mapped.labels)
+            del mapped
+        return store
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "meta.json").unlink(missing_ok=True)  # unvollständig, bis meta.json neu geschrieben ist
+
+    methods = MultiSelectTokenizer(functools.partial(normalize_method, mapping=None))
+    aspekte = MultiSelectTokenizer()
+    coders = {name: CategoryCodes() for name in CODES}
+    spools = {name: _Spool(folder / f"{name}.{os.getpid()}.raw") for name in BITMASKS + CODES}
+    extras = {name: [np.zeros((0, 3), dtype=np.int64)] for name in BITMASKS}
+    rows = 0
+    try:
+        for chunk in iter_survey_chunks(path, f"{SEGMENT_COLS},{SURVEY_COLS}",
+                                        SEGMENT_NAMES + SURVEY_NAMES, chunksize):
+            matrices = {"zahlungsarten": methods.transform(clean_column(chunk["Zahlungsarten"])),
+                        "aspekte": aspekte.transform(chunk["Aspekte"])}
+            for name, X in matrices.items():
+                packed, extra = _pack(X, (X.shape[1] + 7) // 8, rows)
+                spools[name].append(packed)
+                extras[name].append(extra)
+            values = {"bnpl": clean_column(chunk["BNPL_Aenderung"], map_bnpl),
+                      "veraenderung": chunk["Veränderung_Warenkorb"],
+                      **{name: segment_column(chunk[name], name) for name in SEGMENT_NAMES}}
+            for name, v in values.items():
+                spools[name].append(_codes(coders[name].transform(v), coders[name].labels))
+            rows += len(chunk)
+        labels = {"zahlungsarten": methods.columns, "aspekte": aspekte.columns,
+                  **{name: c.labels for name, c in coders.items()}}
+        for name in BITMASKS:
+            # Vokabular wächst blockweise: alle Blöcke auf die endgültige Breite auffüllen
+            spools[name].save(folder / f"{name}.npy", (len(labels[name]) + 7) // 8)
+            _atomic_save(np.concatenate(extras[name]), folder / f"{name}_extra.npy")
+        for name in CODES:
+            spools[name].save(folder / f"{name}.npy")
+    finally:
+        for spool in spools.values():
+            spool.file.close()
+            spool.path.unlink(missing_ok=True)
+    _write_meta(folder, rows, labels, source)
+    return open_store(folder)
+
+
+def _atomic_save(array, target):
+    tmp = target.with_name(f"{target.stem}.{os.getpid()}.tmp.npy")
+    np.save(tmp, array)
+    os.replace(tmp, target)
+
+
+def _write_meta(folder, rows, labels, source=None):
+    meta = {"version": STORE_VERSION, "rows": rows, "labels": labels, "source": source or {}}
+    tmp = Path(folder) / f"meta.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, Path(folder) / "meta.json")
+
+
+def save_store(store, folder, source=None):
+    """Arrays als ``.npy`` und ``meta.json`` (zuletzt, markiert den Speicher als vollständig)."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    for name, array in store.arrays.items():
+        _atomic_save(np.ascontiguousarray(array), folder / f"{name}.npy")
+    _write_meta(folder, store.rows, store.labels, source)
+
+
+def _read_meta(folder):
+    try:
+        meta = json.loads((Path(folder) / "meta.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    return meta if meta.get("version") == STORE_VERSION else None
+
+
+def open_store(folder):
+    """Gespeicherten Speicher memory-mapped öffnen."""
+    folder = Path(folder)
+    meta = _read_meta(folder)
+    if meta is None:
+        raise FileNotFoundError(f"Kein Umfrage-Speicher (Version {STORE_VERSION}) in {folder}")
+    arrays = {name: np.load(folder / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+    return SurveyStore(arrays, meta["labels"])
+
+
+def store_dir(path):
+    """Ablageort des Speichers für einen Export."""
+    key = hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()
+    return STORE_DIR / key
+
+
+def survey_store(path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Speicher eines Exports öffnen; fehlt er oder ist er veraltet, wird er neu gebaut.
+
+    Ohne ``path`` der Export aus :func:`.paths.survey_file`. Mit ``ZB_NO_CACHE=1``
+    wird nur im Speicher gebaut.
+    """
+    from .paths import ZAHLUNGSARTEN_DIR, survey_file
+
+    path = Path(path or survey_file(ZAHLUNGSARTEN_DIR))
+    if not ingest.ENABLED:
+        return build_store(path, chunksize)
+    folder = store_dir(path)
+    stat = path.stat()
+    meta = _read_meta(folder)
+    if meta is not None and meta["source"] and ingest._is_fresh(meta["source"], path, stat):
+        if meta["source"]["mtime_ns"] != stat.st_mtime_ns:
+            meta["source"]["mtime_ns"] = stat.st_mtime_ns
+            (folder / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        return open_store(folder)
+    return build_store(path, chunksize, folder, {"file": str(path.resolve()), "size": stat.st_size,
+                                                 "mtime_ns": stat.st_mtime_ns,
+                                                 "sha256": ingest.file_sha256(path)})
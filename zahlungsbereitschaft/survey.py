@@ -0,0 +1,447 @@
+"""Gestreamtes Einlesen und Zählen der Umfrage (Umfrage.xlsx bzw. CSV-Export).
+
+Die Excel-Datei wird mit openpyxl im read-only-Modus Zeile für Zeile gelesen,
+ein CSV-Export blockweise mit ``pd.read_csv(chunksize=...)``. Die Stufen
+clean_text -> split -> normalize -> count laufen pro Block (über die
+Indikatormatrix aus :mod:`.multiselect`), es bleiben nur die Zähler im
+Speicher. Der Speicherbedarf hängt damit von ``chunksize`` ab, nicht von der
+Zahl der Teilnehmenden.
+"""
+import functools
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .fuzzy import fuzzy_lookup
+from .taxonomy import UMFRAGE_ZU_VERGLEICH
+from .multiselect import (
+    CategoryCodes, MultiSelectTokenizer, arrow_factorize, arrow_strings, binary, column_counts,
+    crosstab_codes, grow, has_category, resolve_backend,
+)
+
+# Spaltenbereiche im Umfrage-Export
+ZAHLUNGSARTEN_COLS = "AP:AQ"
+ZAHLUNGSARTEN_NAMES = ["Zahlungsarten", "BNPL_Aenderung"]
+WARENKORB_COLS = "AN:AO"
+WARENKORB_NAMES = ["Veränderung_Warenkorb", "Aspekte"]
+# Merkmale für Teilgruppen (segments.py): Startzeit -> Welle, Alter, Geschlecht, Kaufhäufigkeit
+SEGMENT_COLS = "B,G:I"
+SEGMENT_NAMES = ["welle", "alter", "geschlecht", "haeufigkeit"]
+WELLE_FORMAT = "%Y-%m"  # eine Welle je Kalendermonat
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# BNPL-Antworten vereinheitlichen
+map_bnpl = {
+    "Ich nutze BNPL häufiger als früher": "Häufiger",
+    "Ich nutze BNPL etwa gleich häufig": "Gleich häufig",
+    "Ich nutze BNPL seltener als früher": "Seltener",
+    "Ich habe BNPL noch nie genutzt": "Nie genutzt",
+}
+
+# Zahlungsarten so, wie sie in der Umfrage heißen
+SURVEY_METHODS = {
+    "paypal": "PayPal",
+    "kreditkarte": "Kreditkarte",
+    "rechnung": "Rechnung",
+    "lastschrift": "Lastschrift",
+    "sofortüberweisung": "Sofortüberweisung",
+    # gewöhnliche Überweisung ist keine Sofortüberweisung (auch nicht unscharf)
+    "überweisung": "Überweisung",
+    "banküberweisung": "Überweisung",
+    "apple pay": "Apple Pay",
+    "bnpl (klarna)": "BNPL (Klarna)",
+}
+
+# Zahlungsarten auf die Statista-Vergleichskategorien abgebildet
+STATISTA_METHODS = UMFRAGE_ZU_VERGLEICH
+
+# Zeichen, die clean_text ersetzt (NBSP -> Leerzeichen, typografische Anführungszeichen weg)
+_CLEAN_REPLACE = (("\xa0", " "), ("\u202f", " "), ("„", ""), ("“", ""), ("‚", ""), ("’", ""))
+
+_BNPL_RE = re.compile(r"buy\s*now\s*pay\s*later.*", flags=re.I)
+_KRYPTO_RE = re.compile(r"krypto\w*", flags=re.I)
+
+
+def clean_text(s) -> str:
+    if pd.isna(s):
+        return ""
+    s = str(s)
+    for old, new in _CLEAN_REPLACE:
+        s = s.replace(old, new)
+    return s.strip().strip(";")
+
+
+def _clean_arrow(dictionary):
+    """clean_text als ``pyarrow.compute``-Kernel über ein StringArray (ohne Nullwerte)."""
+    import pyarrow.compute as pc
+
+    for old, new in _CLEAN_REPLACE:
+        dictionary = pc.replace_substring(dictionary, old, new)
+    # utf8_trim_whitespace entfernt dieselben Zeichen wie str.strip()
+    return pc.utf8_trim(pc.utf8_trim_whitespace(dictionary), ";").to_pylist()
+
+
+def normalize_method(token: str, mapping=None, fuzzy=True) -> str:
+    t = clean_text(token)
+    t = _BNPL_RE.sub("BNPL (Klarna)", t)
+    t = _KRYPTO_RE.sub("Krypto", t)
+    mapping = SURVEY_METHODS if mapping is None else mapping
+    key = t.lower()
+    if key in mapping:
+        return mapping[key]
+    if fuzzy and key:
+        # Tippfehler/Varianten: nächste Kategorie über Trigramme (fuzzy.py)
+        return fuzzy_lookup(mapping)(key) or t
+    return t
+
+
+# -------------------------------------------------------
+# Lesen
+# -------------------------------------------------------
+def _col_indices(usecols):
+    """Excel-Spalten wie "AN:AQ" oder "B,G:I,AN:AQ" -> aufsteigende 0-basierte Indizes."""
+    from openpyxl.utils import column_index_from_string
+
+    out = set()
+    for part in usecols.split(","):
+        first, _, last = part.strip().partition(":")
+        out.update(range(column_index_from_string(first) - 1, column_index_from_string(last or first)))
+    return sorted(out)
+
+
+def _iter_xlsx_chunks(path, usecols, names, chunksize, sheet_name):
+    from openpyxl import load_workbook
+
+    idx = _col_indices(usecols)
+    width = len(idx)
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        # Forms-Exporte tragen oft eine falsche Blattgröße (A1:A1) ein
+        ws.reset_dimensions()
+        rows = ws.iter_rows(min_row=2, values_only=True)  # Zeile 1 = Kopfzeile
+        buf, pending_blank = [], 0
+        for row in rows:
+            if all(v is None for v in row):
+                # wie pd.read_excel: Leerzeilen zählen nur, wenn danach noch Daten kommen
+                pending_blank += 1
+                continue
+            if pending_blank:
+                buf.extend([(None,) * width] * pending_blank)
+                pending_blank = 0
+            n = len(row)
+            buf.append(tuple(row[i] if i < n else None for i in idx))
+            if len(buf) >= chunksize:
+                yield pd.DataFrame(buf, columns=names, dtype=object)
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=names, dtype=object)
+    finally:
+        wb.close()
+
+
+def _iter_csv_chunks(path, usecols, names, chunksize):
+    reader = pd.read_csv(path, usecols=_col_indices(usecols), dtype=object,
+                         chunksize=chunksize)
+    for chunk in reader:
+        chunk.columns = names
+        yield chunk
+
+
+def _iter_csv_chunks_arrow(path, usecols, names, chunksize):
+    """Wie :func:`_iter_csv_chunks`, aber über ``pyarrow.csv``: Spalten als Arrow-Strings."""
+    import pyarrow as pa
+    from pyarrow import csv
+
+    cols = [f"f{i}" for i in _col_indices(usecols)]
+    convert = csv.ConvertOptions(
+        include_columns=cols, column_types=dict.fromkeys(cols, pa.string()),
+        # dieselben NA-Werte wie pd.read_csv
+        strings_can_be_null=True, null_values=csv.ConvertOptions().null_values + ["<NA>", "None"],
+    )
+    reader = csv.open_csv(path, read_options=csv.ReadOptions(skip_rows=1, autogenerate_column_names=True),
+                          parse_options=csv.ParseOptions(newlines_in_values=True),
+                          convert_options=convert)
+    start, pending, rows = 0, [], 0
+
+    def frame(table):
+        chunk = table.rename_columns(names).to_pandas(types_mapper=pd.ArrowDtype)
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        return chunk
+
+    for batch in reader:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunksize:
+            table = pa.Table.from_batches(pending, reader.schema)
+            yield frame(table.slice(0, chunksize))
+            start += chunksize
+            rest = table.slice(chunksize)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield frame(pa.Table.from_batches(pending, reader.schema))
+
+
+def iter_survey_chunks(path, usecols, names, chunksize=DEFAULT_CHUNKSIZE, sheet_name=0):
+    """Liefert die Spalten ``usecols`` (z. B. "AP:AQ" oder "B,G:I") blockweise als DataFrames.
+
+    ``.csv``-Dateien werden als Export mit denselben Spaltenpositionen gelesen
+    (mit ``ZB_BACKEND=arrow`` über ``pyarrow.csv``).
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv" and resolve_backend() == "arrow":
+        yield from _iter_csv_chunks_arrow(path, usecols, names, chunksize)
+    elif path.suffix.lower() == ".csv":
+        yield from _iter_csv_chunks(path, usecols, names, chunksize)
+    else:
+        yield from _iter_xlsx_chunks(path, usecols, names, chunksize, sheet_name)
+
+
+# -------------------------------------------------------
+# Zählen
+# -------------------------------------------------------
+def clean_column(col, mapping=None, backend=None):
+    """clean_text (und optional ein Wörterbuch) nur auf die verschiedenen Werte anwenden.
+
+    Fehlende Werte werden zu ``""``. Das Ergebnis ist kategorial (Kategorien =
+    bereinigte Werte), die folgenden ``transform``-Aufrufe faktorisieren also
+    nur noch Codes statt Strings.
+    """
+    if not isinstance(col, pd.Series):
+        col = pd.Series(col, dtype=object)
+    arr = arrow_strings(col) if resolve_backend(backend) == "arrow" else None
+    if arr is not None:
+        codes, dictionary = arrow_factorize(arr)
+        cleaned = _clean_arrow(dictionary)
+    else:
+        codes, uniques = pd.factorize(col, use_na_sentinel=True)
+        cleaned = [clean_text(u) for u in uniques]
+    if mapping is not None:
+        cleaned = [mapping.get(c, c) for c in cleaned]
+    cleaned.append("")  # fehlend
+    codes = np.where(codes < 0, len(cleaned) - 1, codes)
+    # verschiedene Rohwerte mit gleichem Ergebnis zu einer Kategorie zusammenlegen
+    inner, categories = pd.factorize(np.array(cleaned, dtype=object))
+    values = pd.Categorical.from_codes(inner[codes], pd.Index(categories, dtype=object))
+    return pd.Series(values, index=col.index)
+
+
+def segment_column(col, name):
+    """Merkmalsspalte -> Gruppen (fehlend = NaN); ``welle`` aus der Startzeit (``WELLE_FORMAT``)."""
+    if name == "welle":
+        return pd.to_datetime(col, errors="coerce", format="mixed").dt.strftime(WELLE_FORMAT)
+    values = clean_column(col).astype(object)
+    return values.where(values != "")
+
+
+def _counts_frame(labels, counts, label, total, order=None):
+    s = pd.Series(np.asarray(counts, dtype="int64"), index=list(labels), dtype="int64")
+    if order is None:
+        # absteigend, bei Gleichstand in der Reihenfolge des ersten Auftretens
+        s = s.sort_values(ascending=False, kind="stable")
+    else:
+        s = s.reindex(order).fillna(0)
+    out = s.rename_axis(label).reset_index(name="Anzahl")
+    out["Anteil_%"] = (out["Anzahl"] / total * 100).round(1)
+    return out
+
+
+def _remap(vocabulary, labels):
+    """Labels eines anderen Zählstands -> Ids in ``vocabulary`` (neue Labels werden angehängt)."""
+    return np.array([vocabulary.setdefault(label, len(vocabulary)) for label in labels],
+                    dtype=np.int64)
+
+
+class PaymentCounts:
+    """Zählstand für Zahlungsarten (AP), BNPL (AQ) und die BNPL-Kreuztabelle.
+
+    Der Stand ist zusammenführbar: ``update`` faltet einen Block ein,
+    ``merge`` einen anderen Zählstand (z. B. aus einer neuen Antwort-Charge),
+    ``to_state``/``from_state`` machen ihn als JSON speicherbar. Die
+    Reihenfolge des ersten Auftretens bleibt dabei erhalten, das Ergebnis ist
+    also dasselbe wie beim Zählen in einem Durchgang.
+    """
+
+    def __init__(self, mapping=None, bnpl_category="BNPL (Klarna)"):
+        self.tokenizer = MultiSelectTokenizer(functools.partial(normalize_method, mapping=mapping))
+        self.bnpl_codes = CategoryCodes()
+        self.bnpl_category = bnpl_category
+        self.total = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.cooc = np.zeros((0, 0), dtype=np.int64)
+        self.kreuz = np.zeros((2, 0), dtype=np.int64)  # Zeile 0: ohne, 1: mit BNPL
+
+    def update(self, chunk):
+        """Einen Block mit den Spalten "Zahlungsarten" und "BNPL_Aenderung" einzählen."""
+        self.total += len(chunk)
+        X = self.tokenizer.transform(clean_column(chunk["Zahlungsarten"]))
+        bnpl = self.bnpl_codes.transform(clean_column(chunk["BNPL_Aenderung"], map_bnpl))
+
+        k, m = X.shape[1], len(self.bnpl_codes.vocabulary)
+        self.counts = grow(self.counts, k) + column_counts(X)
+        Xb = binary(X)
+        self.cooc = grow(grow(self.cooc, k).T, k).T + (Xb.T @ Xb).toarray()
+        col = self.tokenizer.vocabulary.get(self.bnpl_category)
+        has_bnpl = has_category(X, col).astype(np.int64)
+        self.kreuz = grow(self.kreuz, m) + crosstab_codes(has_bnpl, bnpl, 2, m)
+        return self
+
+    def merge(self, other):
+        """Anderen Zählstand addieren (Vokabulare werden vereinigt)."""
+        ids = _remap(self.tokenizer.vocabulary, other.tokenizer.columns)
+        bids = _remap(self.bnpl_codes.vocabulary, other.bnpl_codes.labels)
+        k, m = len(self.tokenizer.vocabulary), len(self.bnpl_codes.vocabulary)
+        self.total += other.total
+        self.counts = grow(self.counts, k)
+        self.counts[ids] += other.counts
+        self.cooc = grow(grow(self.cooc, k).T, k).T
+        self.cooc[np.ix_(ids, ids)] += other.cooc
+        self.kreuz = grow(self.kreuz, m)
+        self.kreuz[:, bids] += other.kreuz
+        return self
+
+    def result(self):
+        methods = self.tokenizer.columns
+        labels = self.bnpl_codes.labels
+        kreuz_df = pd.DataFrame(self.kreuz, index=["Ohne BNPL", "Mit BNPL gewählt"], columns=labels)
+        # wie pd.crosstab: nur beobachtete Zeilen, Achsen sortiert
+        kreuz_df = kreuz_df[kreuz_df.sum(axis=1) > 0].sort_index().sort_index(axis=1).astype(int)
+        kreuz_df.index.name = "Zahlungsarten"
+        kreuz_df.columns.name = "BNPL_norm"
+        return {
+            "total": self.total,
+            "method_counts": _counts_frame(methods, self.counts, "Kategorie", self.total),
+            "bnpl_counts": _counts_frame(labels, self.kreuz.sum(axis=0), "Kategorie", self.total),
+            "kreuz": kreuz_df,
+            "cooccurrence": pd.DataFrame(self.cooc, index=methods, columns=methods),
+        }
+
+    def to_state(self):
+        return {
+            "total": self.total,
+            "methods": self.tokenizer.columns,
+            "counts": self.counts.tolist(),
+            "cooc": self.cooc.tolist(),
+            "bnpl": self.bnpl_codes.labels,
+            "kreuz": self.kreuz.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state, mapping=None, bnpl_category="BNPL (Klarna)"):
+        self = cls(mapping, bnpl_category)
+        k, m = len(state["methods"]), len(state["bnpl"])
+        self.tokenizer.vocabulary = {label: i for i, label in enumerate(state["methods"])}
+        self.bnpl_codes.vocabulary = {label: i for i, label in enumerate(state["bnpl"])}
+        self.total = state["total"]
+        self.counts = np.array(state["counts"], dtype=np.int64).reshape(k)
+        self.cooc = np.array(state["cooc"], dtype=np.int64).reshape(k, k)
+        self.kreuz = np.array(state["kreuz"], dtype=np.int64).reshape(2, m)
+        return self
+
+
+class WarenkorbCounts:
+    """Zählstand für Warenkorb-Veränderung (AN) und Aspekte (AO), zusammenführbar
+    wie :class:`PaymentCounts`."""
+
+    def __init__(self, order_veraenderung=None, order_aspekte=None):
+        self.order_veraenderung = order_veraenderung
+        self.order_aspekte = order_aspekte
+        self.ver_codes = CategoryCodes()
+        self.tokenizer = MultiSelectTokenizer()
+        self.total = 0
+        self.ver = np.zeros(0, dtype=np.int64)
+        self.asp = np.zeros(0, dtype=np.int64)
+
+    def update(self, chunk):
+        """Einen Block mit den Spalten "Veränderung_Warenkorb" und "Aspekte" einzählen."""
+        self.total += len(chunk)
+        codes = self.ver_codes.transform(chunk["Veränderung_Warenkorb"])
+        self.ver = grow(self.ver, len(self.ver_codes.vocabulary))
+        self.ver += np.bincount(codes[codes >= 0], minlength=len(self.ver))
+        X = self.tokenizer.transform(chunk["Aspekte"])
+        self.asp = grow(self.asp, X.shape[1]) + column_counts(X)
+        return self
+
+    def merge(self, other):
+        vids = _remap(self.ver_codes.vocabulary, other.ver_codes.labels)
+        aids = _remap(self.tokenizer.vocabulary, other.tokenizer.columns)
+        self.total += other.total
+        self.ver = grow(self.ver, len(self.ver_codes.vocabulary))
+        self.ver[vids] += other.ver
+        self.asp = grow(self.asp, len(self.tokenizer.vocabulary))
+        self.asp[aids] += other.asp
+        return self
+
+    def result(self):
+        return {
+            "total": self.total,
+            "ver": _counts_frame(self.ver_codes.labels, self.ver, "Antwort", self.total,
+                                 self.order_veraenderung),
+            "asp": _counts_frame(self.tokenizer.columns, self.asp, "Aspekt", self.total,
+                                 self.order_aspekte),
+        }
+
+    def to_state(self):
+        return {
+            "total": self.total,
+            "veraenderung": self.ver_codes.labels,
+            "ver": self.ver.tolist(),
+            "aspekte": self.tokenizer.columns,
+            "asp": self.asp.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state, order_veraenderung=None, order_aspekte=None):
+        self = cls(order_veraenderung, order_aspekte)
+        self.ver_codes.vocabulary = {label: i for i, label in enumerate(state["veraenderung"])}
+        self.tokenizer.vocabulary = {label: i for i, label in enumerate(state["aspekte"])}
+        self.total = state["total"]
+        self.ver = np.array(state["ver"], dtype=np.int64)
+        self.asp = np.array(state["asp"], dtype=np.int64)
+        return self
+
+
+def count_payment_survey(chunks, mapping=None, bnpl_category="BNPL (Klarna)"):
+    """Zählt Zahlungsarten, BNPL-Antworten und die BNPL-Kreuztabelle blockweise.
+
+    ``chunks`` liefert DataFrames mit den Spalten "Zahlungsarten" und
+    "BNPL_Aenderung" (siehe :func:`iter_survey_chunks`). Pro Block wird die
+    Indikatormatrix gebaut; "BNPL gewählt" ist deren Spalte ``bnpl_category``.
+    """
+    acc = PaymentCounts(mapping, bnpl_category)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.result()
+
+
+def count_warenkorb_survey(chunks, order_veraenderung=None, order_aspekte=None):
+    """Zählt Warenkorb-Veränderung (AN) und Aspekte (AO, Mehrfachauswahl) blockweise."""
+    acc = WarenkorbCounts(order_veraenderung, order_aspekte)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.result()
+
+
+def survey_counts(kind="zahlungsarten", path=None, mapping=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Umfrage eines Analyseordners zählen.
+
+    ``kind="zahlungsarten"`` -> wie :func:`count_payment_survey` (Spalten AP:AQ),
+    ``kind="warenkorb"`` -> wie :func:`count_warenkorb_survey` (Spalten AN:AO, feste
+    Antwort-Reihenfolge). ``path`` überschreibt den Export aus :func:`survey_file`.
+    Gezählt wird über den memory-mapped Speicher aus :mod:`.store` (beim ersten
+    Mal wird der Export dafür einmal gestreamt).
+    """
+    from .paths import WARENKORB_DIR, ZAHLUNGSARTEN_DIR, survey_file
+    from .store import survey_store
+    from .warenkorb import ORDER_ASPEKTE, ORDER_VERAENDERUNG
+
+    if kind == "zahlungsarten":
+        store = survey_store(path or survey_file(ZAHLUNGSARTEN_DIR), chunksize)
+        return store.payment_counts(mapping=mapping).result()
+    if kind == "warenkorb":
+        store = survey_store(path or survey_file(WARENKORB_DIR), chunksize)
+        return store.warenkorb_counts(ORDER_VERAENDERUNG, ORDER_ASPEKTE).result()
+    raise ValueError(f"Unbekannte Umfrage: {kind!r} (zahlungsarten oder warenkorb)")
@@ -0,0 +1,41 @@
+"""Reine Tabellen-Auswertung (ohne SciPy-Tests und ohne Matplotlib).
+
+``summary_tables()`` liefert alle Ergebnis-Tabellen beider Analysen. Weil
+weder :mod:`.plots` noch ``scipy.stats`` importiert werden, bleibt ein
+Kaltstart (``python -m zahlungsbereitschaft --tables``) bei warmem
+Excel-Cache unter :data:`COLD_START_TARGET_S`.
+"""
+from .panel import load_panels
+from .statista import compare_survey_vs_statista, jahresvergleich_panel, vergleichsanteile_panel
+from .survey import survey_counts
+from .taxonomy import UMFRAGE_ZU_VERGLEICH
+from .warenkorb import warenkorb_metrics, warenkorb_table
+
+# Zielwert für einen Tabellen-Lauf inkl. Interpreterstart (Excel-Cache warm).
+# Gemessen (Median aus 5 Läufen): ~1.1 s, mit SciPy/Matplotlib-Import ~2.8 s.
+COLD_START_TARGET_S = 1.5
+
+# Module, die ein Tabellen-Lauf nicht laden darf
+HEAVY_MODULES = ("scipy.stats", "matplotlib.pyplot")
+
+
+def summary_tables():
+    """{Name: DataFrame} mit allen Kennzahl-Tabellen beider Analysen."""
+    panel = load_panels()  # alle Jahre im Ordner, auch neu dazugelegte
+    jahre = jahresvergleich_panel(panel)
+    differenzen = [c for c in jahre.columns if c.startswith("Δ")]  # neuestes Jahr zuerst
+    zahlungsarten = survey_counts("zahlungsarten")
+    vergleich = survey_counts("zahlungsarten", mapping=UMFRAGE_ZU_VERGLEICH)
+    _, summary = warenkorb_metrics(warenkorb_table())
+    warenkorb = survey_counts("warenkorb")
+    return {
+        "jahresvergleich": jahre.sort_values(by=differenzen[0], ascending=False) if differenzen else jahre,
+        "umfrage_vs_statista": compare_survey_vs_statista(
+            vergleich["method_counts"], vergleich["total"], vergleichsanteile_panel(panel, 2023)),
+        "zahlungsarten": zahlungsarten["method_counts"],
+        "bnpl": zahlungsarten["bnpl_counts"],
+        "bnpl_kreuz": zahlungsarten["kreuz"],
+        "warenkorb_5J": summary.round(1),
+        "warenkorb_veraenderung": warenkorb["ver"],
+        "warenkorb_aspekte": warenkorb["asp"],
+    }
@@ -0,0 +1,232 @@
+"""Eine gemeinsame Taxonomie der Zahlungsarten für alle Jahre und die Umfrage.
+
+Jede Statista-Bezeichnung wird einmal auf einen festen Integer-Code
+(``KATEGORIE``, ein ``pd.CategoricalDtype``) übersetzt. Normalisieren,
+Jahresvergleich (2019/2021/2023), Umfrage-Vergleich und Fokus-Auswahl sind
+danach Array-Operationen (``np.bincount`` bzw. Indexzugriffe) statt
+String-Merges.
+
+Zwei Ebenen:
+
+* ``KATEGORIEN`` – feine Kategorien (Jahresvergleich in Frage2.py)
+* ``VERGLEICHSKATEGORIEN`` – gröbere Kategorien für den Umfrage-Vergleich
+  (z. B. Sofort -> Überweisung, Klarna -> BNPL)
+"""
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------
+# Feine Kategorien (alphabetisch = Reihenfolge der Codes)
+# -------------------------------------------------------
+KATEGORIEN = [
+    "Andere",
+    "Andere Karte",
+    "Bezahlung im Geschäft",
+    "E-Wallet",
+    "Giropay",
+    "Gutschein/Geschenkkarte",
+    "Kauf auf Kredit",
+    "Kreditkarte",
+    "Krypto",
+    "Lastschrift/SEPA",
+    "Mobile Wallet",
+    "Nachnahme",
+    "Rechnung",
+    "Rechnung (BNPL/Klarna)",
+    "Sofortüberweisung",
+    "Vorkasse",
+    "Überweisung/Online-Transfer",
+]
+KATEGORIE = pd.CategoricalDtype(KATEGORIEN)
+
+# Statista-Bezeichnung je Erhebungsjahr -> feine Kategorie
+STATISTA_LABELS = {
+    2019: {
+        "Über einen Bezahldienstleister (z.B. Paypal)": "E-Wallet",
+        "Rechnung": "Rechnung",
+        "Kreditkarte": "Kreditkarte",
+        "Per Überweisung": "Überweisung/Online-Transfer",
+        "Per Lastschrift": "Lastschrift/SEPA",
+        "Sofortüberweisung": "Sofortüberweisung",
+        "Vorkasse": "Vorkasse",
+    },
+    2021: {
+        "E-Wallets": "E-Wallet",
+        "Auf Rechnung": "Rechnung",
+        "Bezahlung mit Kreditkarte": "Kreditkarte",
+        "SEPA-Direktmandat": "Lastschrift/SEPA",
+        "Online-Transfer": "Überweisung/Online-Transfer",
+        "Mobile Geldbörsen": "Mobile Wallet",
+        "Lieferung per Nachnahme": "Nachnahme",
+        "Andere": "Andere",
+    },
+    2023: {
+        "E-Wallet (Paypal, Alipay)": "E-Wallet",
+        "Per Rechnung (und Zahlschein)": "Rechnung",
+        "Klarna": "Rechnung (BNPL/Klarna)",
+        "Kreditkarte einer inländischen Bank / Debitkarte": "Kreditkarte",
+        "Visa / Mastercard": "Kreditkarte",
+        "Banküberweisung": "Überweisung/Online-Transfer",
+        "Direct debit": "Lastschrift/SEPA",
+        "Voucher ePay / Geschenkkarte eines Geschäfts / einer Marke": "Gutschein/Geschenkkarte",
+        "Bezahlung im Geschäft": "Bezahlung im Geschäft",
+        "Giropay": "Giropay",
+        "Sofort": "Sofortüberweisung",
+        "Kauf auf Kredit": "Kauf auf Kredit",
+        "Andere Karten (American Express)": "Andere Karte",
+        "Mobile Bezahl-App": "Mobile Wallet",
+        "Cash-on-Delivery (COD)": "Nachnahme",
+        "Virtuelle Währungen (Bitcoin)": "Krypto",
+    },
+}
+
+# Spaltenköpfe der Einzelhandels-Zeitreihe -> Kategorie (eigene Ebene, nicht in
+# KATEGORIEN; nicht aufgeführte Köpfe bleiben unverändert)
+EINZELHANDEL_LABELS = {
+    "SEPA-Lastschrift": "Lastschrift",
+    "Rechnung/ Finanzkauf": "Rechnung",
+    "Maestro/V PAY, Debit International": "Maestro/V-Pay",
+}
+
+# -------------------------------------------------------
+# Grobe Kategorien für den Vergleich Umfrage vs. Statista
+# -------------------------------------------------------
+VERGLEICH = {
+    "Andere": "Andere",
+    "Andere Karte": "Andere Karte",
+    "Bezahlung im Geschäft": "Bezahlung im Geschäft",
+    "E-Wallet": "E-Wallet",
+    "Giropay": "Giropay",
+    "Gutschein/Geschenkkarte": "Gutschein/Geschenkkarte",
+    "Kauf auf Kredit": "Kauf auf Kredit",
+    "Kreditkarte": "Kreditkarte",
+    "Krypto": "Krypto",
+    "Lastschrift/SEPA": "Lastschrift/SEPA",
+    "Mobile Wallet": "Mobile Wallet",
+    "Nachnahme": "Nachnahme",
+    "Rechnung": "Rechnung",
+    "Rechnung (BNPL/Klarna)": "BNPL (Klarna)",
+    "Sofortüberweisung": "Überweisung/Online-Transfer",
+    "Vorkasse": "Nachnahme",
+    "Überweisung/Online-Transfer": "Überweisung/Online-Transfer",
+}
+VERGLEICHSKATEGORIEN = sorted(set(VERGLEICH.values()))
+VERGLEICHSKATEGORIE = pd.CategoricalDtype(VERGLEICHSKATEGORIEN)
+
+# Umfrage-Antworten (kleingeschrieben) -> grobe Kategorie
+UMFRAGE_ZU_VERGLEICH = {
+    "paypal": "E-Wallet",
+    "kreditkarte": "Kreditkarte",
+    "rechnung": "Rechnung",
+    "lastschrift": "Lastschrift/SEPA",
+    "sofortüberweisung": "Überweisung/Online-Transfer",
+    "überweisung": "Überweisung/Online-Transfer",
+    "banküberweisung": "Überweisung/Online-Transfer",
+    "apple pay": "Mobile Wallet",
+    "bnpl (klarna)": "BNPL (Klarna)",
+}
+
+# Kürzere Namen und Fokus-Kategorien für gute Lesbarkeit der Plots
+KURZNAMEN = {
+    "Überweisung/Online-Transfer": "Überweisung",
+    "Lastschrift/SEPA": "Lastschrift",
+    "E-Wallet": "E-Wallet (PayPal)",
+    "Andere Karte": "Andere Karten",
+    "Gutschein/Geschenkkarte": "Gutscheinkarten",
+}
+FOKUS = [
+    "E-Wallet",
+    "Kreditkarte",
+    "Rechnung",
+    "Lastschrift/SEPA",
+    "Überweisung/Online-Transfer",
+    "Mobile Wallet",
+    "BNPL (Klarna)",
+]
+
+# -------------------------------------------------------
+# "Kompilierte" Nachschlagetabellen
+# -------------------------------------------------------
+_CODE = {k: i for i, k in enumerate(KATEGORIEN)}
+_VERGLEICH_CODE = {k: i for i, k in enumerate(VERGLEICHSKATEGORIEN)}
+_SOURCE_CODE = {
+    year: {label: _CODE[kat] for label, kat in mapping.items()}
+    for year, mapping in STATISTA_LABELS.items()
+}
+# alle Jahre zusammen, für Jahre ohne eigene Tabelle
+_ANY_SOURCE_CODE = {label: code for m in _SOURCE_CODE.values() for label, code in m.items()}
+_ANY_SOURCE_CODE.update({k: i for i, k in enumerate(KATEGORIEN)})
+# fein -> grob als Integer-Array
+FEIN_ZU_VERGLEICH = np.array([_VERGLEICH_CODE[VERGLEICH[k]] for k in KATEGORIEN], dtype=np.int64)
+FOKUS_CODES = np.array([_VERGLEICH_CODE[k] for k in FOKUS], dtype=np.int64)
+
+
+def encode(labels, year=None, strict=True):
+    """Statista-Bezeichnungen -> Integer-Codes der feinen Kategorien.
+
+    Unbekannte Bezeichnungen lösen einen ``ValueError`` aus, damit neue
+    Statista-Labels bewusst in ``STATISTA_LABELS`` ergänzt werden; mit
+    ``strict=False`` erhalten sie den Code -1.
+    """
+    lookup = _SOURCE_CODE.get(year, _ANY_SOURCE_CODE)
+    labels = [str(s).strip() for s in labels]
+    codes = np.fromiter((lookup.get(s, _ANY_SOURCE_CODE.get(s, -1)) for s in labels),
+                        dtype=np.int64, count=len(labels))
+    if strict and (codes < 0).any():
+        unknown = sorted({s for s, c in zip(labels, codes) if c < 0})
+        raise ValueError(f"Unbekannte Zahlungsart(en) für {year}: {unknown} "
+                         "-> in taxonomy.STATISTA_LABELS ergänzen")
+    return codes
+
+
+def encode_vergleich(labels):
+    """Grobe Kategorienamen -> Codes; unbekannte (freie Umfrage-Antworten) -> -1."""
+    return np.fromiter((_VERGLEICH_CODE.get(s, -1) for s in labels), dtype=np.int64,
+                       count=len(labels))
+
+
+def shares_by_code(df, year=None, minlength=len(KATEGORIEN)):
+    """Eine Statista-Tabelle (Methode, Prozent) -> Anteile je Code.
+
+    Mehrfach gemappte Kategorien werden summiert; Kategorien, die im Jahr
+    nicht vorkommen, sind NaN.
+    """
+    codes = encode(df["Methode"], year)
+    pct = pd.to_numeric(df["Prozent"], errors="coerce").to_numpy(dtype=float)
+    valid = ~np.isnan(pct)
+    total = np.bincount(codes[valid], weights=pct[valid], minlength=minlength)
+    present = np.bincount(codes, minlength=minlength) > 0
+    return np.where(present, total, np.nan)
+
+
+def yearly_shares(frames):
+    """{Jahr: DataFrame(Methode, Prozent)} -> Tabelle "Kategorie", "pct_<Jahr>", ...
+
+    Ersetzt normalize() + die verketteten Outer-Merges: alle Jahre landen per
+    Code in denselben Zeilen, Kategorien ohne Wert in allen Jahren fallen weg.
+    """
+    mat = np.column_stack([shares_by_code(df, year) for year, df in frames.items()])
+    return shares_table(mat, list(frames))
+
+
+def shares_table(mat, years):
+    """Matrix Codes × Jahre -> Tabelle "Kategorie", "pct_<Jahr>", ... (ohne leere Kategorien)."""
+    keep = ~np.isnan(mat).all(axis=1)
+    out = pd.DataFrame(mat[keep], columns=[f"pct_{year}" for year in years])
+    out.insert(0, "Kategorie", pd.Categorical.from_codes(np.flatnonzero(keep), dtype=KATEGORIE))
+    return out
+
+
+def rollup_vergleich(values):
+    """Vektor über feine Codes -> Vektor über grobe Codes (NaN, wenn nichts beiträgt)."""
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    out = np.bincount(FEIN_ZU_VERGLEICH[valid], weights=values[valid],
+                      minlength=len(VERGLEICHSKATEGORIEN))
+    present = np.bincount(FEIN_ZU_VERGLEICH[valid], minlength=len(VERGLEICHSKATEGORIEN)) > 0
+    return np.where(present, out, np.nan)
+
+
+def fokus_index():
+    """Anzeigenamen der Fokus-Kategorien (mit Kurznamen)."""
+    return pd.Index([KURZNAMEN.get(k, k) for k in FOKUS], name="Kategorie")
@@ -0,0 +1,231 @@
+"""Partitionierter Spaltenspeicher für Handels- und Konsumreihen (``pyarrow.dataset``).
+
+Die Reihen liegen im langen Format (Reihe, Region, Jahr, Monat, Wert) als
+Parquet-Dateien unter ``<ordner>/Jahr=<jjjj>/Monat=<m>/`` (Hive-Partitionen;
+Jahreswerte haben ``Monat=0``). Innerhalb einer Partition sind die Zeilen
+nach Reihe und Region sortiert, die Row-Groups tragen Min/Max-Statistiken.
+
+:meth:`SeriesStore.read` gibt Zeitfenster und Auswahl an den Scan weiter:
+Das Fenster wird gegen die Partitionsschlüssel geprüft, Verzeichnisse
+außerhalb werden gar nicht geöffnet. Reihen und Regionen filtern beim Lesen
+der Dateien (Row-Groups außerhalb der Statistik fallen weg), und gelesen
+werden nur die angefragten Spalten. Die „letzten 5 Jahre“ aus zig Millionen
+Monatswerten kosten so nur die Dateien dieser fünf Jahre.
+
+:func:`write_series` schreibt partitionsweise: Partitionen, die in den neuen
+Daten vorkommen, werden ersetzt, alle anderen bleiben liegen (ein neuer Monat
+ist ein neues Verzeichnis). :func:`series_store` legt den Speicher für eine
+breite Tabelle (z. B. ``warenkorb_auswertung.csv``) unter ``.cache/reihen/`` an
+und baut ihn wie den Umfrage-Speicher (:mod:`.store`) neu, sobald sich die
+Datei ändert.
+"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from . import ingest
+from .paths import CACHE_DIR
+
+SERIES_DIR = CACHE_DIR / "reihen"
+SERIES_VERSION = 1
+COLUMNS = ["Reihe", "Region", "Jahr", "Monat", "Wert"]
+JAHRESWERT = 0  # Monat der Jahreswerte
+GESAMT = "Gesamt"  # Region von Reihen ohne regionale Aufteilung
+ROW_GROUP_ROWS = 1 << 17
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([("Reihe", pa.string()), ("Region", pa.string()), ("Jahr", pa.int16()),
+                      ("Monat", pa.int8()), ("Wert", pa.float64())])
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([("Jahr", pa.int16()), ("Monat", pa.int8())]), flavor="hive")
+
+
+def to_long(wide, region=GESAMT):
+    """Breite Tabelle (Jahr[, Monat], eine Spalte je Reihe) -> langes Format (``COLUMNS``)."""
+    keys = [c for c in ("Jahr", "Monat") if c in wide.columns]
+    long = wide.melt(id_vars=keys, var_name="Reihe", value_name="Wert")
+    if "Monat" not in keys:
+        long["Monat"] = JAHRESWERT
+    if "Region" not in long.columns:
+        long["Region"] = region
+    long = long.dropna(subset=["Jahr"])
+    return long[COLUMNS]
+
+
+# -------------------------------------------------------
+# Speicher
+# -------------------------------------------------------
+class SeriesStore:
+    """Lesezugriff auf ein partitioniertes Dataset (Datei-Ordner oder im Speicher)."""
+
+    def __init__(self, dataset, series=()):
+        self.dataset = dataset
+        self.series = list(series)  # Reihen in Reihenfolge des ersten Auftretens
+
+    @classmethod
+    def from_frame(cls, long):
+        """Speicher im Arbeitsspeicher (ohne Partitionen, z. B. mit ``ZB_NO_CACHE=1``)."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        table = pa.Table.from_pandas(long[COLUMNS], schema=_schema(), preserve_index=False)
+        return cls(ds.dataset(table), pd.unique(long["Reihe"]))
+
+    def periods(self):
+        """Sortierte (Jahr, Monat)-Paare; bei Dateien aus den Verzeichnisnamen, ohne Daten zu lesen."""
+        import pyarrow.dataset as ds
+
+        out = set()
+        for fragment in self.dataset.get_fragments():
+            keys = ds.get_partition_keys(fragment.partition_expression)
+            if "Jahr" in keys:
+                out.add((int(keys["Jahr"]), int(keys["Monat"])))
+            else:
+                t = fragment.to_table(columns=["Jahr", "Monat"])
+                out.update(zip(t["Jahr"].to_pylist(), t["Monat"].to_pylist()))
+        return sorted(out)
+
+    def last_year(self):
+        periods = self.periods()
+        if not periods:
+            raise ValueError("Leerer Reihen-Speicher")
+        return periods[-1][0]
+
+    def filter(self, start=None, end=None, series=None, regions=None):
+        """Filterausdruck; ``start``/``end`` als Jahr oder (Jahr, Monat), jeweils einschließlich."""
+        import pyarrow.dataset as ds
+
+        jahr, monat = ds.field("Jahr"), ds.field("Monat")
+        parts = []
+        if start is not None:
+            y, m = start if isinstance(start, tuple) else (start, JAHRESWERT)
+            parts.append((jahr > y) | ((jahr == y) & (monat >= m)))
+        if end is not None:
+            y, m = end if isinstance(end, tuple) else (end, 12)
+            parts.append((jahr < y) | ((jahr == y) & (monat <= m)))
+        if series is not None:
+            parts.append(ds.field("Reihe").isin(list(series)))
+        if regions is not None:
+            parts.append(ds.field("Region").isin(list(regions)))
+        expr = None
+        for part in parts:
+            expr = part if expr is None else expr & part
+        return expr
+
+    def files(self, start=None, end=None, series=None, regions=None):
+        """Anzahl Dateien, die ein Lesezugriff mit diesem Fenster öffnet."""
+        expr = self.filter(start, end, series, regions)
+        return sum(1 for _ in self.dataset.get_fragments(filter=expr))
+
+    def read(self, start=None, end=None, series=None, regions=None, columns=None):
+        """Langes Format für das Fenster (Jahr/Monat als ``int64``)."""
+        table = self.dataset.to_table(columns=columns or COLUMNS,
+                                      filter=self.filter(start, end, series, regions))
+        df = table.to_pandas()
+        for col in ("Jahr", "Monat"):
+            if col in df.columns:
+                df[col] = df[col].astype("int64")
+        return df
+
+    def wide(self, start=None, end=None, series=None, regions=None):
+        """Wie :meth:`read`, aber breit: Jahr (bzw. Jahr, Monat) × Reihe (bzw. Reihe, Region)."""
+        long = self.read(start, end, series, regions)
+        keys = ["Jahr"] if (long["Monat"] == JAHRESWERT).all() else ["Jahr", "Monat"]
+        cols = ["Reihe"] if long["Region"].nunique() <= 1 else ["Reihe", "Region"]
+        out = long.pivot(index=keys, columns=cols, values="Wert").sort_index()
+        if cols == ["Reihe"]:
+            known = [s for s in self.series if s in out.columns]
+            out = out[known + [s for s in out.columns if s not in known]]
+        out.columns.names = [None] * out.columns.nlevels
+        return out.reset_index()
+
+
+def write_series(long, folder):
+    """Langes Format partitionsweise schreiben; betroffene Partitionen werden ersetzt.
+
+    ``meta.json`` (Reihen in Reihenfolge des ersten Auftretens) wird zuletzt
+    geschrieben und markiert den Speicher als vollständig.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    folder = Path(folder)
+    meta = _read_meta(folder) or {"version": SERIES_VERSION, "series": [], "source": {}}
+    meta["series"] += [s for s in pd.unique(long["Reihe"]) if s not in meta["series"]]
+    long = long[COLUMNS].sort_values(["Jahr", "Monat", "Reihe", "Region"], kind="stable")
+    table = pa.Table.from_pandas(long, schema=_schema(), preserve_index=False)
+    ds.write_dataset(table, folder, format="parquet", partitioning=_partitioning(),
+                     basename_template="teil-{i}.parquet", existing_data_behavior="delete_matching",
+                     preserve_order=True, max_rows_per_group=ROW_GROUP_ROWS,
+                     max_partitions=1 << 16)
+    _write_meta(folder, meta)
+    return open_series(folder)
+
+
+def _read_meta(folder):
+    try:
+        meta = json.loads((Path(folder) / "meta.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    return meta if meta.get("version") == SERIES_VERSION else None
+
+
+def _write_meta(folder, meta):
+    tmp = Path(folder) / f"meta.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, Path(folder) / "meta.json")
+
+
+def open_series(folder):
+    """Gespeicherten Reihen-Speicher öffnen (liest nur Verzeichnisnamen und ``meta.json``)."""
+    import pyarrow.dataset as ds
+
+    folder = Path(folder)
+    meta = _read_meta(folder)
+    if meta is None:
+        raise FileNotFoundError(f"Kein Reihen-Speicher (Version {SERIES_VERSION}) in {folder}")
+    dataset = ds.dataset(folder, format="parquet", partitioning=_partitioning(),
+                         schema=_schema(), exclude_invalid_files=False,
+                         ignore_prefixes=[".", "_", "meta."])
+    return SeriesStore(dataset, meta["series"])
+
+
+def series_dir(path):
+    """Ablageort des Speichers für eine Tabelle."""
+    key = hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:16]
+    return SERIES_DIR / key
+
+
+def series_store(path, region=GESAMT):
+    """Speicher für eine breite CSV-Tabelle öffnen; fehlt er oder ist er veraltet, neu bauen."""
+    path = Path(path)
+    if not ingest.ENABLED:
+        return SeriesStore.from_frame(to_long(pd.read_csv(path), region))
+    folder = series_dir(path)
+    stat = path.stat()
+    meta = _read_meta(folder)
+    if meta is not None and meta["source"] and ingest._is_fresh(meta["source"], path, stat):
+        if meta["source"]["mtime_ns"] != stat.st_mtime_ns:
+            meta["source"]["mtime_ns"] = stat.st_mtime_ns
+            _write_meta(folder, meta)
+        return open_series(folder)
+    # die Tabelle ersetzt den ganzen Speicher, auch Jahre, die weggefallen sind
+    shutil.rmtree(folder, ignore_errors=True)
+    write_series(to_long(pd.read_csv(path), region), folder)
+    meta = _read_meta(folder)
+    meta["source"] = {"file": str(path.resolve()), "size": stat.st_size,
+                      "mtime_ns": stat.st_mtime_ns, "sha256": ingest.file_sha256(path)}
+    _write_meta(folder, meta)
+    return open_series(folder)
@@ -0,0 +1,174 @@
+"""Warenkorb-Analyse: Statista-Reihen laden, bereinigen, deflationieren, Kennzahlen."""
+import pandas as pd
+
+from .deflation import PriceIndex, deflate_frame
+from .growth import GrowthIndex
+from .ingest import read_excel_cached
+from .memo import memoize
+from .paths import WARENKORB_DIR
+
+# Tabellenname -> (Datei, Spaltennamen)
+QUELLEN = {
+    "inflation": ("Inflationsrate.xlsx", ["Jahr", "Inflation"]),
+    "lm": ("Umsatz Lebensmitteleinzelhandel.xlsx", ["Jahr", "LM_Umsatz_nom"]),
+    "einzel_vj": ("Umsatzentwicklung im Einzelhandel.xlsx", ["Jahr", "EH_Veraenderung_%"]),
+    "bekl": ("Konsumausgaben Bekleidung und Schuhe.xlsx", ["Jahr", "Bekl_nom"]),
+    "food": ("Konsumausgaben Nahrungsmittel, Getränke Tabakwaren Drogen.xlsx", ["Jahr", "Food_nom"]),
+}
+
+# nominal, real, Anzeigename
+REIHEN = [
+    ("LM_Umsatz_nom", "LM_Umsatz_real", "Lebensmitteleinzelhandel"),
+    ("Food_nom", "Food_real", "Konsumausgaben Food"),
+    ("Bekl_nom", "Bekl_real", "Konsumausgaben Bekleidung"),
+]
+# Spaltenreihenfolge in warenkorb_auswertung.csv
+REIHEN_MERGE = [REIHEN[0], REIHEN[2], REIHEN[1]]
+# Nachkommastellen von CPI, realen Werten und Kennzahlen in den Ergebnissen:
+# das Rundungsrauschen der Rechenweise (~1e-11) soll die abgelegten Tabellen
+# nicht verändern (gerechnet wird ungerundet)
+DECIMALS = 6
+
+# Verteilung der Antworten („deutlich/etwas gestiegen …“)
+ORDER_VERAENDERUNG = [
+    "Deutlich gestiegen", "Etwas gestiegen",
+    "Gleich geblieben", "Etwas gesunken", "Deutlich gesunken"
+]
+
+# Aspekte (Mehrfachauswahl, Semikolon-separiert)
+ORDER_ASPEKTE = [
+    "Höhere Produktqualität / Markenprodukte",
+    "Verbesserter Kundenservice / Rückgabeservice",
+    "Lokale / europäische Anbieter statt Billiganbieter",
+    "Nachhaltige oder umweltfreundliche Produkte",
+    "Schnellerer Versand / Expresslieferung",
+    "Keine erhöhte Zahlungsbereitschaft",
+    "Sonstiges"
+]
+
+
+# ---------- 1) Daten laden ----------
+def load_warenkorb(folder=WARENKORB_DIR):
+    """Alle Statista-Reihen -> {Name: DataFrame} (über den Excel-Cache)."""
+    return {
+        name: read_excel_cached(folder / datei, sheet_name=1, skiprows=4, usecols="B:C", names=names)
+        for name, (datei, names) in QUELLEN.items()
+    }
+
+
+# ---------- 2) Reinigung ----------
+def fix_year(x):
+    """Inflations-Jahre "'01" -> 2001."""
+    s = str(x).strip()
+    if s.startswith("'") and len(s) == 3:  # z.B. '01
+        return 2000 + int(s[1:])
+    # falls schon richtige Jahreszahl:
+    try:
+        return int(s)
+    except ValueError:
+        return pd.NA
+
+
+@memoize
+def clean_warenkorb(frames):
+    """Jahr als Int64, Werte numerisch (nicht parsbare Werte -> NaN)."""
+    out = {}
+    for name, df in frames.items():
+        df = df.copy()
+        if name == "inflation":
+            df["Jahr"] = df["Jahr"].apply(fix_year).astype("Int64")
+        else:
+            df["Jahr"] = pd.to_numeric(df["Jahr"], errors="coerce").astype("Int64")
+        for col in df.columns:
+            if col != "Jahr":
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        out[name] = df
+    return out
+
+
+# ---------- 3) Preisindex aus Inflationsraten bauen ----------
+def price_index(inflation, *reihen):
+    """Log-Preisindex (:class:`.deflation.PriceIndex`) ab dem ersten gemeinsamen Jahr = 100."""
+    first_year = max(*(df["Jahr"].min() for df in reihen), inflation["Jahr"].min())
+    infl = inflation[inflation["Jahr"] >= first_year].sort_values("Jahr")
+    return PriceIndex.from_rates(infl["Jahr"], infl["Inflation"])
+
+
+@memoize(code=("deflation",))
+def build_cpi(inflation, *reihen):
+    """CPI = Π(1 + infl/100) (als kumulierte Log-Summe), Startindex = 100 im ersten gemeinsamen Jahr."""
+    index = price_index(inflation, *reihen)
+    infl = inflation.set_index("Jahr").loc[index.periods].reset_index()
+    infl["CPI"] = index.level().to_numpy()
+    return infl
+
+
+# ---------- 4) Ausrichten & reale Werte rechnen ----------
+@memoize(code=("deflation",))
+def merge_real(cpi, lm, bekl, food):
+    """Gemeinsame Jahre über den Index ausrichten; reale Werte = nominal * (100 / CPI)."""
+    frames = (cpi[["Jahr", "CPI"]], lm, bekl, food)
+    # Zeilen ohne Jahr (Fußnoten der Statista-Blätter) fielen auch beim Merge weg
+    wide = pd.concat([df.dropna(subset=["Jahr"]).set_index("Jahr") for df in frames],
+                     axis=1, join="inner")
+    index = PriceIndex.from_levels(wide.index, wide.pop("CPI"))
+    nominal = wide[[nom for nom, _, _ in REIHEN_MERGE]]
+    df = deflate_frame(nominal, index).round(DECIMALS).reset_index()
+    df.insert(1, "CPI", index.level().round(DECIMALS).to_numpy())
+    return df
+
+
+def warenkorb_table(folder=WARENKORB_DIR):
+    """Schritte 1)-4) in einem: nominale und reale Reihen je Jahr (wie warenkorb_auswertung.csv)."""
+    frames = clean_warenkorb(load_warenkorb(folder))
+    lm, bekl, food = frames["lm"], frames["bekl"], frames["food"]
+    return merge_real(build_cpi(frames["inflation"], lm, bekl, food), lm, bekl, food)
+
+
+# ---------- 5) Kennzahlen ----------
+def growth_pct(series):
+    s0, sN = float(series.iloc[0]), float(series.iloc[-1])
+    return (sN / s0 - 1) * 100
+
+
+def last_years(df, years=5):
+    """Auf die letzten ``years`` Jahre beschränken (sortiert)."""
+    df = df.copy()
+    df["Jahr"] = pd.to_numeric(df["Jahr"], errors="coerce")
+    last_year = int(df["Jahr"].max())
+    window = list(range(last_year - years + 1, last_year + 1))
+    return df[df["Jahr"].isin(window)].sort_values("Jahr").reset_index(drop=True)
+
+
+def warenkorb_growth(df):
+    """Log-Stände aller Reihen (:class:`.growth.GrowthIndex`): Kennzahlen für jedes Zeitfenster.
+
+    ``warenkorb_growth(df).metrics("Lebensmitteleinzelhandel", 2019, 2023)``
+    """
+    return GrowthIndex.from_frame(df, REIHEN)
+
+
+@memoize(code=("growth",))
+def warenkorb_windows(df, min_years=1):
+    """Wachstum und CAGR (nominal/real) für alle Fenster aller Reihen (tidy)."""
+    return warenkorb_growth(df).windows(min_years).round(DECIMALS)
+
+
+@memoize(code=("growth",))
+def warenkorb_metrics(df, years=5):
+    """Wachstum und CAGR (nominal/real) der letzten ``years`` Jahre -> (df5, summary)."""
+    df5 = last_years(df, years)
+    growth = warenkorb_growth(df5)
+    start, end = int(df5["Jahr"].iloc[0]), int(df5["Jahr"].iloc[-1])
+    summary = pd.DataFrame([growth.metrics(label, start, end) for _, _, label in REIHEN])
+    summary = summary.round(DECIMALS).rename_axis("Reihe").reset_index().rename(columns={
+        "Wachstum_nom_%": f"Δ{years}J_nom_%", "Wachstum_real_%": f"Δ{years}J_real_%",
+    })
+    return df5, summary
+
+
+def anteil_gestiegen(ver):
+    """Anzahl derer, die einen ANSTIEG des Warenkorbs empfinden."""
+    return int(ver.loc[
+        ver["Antwort"].isin(["Deutlich gestiegen", "Etwas gestiegen"]), "Anzahl"
+    ].sum())
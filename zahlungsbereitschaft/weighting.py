@@ -0,0 +1,184 @@
+"""Gewichtung der Umfrage auf Statista-Randverteilungen (Raking / IPF).
+
+Die Umfrage ist eine Gelegenheitsstichprobe: PayPal ist über-, Überweisung
+unterrepräsentiert (siehe ``Umfrage_Vs_Statista.py``). Raking sucht
+Gewichte je Teilnehmendem, mit denen der gewichtete Anteil jeder Zielkategorie
+(„Zahlungsart genutzt“) dem Statista-Wert entspricht. Jede Zielkategorie ist
+ein Ja/Nein-Rand; iterative proportionale Anpassung (Deming–Stephan) skaliert
+je Rand die Gewichte der „Ja“- und der „Nein“-Seite, bis alle Ränder bis auf
+``RAKE_TOL`` stimmen.
+
+:func:`rake` arbeitet auf einer beliebigen 0/1-Matrix Teilnehmende ×
+Zielkategorien (dicht oder ``scipy.sparse``). Der Faktor der „Nein“-Seite wird
+als gemeinsamer Skalar geführt, nur die „Ja“-Zeilen einer Spalte werden über
+die CSC-Indizes angefasst; ein Durchgang kostet also O(Einträge), nicht
+O(Teilnehmende × Kategorien).
+
+Für die Auswertungen wird auf den verschiedenen Antwortkombinationen des
+Würfels (:mod:`.cube`) mit ihrer Häufigkeit als Startgewicht gerechnet. Das ist
+exakt dasselbe wie die Rechnung je Teilnehmendem (gleiche Zeile, gleicher
+Faktor), dauert aber auch bei Millionen Teilnehmenden nur Millisekunden. Aus
+den Gewichten entstehen gewichtete Fassungen von ``pct_umfrage``,
+``bnpl_counts`` und den Warenkorb-Verteilungen.
+"""
+import numpy as np
+import pandas as pd
+
+from .taxonomy import FOKUS, KURZNAMEN, UMFRAGE_ZU_VERGLEICH, VERGLEICHSKATEGORIEN
+
+RAKE_TOL = 1e-6  # größte erlaubte Abweichung eines Randanteils (0..1)
+RAKE_MAX_ITER = 1_000
+
+
+def rake(X, targets, base=None, tol=RAKE_TOL, max_iter=RAKE_MAX_ITER):
+    """IPF über Ja/Nein-Ränder.
+
+    ``X``: Zeilen (Teilnehmende bzw. Antwortmuster) × Zielkategorien, 0/1;
+    ``targets``: Zielanteil je Spalte in (0, 1), NaN = kein Ziel;
+    ``base``: Startgewichte (z. B. Häufigkeit der Muster), sonst 1.
+    Die Summe der Gewichte bleibt die von ``base``.
+
+    -> {"weights", "converged", "iterations", "max_abs_diff"}
+    """
+    from scipy import sparse
+
+    X = sparse.csc_matrix(X, dtype=float)
+    X.sum_duplicates()
+    X.eliminate_zeros()
+    X.data[:] = 1.0
+    w = np.ones(X.shape[0]) if base is None else np.array(base, dtype=float)
+    total = w.sum()
+    targets = np.asarray(targets, dtype=float)
+    active = np.flatnonzero(np.isfinite(targets))
+    t = targets[active]
+    Xa = X[:, active]
+    current = (Xa.T @ w) / total
+    bad = (t <= 0) | (t >= 1) | (current <= 0) | (current >= 1)
+    if bad.any():
+        raise ValueError(f"Ränder nicht erreichbar (Spalten {active[bad].tolist()}): "
+                         "Ziel bzw. Umfrageanteil muss zwischen 0 und 1 liegen")
+    cols = [Xa.indices[Xa.indptr[j]:Xa.indptr[j + 1]] for j in range(len(active))]
+    diff = float(np.abs(current - t).max()) if len(t) else 0.0
+    iterations = 0
+    while diff > tol and iterations < max_iter:
+        iterations += 1
+        scale = 1.0  # Faktor aller Zeilen; "Ja"-Zeilen tragen ihren Extrafaktor in w
+        for rows, tj in zip(cols, t):
+            c = scale * w[rows].sum() / total
+            yes, no = tj / c, (1 - tj) / (1 - c)
+            scale *= no
+            w[rows] *= yes / no
+        w *= scale
+        diff = float(np.abs((Xa.T @ w) / total - t).max())
+    return {"weights": w, "converged": diff <= tol, "iterations": iterations, "max_abs_diff": diff}
+
+
+# -------------------------------------------------------
+# Umfrage auf Statista gewichten
+# -------------------------------------------------------
+def statista_targets(statista_pct, categories=FOKUS):
+    """Vergleichsanteile (Vektor über ``VERGLEICHSKATEGORIEN`` in %) -> {Kategorie: Ziel in %}."""
+    pct = np.asarray(statista_pct, dtype=float)
+    out = {}
+    for cat in categories:
+        value = pct[VERGLEICHSKATEGORIEN.index(cat)]
+        if np.isfinite(value):
+            out[cat] = float(value)
+    return out
+
+
+def _vergleich_members(cube, categories):
+    """Fakten × Vergleichskategorien (0/1) aus den Zahlungsarten des Würfels."""
+    methods = cube.labels["Zahlungsart"]
+    P = np.zeros((len(methods), len(categories)))
+    for i, m in enumerate(methods):
+        cat = UMFRAGE_ZU_VERGLEICH.get(m.lower())
+        if cat in categories:
+            P[i, categories.index(cat)] = 1
+    return (cube.members["Zahlungsart"] @ P > 0).astype(float)
+
+
+def survey_weights(cube, targets, tol=RAKE_TOL, max_iter=RAKE_MAX_ITER):
+    """Raking des Würfels auf ``targets`` ({Vergleichskategorie: Anteil in %}).
+
+    Ziele, die die Umfrage nicht erreichen kann (niemand bzw. alle haben die
+    Kategorie gewählt, Ziel 0 % oder 100 %), bleiben außen vor. Zusätzlich zu
+    :func:`rake` enthält das Ergebnis ``ziele`` (Kategorie, Ziel_%, Umfrage_%,
+    Gewichtet_%, aktiv) und ``kennzahlen`` (Teilnehmende, effektive Fallzahl
+    nach Kish, kleinstes/größtes Gewicht je Person).
+    """
+    categories = list(targets)
+    unknown = [c for c in categories if c not in VERGLEICHSKATEGORIEN]
+    if unknown:
+        raise ValueError(f"Unbekannte Vergleichskategorien: {unknown}")
+    M = _vergleich_members(cube, categories)
+    total = cube.weights.sum()
+    share = cube.weights @ M / total
+    goal = np.array([targets[c] for c in categories]) / 100
+    active = (goal > 0) & (goal < 1) & (share > 0) & (share < 1)
+    res = rake(M, np.where(active, goal, np.nan), base=cube.weights, tol=tol, max_iter=max_iter)
+    w = res["weights"]
+    res["ziele"] = pd.DataFrame({
+        "Kategorie": [KURZNAMEN.get(c, c) for c in categories],
+        "Ziel_%": (goal * 100).round(1),
+        "Umfrage_%": (share * 100).round(1),
+        "Gewichtet_%": (w @ M / total * 100).round(1),
+        "aktiv": active,
+    })
+    seen = cube.weights > 0
+    person = w[seen] / cube.weights[seen]  # Gewicht je Teilnehmendem des Musters
+    res["kennzahlen"] = {
+        "teilnehmende": int(round(total)),
+        "n_eff": float(total ** 2 / np.sum(w[seen] * person)),
+        "gewicht_min": float(person.min()) if len(person) else np.nan,
+        "gewicht_max": float(person.max()) if len(person) else np.nan,
+        "iterationen": res["iterations"],
+        "konvergiert": bool(res["converged"]),
+    }
+    return res
+
+
+def _gewichtet(table, column, labels, counts, total):
+    """Zähltabelle (``column``, Anzahl, Anteil_%) um gewichtete Spalten ergänzen."""
+    w = pd.Series(np.asarray(counts, dtype=float), index=labels)
+    w = w.reindex(table[column]).fillna(0).to_numpy()
+    return table.assign(**{"Anzahl_gewichtet": w.round(1),
+                           "Anteil_%_gewichtet": (w / total * 100).round(1)})
+
+
+def weighted_tables(cube, weights, plotdf=None, bnpl_counts=None, ver=None, asp=None):
+    """Gewichtete Fassungen der Auswertungstabellen (Gewichte aus :func:`survey_weights`).
+
+    ``plotdf`` (:func:`.statista.compare_survey_vs_statista`) bekommt
+    ``pct_umfrage_gewichtet``; ``bnpl_counts``, ``ver`` und ``asp`` (Zähltabellen
+    wie in ``survey_counts``) bekommen ``Anzahl_gewichtet`` und
+    ``Anteil_%_gewichtet``. Gezählt werden Teilnehmende, wie im Würfel.
+    """
+    total = cube.weights.sum()
+    out = {}
+    if plotdf is not None:
+        M = _vergleich_members(cube, FOKUS)
+        pct = pd.Series(weights @ M / total * 100, index=[KURZNAMEN.get(c, c) for c in FOKUS])
+        out["plotdf"] = plotdf.assign(
+            pct_umfrage_gewichtet=pct.reindex(plotdf.index).fillna(0).round(1).to_numpy())
+    for key, table, dim, column in (("bnpl_counts", bnpl_counts, "BNPL_norm", "Kategorie"),
+                                    ("ver", ver, "Veränderung", "Antwort"),
+                                    ("asp", asp, "Aspekt", "Aspekt")):
+        if table is not None:
+            out[key] = _gewichtet(table, column, cube.labels[dim], weights @ cube.members[dim], total)
+    return out
+
+
+def survey_weighting(path=None, year=2023, targets=None, tol=RAKE_TOL, max_iter=RAKE_MAX_ITER):
+    """Würfel eines Exports und seine Gewichte auf die Statista-Anteile von ``year``.
+
+    ``targets`` ({Vergleichskategorie: Anteil in %}) ersetzt die Statista-Werte.
+    """
+    from .cube import survey_cube
+    from .panel import load_panels
+    from .statista import vergleichsanteile_panel
+
+    if targets is None:
+        targets = statista_targets(vergleichsanteile_panel(load_panels(), year))
+    cube = survey_cube(path)
+    return cube, survey_weights(cube, targets, tol, max_iter)